@@ -126,7 +126,8 @@ export class HostWindow {
 
     this.browserWindow!.webContents.send('host.message', {
       type: 'state',
-      data: this.client!.state!
+      data: this.client!.state!,
+      revision: this.client!.stateRevision
     } satisfies ServerProtocol.StateMessage);
   }
 
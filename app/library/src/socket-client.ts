@@ -1,7 +1,7 @@
 import crypto from 'node:crypto';
 import net from 'node:net';
 import tls from 'node:tls';
-import { Deferred, defer, createErrorWithCode, ClientProtocol, Client, ServerProtocol, deserializeMessagesOfIterator, splitMessagesOfIterator, serializeMessage } from 'pr1-shared';
+import { Deferred, defer, createErrorWithCode, ClientProtocol, Client, MessageEncoding, ServerProtocol, SocketFraming, decodeBinary, deserializeMessage, encodeBinary, serializeMessage } from 'pr1-shared';
 
 import { CertificateFingerprint } from './types/app-data';
 
@@ -12,6 +12,8 @@ export class OrdinarySocketClientClosedError extends Error {
 
 
 export interface OrdinarySocketClientOptions {
+  // Whether to use the binary message encoding when supported by the server
+  binaryEncoding?: boolean;
   address: {
     host: string;
     port: number;
@@ -147,7 +149,101 @@ export class OrdinarySocketClient {
 }
 
 
+/**
+ * Splits incoming data into frames, without copying or scanning received data more than once.
+ */
+export class SocketFrameReader {
+  private chunks: Buffer[] = [];
+  private length = 0;
+
+  // Length of the data known not to contain a newline
+  private scannedLength = 0;
+
+  framing: SocketFraming = 'newline';
+
+  push(chunk: Buffer) {
+    this.chunks.push(chunk);
+    this.length += chunk.length;
+  }
+
+  read(): Buffer | null {
+    switch (this.framing) {
+      case 'lengthPrefixed': {
+        if (this.length < 4) {
+          return null;
+        }
+
+        let frameLength = Buffer.concat(this.chunks.slice(0, 4), 4).readUInt32BE(0);
+
+        if (this.length < (4 + frameLength)) {
+          return null;
+        }
+
+        this.take(4);
+        return this.take(frameLength);
+      }
+
+      case 'newline': {
+        let offset = 0;
+
+        for (let chunk of this.chunks) {
+          if ((offset + chunk.length) > this.scannedLength) {
+            let index = chunk.indexOf(0x0a, Math.max(this.scannedLength - offset, 0));
+
+            if (index >= 0) {
+              let frame = this.take(offset + index);
+
+              this.take(1);
+              this.scannedLength = 0;
+
+              return frame;
+            }
+          }
+
+          offset += chunk.length;
+        }
+
+        this.scannedLength = this.length;
+        return null;
+      }
+    }
+  }
+
+  setFraming(framing: SocketFraming) {
+    this.framing = framing;
+    this.scannedLength = 0;
+  }
+
+  private take(length: number) {
+    let parts: Buffer[] = [];
+    let remainingLength = length;
+
+    while (remainingLength > 0) {
+      let chunk = this.chunks[0];
+
+      if (chunk.length <= remainingLength) {
+        parts.push(chunk);
+        this.chunks.shift();
+        remainingLength -= chunk.length;
+      } else {
+        parts.push(chunk.subarray(0, remainingLength));
+        this.chunks[0] = chunk.subarray(remainingLength);
+        remainingLength = 0;
+      }
+    }
+
+    this.length -= length;
+
+    return (parts.length === 1)
+      ? parts[0]
+      : Buffer.concat(parts, length);
+  }
+}
+
+
 export class SocketClientBackend {
+  private encoding: MessageEncoding = 'json';
+  private framing: SocketFraming = 'newline';
   private options: OrdinarySocketClientOptions;
   private socket!: OrdinarySocketClient;
 
@@ -198,7 +294,7 @@ export class SocketClientBackend {
     }
 
     this.closed = this.socket.closed.then(() => {});
-    this.messages = deserializeMessagesOfIterator(splitMessagesOfIterator(this.socket));
+    this.messages = this.receiveMessages();
 
     return {
       ok: true,
@@ -206,8 +302,69 @@ export class SocketClientBackend {
     };
   }
 
+  private async * receiveMessages(): AsyncGenerator<ServerProtocol.Message> {
+    let encoding: MessageEncoding = 'json';
+    let reader = new SocketFrameReader();
+
+    for await (let chunk of this.socket) {
+      reader.push(chunk);
+
+      let frame: Buffer | null;
+
+      while ((frame = reader.read())) {
+        let message = (encoding === 'binary')
+          ? decodeBinary(frame) as ServerProtocol.Message
+          : deserializeMessage(frame.toString());
+
+        switch (message.type) {
+          // Acknowledgements are the last messages sent with the previous encoding or framing
+          case 'encoding':
+            encoding = message.encoding;
+            break;
+
+          case 'framing':
+            reader.setFraming(message.framing);
+            break;
+
+          case 'initialize':
+            if (message.framings?.includes('lengthPrefixed')) {
+              await this.send({ type: 'framing', framing: 'lengthPrefixed' });
+              this.framing = 'lengthPrefixed';
+
+              if (this.options.binaryEncoding && message.encodings?.includes('binary')) {
+                await this.send({ type: 'encoding', encoding: 'binary' });
+                this.encoding = 'binary';
+              }
+            }
+
+            yield message;
+            break;
+
+          default:
+            yield message;
+        }
+      }
+    }
+  }
+
   async send(message: ClientProtocol.Message) {
-    this.socket.send(Buffer.from(serializeMessage(message)));
+    switch (this.framing) {
+      case 'lengthPrefixed': {
+        let data = (this.encoding === 'binary')
+          ? encodeBinary(message)
+          : Buffer.from(JSON.stringify(message));
+
+        let header = Buffer.alloc(4);
+        header.writeUInt32BE(data.length);
+
+        this.socket.send(Buffer.concat([header, data]));
+        break;
+      }
+
+      case 'newline':
+        this.socket.send(Buffer.from(serializeMessage(message)));
+        break;
+    }
   }
 
 
@@ -19,16 +19,19 @@ import zeroconf
 from pr1 import Host
 from pr1.util.asyncio import wait_all
 from pr1.util.misc import log_exception
+from pr1.profiler import startup_profiler
 from pr1.util.pool import Pool
 from zeroconf import IPVersion
 from zeroconf.asyncio import AsyncServiceInfo, AsyncZeroconf
 
 logger = logging.getLogger("pr1.app")
 
-from .bridges.protocol import BridgeAdvertisementInfo, ClientClosed, BaseClient
+from .bridges.protocol import BridgeAdvertisementInfo, ClientClosed, BaseClient, EncodedMessage
 from .bridges.stdio import StdioBridge
 from .bridges.websocket import WebsocketBridge
+from .client_queue import QueuedClient
 from .conf import Conf
+from .patch import StatePatcher
 from .session import Session
 from .static import StaticServer
 from .trash import trash as trash_file
@@ -141,7 +144,8 @@ class App:
 
     # Create host
 
-    self.clients = dict[str, BaseClient]()
+    self.clients = dict[str, QueuedClient]()
+    self.client_state_revisions = dict[str, int]()
     self.host = Host(
       backend=Backend(self),
       update_callback=self.update
@@ -158,6 +162,8 @@ class App:
 
     # Misc
 
+    self.client_queue_policy = self.conf.client_queue.create_policy()
+    self.state_patcher = StatePatcher()
     self.updating = False
 
     self._pool: Optional[Pool] = None
@@ -220,7 +226,6 @@ class App:
     try:
       logger.debug(f"Added client '{client.id}'")
 
-      self.clients[client.id] = client
       requires_auth = self.auth_agents and client.remote
 
       await client.send({
@@ -230,6 +235,8 @@ class App:
         # ] if requires_auth else None,
         # "features": {},
         "clientId": client.id,
+        "encodings": client.encodings,
+        "framings": client.framings,
         "identifier": self.conf.identifier,
         "staticUrl": (self.static_server.url if self.static_server else None),
         "version": self.conf.version
@@ -248,18 +255,22 @@ class App:
 
       logger.debug(f"Authenticated client '{client.id}'")
 
-      await client.send({
-        "type": "state",
-        "data": self.host.get_state()
-      })
-
       async with Pool.open(forever=True) as pool:
-        agent = Agent(client, pool=pool)
+        queued_client = QueuedClient(client, policy=self.client_queue_policy)
+        pool.start_soon(queued_client.run(), name=f"Client {client.id} sender")
+
+        self.clients[client.id] = queued_client
+        await self.send_full_state(queued_client)
+
+        agent = Agent(queued_client, pool=pool)
         agent.pool.start_soon(self.handle_client_messages(agent))
     except* ClientClosed:
       logger.debug(f"Disconnected client '{client.id}'")
     finally:
-      del self.clients[client.id]
+      if (queued_client := self.clients.pop(client.id, None)):
+        logger.debug(f"Client '{client.id}' metrics: {queued_client.export_metrics()}")
+
+      self.client_state_revisions.pop(client.id, None)
       logger.debug(f"Removed client '{client.id}'")
 
   async def handle_client_message(self, message: Any, agent: Agent):
@@ -285,16 +296,67 @@ class App:
       agent.pool.start_soon(self.handle_client_message(message, agent))
 
   async def broadcast(self, message: Any):
+    encoded_message = EncodedMessage(message)
+
     for client in list(self.clients.values()):
       try:
-        await client.send(message)
+        await client.send(encoded_message)
       except ClientClosed:
         pass
 
+  async def broadcast_state(self):
+    patch_messages = dict[int, Optional[EncodedMessage]]()
+
+    for client in list(self.clients.values()):
+      client_revision = self.client_state_revisions.get(client.id)
+
+      # The client has not received its initial state yet
+      if (client_revision is None) or (client_revision == self.state_patcher.revision):
+        continue
+
+      if not (client_revision in patch_messages):
+        patch = self.state_patcher.get_patch(client_revision)
+        patch_messages[client_revision] = EncodedMessage({
+          "type": "statePatch",
+          "baseRevision": client_revision,
+          "patch": patch,
+          "revision": self.state_patcher.revision
+        }) if patch is not None else None
+
+      self.client_state_revisions[client.id] = self.state_patcher.revision
+      create_full_state = functools.partial(self.create_full_state_message, client)
+
+      try:
+        client.send_state(patch_messages[client_revision] or create_full_state(), create_full_state=create_full_state)
+      except ClientClosed:
+        pass
+
+  def create_full_state_message(self, client: QueuedClient):
+    self.client_state_revisions[client.id] = self.state_patcher.revision
+
+    return {
+      "type": "state",
+      "data": self.host.get_state(),
+      "revision": self.state_patcher.revision
+    }
+
+  async def send_full_state(self, client: QueuedClient):
+    create_full_state = functools.partial(self.create_full_state_message, client)
+    client.send_state(create_full_state(), create_full_state=create_full_state)
+
+  def get_client_metrics(self):
+    return {
+      client_id: client.export_metrics() for client_id, client in self.clients.items()
+    }
+
   async def process_request(self, request: Any, *, agent: Agent) -> Any:
     match request["type"]:
       case "isBusy":
         return (len(self.clients) > 1) or self.host.busy()
+      case "getClientMetrics":
+        return self.get_client_metrics()
+      case "resyncState":
+        await self.send_full_state(agent.client) # type: ignore
       case _:
         return await self.host.process_request(request, agent=agent)
 
@@ -304,10 +366,8 @@ class App:
 
       async def send_state():
         try:
-          await self.broadcast({
-            "type": "state",
-            "data": self.host.get_state_update()
-          })
+          self.state_patcher.update(self.host.get_state(update=True))
+          await self.broadcast_state()
 
           self.updating = False
         except Exception:
@@ -330,6 +390,12 @@ class App:
 
         pool.start_soon(self.advertise())
 
+        if self.args.profile_startup:
+          logger.info("Startup profile")
+
+          for line in startup_profiler.format().splitlines():
+            logger.info(line)
+
 
         bridge_infos = functools.reduce(lambda infos, bridge: infos + bridge.export_info(), self.bridges, list())
 
@@ -374,6 +440,7 @@ def main():
   parser.add_argument("--data-dir", required=True)
   parser.add_argument("--initialize", action='store_true')
   parser.add_argument("--local", action='store_true')
+  parser.add_argument("--profile-startup", action='store_true')
 
   args = parser.parse_args()
 
@@ -0,0 +1,111 @@
+from io import BytesIO
+from typing import IO, Any, Literal
+
+import comserde
+from comserde.primitive import deserialize as primitive_deserialize
+from comserde.primitive import serialize as primitive_serialize
+
+
+MessageEncoding = Literal['binary', 'json']
+
+
+# Tags of the binary encoding of JSON values
+TAG_NULL = 0
+TAG_FALSE = 1
+TAG_TRUE = 2
+TAG_INT = 3
+TAG_FLOAT = 4
+TAG_STR = 5
+TAG_LIST = 6
+TAG_DICT = 7
+
+TAGS_BYTES = [bytes([tag]) for tag in range(8)]
+
+
+def _serialize_value(value: Any, file: IO[bytes], /):
+  match value:
+    case None:
+      file.write(TAGS_BYTES[TAG_NULL])
+    case bool():
+      file.write(TAGS_BYTES[TAG_TRUE if value else TAG_FALSE])
+    case int():
+      file.write(TAGS_BYTES[TAG_INT])
+      primitive_serialize(value, file, 'w8')
+    case float():
+      file.write(TAGS_BYTES[TAG_FLOAT])
+      primitive_serialize(value, file, 'f64')
+    case str():
+      file.write(TAGS_BYTES[TAG_STR])
+      primitive_serialize(value, file, 'utf-8')
+    case list() | tuple():
+      file.write(TAGS_BYTES[TAG_LIST])
+      primitive_serialize(len(value), file, 'v8')
+
+      for item in value:
+        _serialize_value(item, file)
+    case dict():
+      file.write(TAGS_BYTES[TAG_DICT])
+      primitive_serialize(len(value), file, 'v8')
+
+      for key, item in value.items():
+        primitive_serialize(str(key), file, 'utf-8')
+        _serialize_value(item, file)
+    case _:
+      raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _deserialize_value(file: IO[bytes], /) -> Any:
+  match primitive_deserialize(file, 'u8'):
+    case 0: # TAG_NULL
+      return None
+    case 1: # TAG_FALSE
+      return False
+    case 2: # TAG_TRUE
+      return True
+    case 3: # TAG_INT
+      return primitive_deserialize(file, 'w8')
+    case 4: # TAG_FLOAT
+      return primitive_deserialize(file, 'f64')
+    case 5: # TAG_STR
+      return primitive_deserialize(file, 'utf-8')
+    case 6: # TAG_LIST
+      return [_deserialize_value(file) for _ in range(primitive_deserialize(file, 'v8'))]
+    case 7: # TAG_DICT
+      return { primitive_deserialize(file, 'utf-8'): _deserialize_value(file) for _ in range(primitive_deserialize(file, 'v8')) }
+    case _:
+      raise comserde.DeserializationError("Invalid tag")
+
+
+def encode_binary(value: Any, /):
+  """
+  Encodes a JSON value into compact binary data.
+
+  Each value is preceded by a one-byte tag. Integers, lengths and strings use the encodings of comserde's `w8`, `v8` and `utf-8` formats, and floats are encoded as little-endian 64-bit floats, which keeps numeric arrays such as node values much smaller than their JSON text.
+
+  Parameters
+    value: The value to encode, with the same constraints as `json.dumps()`.
+
+  Returns
+    The encoded data.
+  """
+
+  file = BytesIO()
+  _serialize_value(value, file)
+
+  return file.getvalue()
+
+def decode_binary(data: bytes, /):
+  """
+  Decodes data produced by `encode_binary()`.
+
+  Raises
+    comserde.DeserializationError: If the data is invalid.
+  """
+
+  return _deserialize_value(BytesIO(data))
+
+
+__all__ = [
+  'MessageEncoding',
+  'decode_binary',
+  'encode_binary'
+]
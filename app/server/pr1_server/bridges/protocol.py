@@ -1,13 +1,60 @@
+import functools
+import json
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from ipaddress import IPv4Address
 from typing import Any, AsyncGenerator, Callable, Coroutine, Protocol
 
+from .encoding import encode_binary
+
 
 class ClientClosed(Exception):
   pass
 
+
+class EncodedMessage:
+  def __init__(self, message: object, /):
+    """
+    Wraps a message sent to multiple clients such that it is only encoded once.
+
+    Encodings are computed lazily on first use by a bridge and then shared by all clients.
+
+    Parameters
+      message: The message, which must not be modified afterwards.
+    """
+
+    self.message = message
+
+  @functools.cached_property
+  def binary(self):
+    return encode_binary(self.message)
+
+  @functools.cached_property
+  def text(self):
+    return json.dumps(self.message, allow_nan=False)
+
+  @functools.cached_property
+  def data(self):
+    return self.text.encode("utf-8")
+
+  @functools.cached_property
+  def length_prefixed_binary(self):
+    return len(self.binary).to_bytes(4, "big") + self.binary
+
+  @functools.cached_property
+  def length_prefixed_data(self):
+    return len(self.data).to_bytes(4, "big") + self.data
+
+  @functools.cached_property
+  def line(self):
+    return self.data + b"\n"
+
+
 class BaseClient(ABC):
+  # Encodings and framings supported by the client's transport, of which the client chooses one after initialization
+  encodings: tuple[str, ...] = ()
+  framings: tuple[str, ...] = ()
+
   def __init__(self):
     self.id: str
     self.privileged: bool
@@ -18,7 +65,17 @@ class BaseClient(ABC):
     ...
 
   @abstractmethod
-  async def send(self, message: object):
+  async def send(self, message: object) -> int:
+    """
+    Sends a message to the client.
+
+    Parameters
+      message: A JSON-serializable object or an `EncodedMessage`.
+
+    Returns
+      The number of bytes sent.
+    """
+
     ...
 
   def __aiter__(self):
@@ -1,12 +1,11 @@
 from asyncio import Server, StreamReader, StreamWriter
 from ipaddress import ip_address as parse_ip_address
 import asyncio
-from collections import deque
 from dataclasses import dataclass
 import json
 from pathlib import Path
 import ssl
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Literal, Optional
 import uuid
 
 from pr1.util.pool import Pool
@@ -14,7 +13,8 @@ from pr1.util.pool import Pool
 from .. import logger as parent_logger
 from ..certificate import use_certificate
 from ..util import IPAddress
-from .protocol import BridgeAdvertisementInfo, BridgeProtocol, ClientClosed, BaseClient
+from .encoding import MessageEncoding, decode_binary
+from .protocol import BridgeAdvertisementInfo, BridgeProtocol, ClientClosed, BaseClient, EncodedMessage
 
 if TYPE_CHECKING:
   from .. import App
@@ -23,11 +23,23 @@ if TYPE_CHECKING:
 logger = parent_logger.getChild("bridges.socket")
 
 
+SocketFraming = Literal['lengthPrefixed', 'newline']
+
 class Client(BaseClient):
+  encodings = ('binary', 'json')
+  framings = ('lengthPrefixed', 'newline')
   privileged = False
   remote = False
 
   def __init__(self, reader: StreamReader, writer: StreamWriter, /, bridge: 'SocketBridge'):
+    """
+    Creates a client connected through a socket.
+
+    Messages are initially delimited by newlines. The client can then switch to the `lengthPrefixed` framing, where each message is preceded by its length as a 4-byte big-endian integer, by sending a `{ "type": "framing", "framing": "lengthPrefixed" }` message. The message is acknowledged with an identical message, which is the last message sent by the server with the previous framing.
+
+    Messages are initially encoded as JSON. Once using the `lengthPrefixed` framing, the client can similarly switch to the `binary` encoding by sending a `{ "type": "encoding", "encoding": "binary" }` message. The acknowledgement contains the encoding effectively used.
+    """
+
     super().__init__()
 
     self.id = str(uuid.uuid4())
@@ -35,15 +47,91 @@ class Client(BaseClient):
     self._reader = reader
     self._writer = writer
 
-    self._data_buffer = str()
     self._bridge = bridge
-    self._message_buffer = deque[bytes]()
+    self._buffer = bytearray()
+    self._encoding: MessageEncoding = 'json'
+    self._framing: SocketFraming = 'newline'
 
-  async def recv(self):
-    if self._message_buffer:
-      return self._message_buffer.popleft()
+    # Offset up to which the buffer is known not to contain a newline
+    self._scan_offset = 0
+
+  def _read_frame(self):
+    match self._framing:
+      case 'lengthPrefixed':
+        if len(self._buffer) < 4:
+          return None
+
+        end_offset = 4 + int.from_bytes(self._buffer[0:4], "big")
+
+        if len(self._buffer) < end_offset:
+          return None
+
+        frame = bytes(self._buffer[4:end_offset])
+        del self._buffer[0:end_offset]
+
+        return frame
+
+      case 'newline':
+        newline_offset = self._buffer.find(b"\n", self._scan_offset)
+
+        if newline_offset < 0:
+          self._scan_offset = len(self._buffer)
+          return None
+
+        frame = bytes(self._buffer[0:newline_offset])
+        del self._buffer[0:(newline_offset + 1)]
+        self._scan_offset = 0
+
+        return frame
+
+  def _set_encoding(self, encoding: MessageEncoding, /):
+    # Binary data may contain newlines
+    if self._framing != 'lengthPrefixed':
+      encoding = 'json'
+
+    self._write(EncodedMessage({ "type": "encoding", "encoding": encoding }))
+    self._encoding = encoding
+
+    logger.debug(f"Using encoding '{encoding}' for client '{self.id}'")
 
+  def _set_framing(self, framing: SocketFraming, /):
+    # Acknowledge with the previous framing, without any await in between such that no other message can be written in the meantime
+    self._write(EncodedMessage({ "type": "framing", "framing": framing }))
+
+    self._framing = framing
+    self._scan_offset = 0
+
+    logger.debug(f"Using framing '{framing}' for client '{self.id}'")
+
+  def _write(self, message: EncodedMessage, /):
+    match self._encoding, self._framing:
+      case 'binary', _:
+        data = message.length_prefixed_binary
+      case 'json', 'lengthPrefixed':
+        data = message.length_prefixed_data
+      case 'json', 'newline':
+        data = message.line
+
+    try:
+      self._writer.write(data)
+    except (BrokenPipeError, ConnectionResetError) as e:
+      raise ClientClosed from e
+
+    return len(data)
+
+  async def recv(self):
     while True:
+      while (frame := self._read_frame()) is not None:
+        message = decode_binary(frame) if self._encoding == 'binary' else json.loads(frame)
+
+        match message:
+          case { "type": "encoding", "encoding": encoding } if encoding in self.encodings:
+            self._set_encoding(encoding)
+          case { "type": "framing", "framing": framing } if framing in self.framings:
+            self._set_framing(framing)
+          case _:
+            return message
+
       try:
         data = await self._reader.read(0x10000)
       except ConnectionResetError as e:
@@ -52,22 +140,18 @@ class Client(BaseClient):
       if not data:
         raise ClientClosed
 
-      *msgs, self._data_buffer = (self._data_buffer + data.decode("utf-8")).split("\n")
-
-      if not msgs:
-        continue
-
-      message, *messages = [json.loads(msg) for msg in msgs]
-      self._message_buffer += messages
-
-      return message
+      self._buffer += data
 
   async def send(self, message: object, /):
+    size = self._write(message if isinstance(message, EncodedMessage) else EncodedMessage(message))
+
     try:
-      self._writer.write((json.dumps(message, allow_nan=False) + "\n").encode("utf-8"))
-    except BrokenPipeError as e:
+      await self._writer.drain()
+    except (BrokenPipeError, ConnectionResetError) as e:
       raise ClientClosed from e
 
+    return size
+
 
 @dataclass(kw_only=True)
 class SocketBridgeTcpOptions:
@@ -4,7 +4,7 @@ import sys
 import threading
 from typing import Optional
 
-from .protocol import BridgeProtocol, BaseClient
+from .protocol import BridgeProtocol, BaseClient, EncodedMessage
 
 
 class Client(BaseClient):
@@ -27,9 +27,13 @@ class Client(BaseClient):
     return json.loads(await fut)
 
   async def send(self, message):
-    sys.stdout.write(json.dumps(message, allow_nan=False) + "\n")
+    encoded_message = message if isinstance(message, EncodedMessage) else EncodedMessage(message)
+
+    sys.stdout.buffer.write(encoded_message.line)
     sys.stdout.flush()
 
+    return len(encoded_message.line)
+
 
 class StdioBridge(BridgeProtocol):
   def __init__(self, *, app):
@@ -11,7 +11,8 @@ import websockets.exceptions
 from .. import logger as parent_logger
 from ..auth import agents as auth_agents
 from ..certificate import use_certificate
-from .protocol import BridgeAdvertisementInfo, BridgeProtocol, ClientClosed, BaseClient
+from .encoding import MessageEncoding, decode_binary
+from .protocol import BridgeAdvertisementInfo, BridgeProtocol, ClientClosed, BaseClient, EncodedMessage
 
 if TYPE_CHECKING:
   from ..conf import ConfBridgeWebsocket
@@ -21,12 +22,21 @@ logger = parent_logger.getChild("bridges.websocket")
 
 
 class Client(BaseClient):
+  encodings = ('binary', 'json')
   privileged = False
 
   def __init__(self, conn):
+    """
+    Creates a client connected through a websocket.
+
+    Messages are initially encoded as JSON in text frames. The client can switch to the `binary` encoding, which uses binary frames, by sending a `{ "type": "encoding", "encoding": "binary" }` message. The message is acknowledged with an identical message. Messages of both encodings can be received, as the frame type indicates the encoding of each message.
+    """
+
     super().__init__()
     self.conn = conn
 
+    self._encoding: MessageEncoding = 'json'
+
   @property
   def id(self):
     return str(self.conn.id)
@@ -36,17 +46,40 @@ class Client(BaseClient):
     return self.conn.remote_address[0] != "::1"
 
   async def recv(self):
-    try:
-      return json.loads(await self.conn.recv())
-    except websockets.exceptions.ConnectionClosed as e:
-      raise ClientClosed from e
+    while True:
+      try:
+        data = await self.conn.recv()
+      except websockets.exceptions.ConnectionClosed as e:
+        raise ClientClosed from e
+
+      message = decode_binary(data) if isinstance(data, bytes) else json.loads(data)
+
+      match message:
+        case { "type": "encoding", "encoding": encoding } if encoding in self.encodings:
+          await self.send({ "type": "encoding", "encoding": encoding })
+          self._encoding = encoding
+
+          logger.debug(f"Using encoding '{encoding}' for client '{self.id}'")
+        case _:
+          return message
 
   async def send(self, message):
+    encoded_message = message if isinstance(message, EncodedMessage) else EncodedMessage(message)
+
+    if self._encoding == 'binary':
+      data = encoded_message.binary
+      size = len(data)
+    else:
+      data = encoded_message.text
+      size = len(encoded_message.data)
+
     try:
-      await self.conn.send(json.dumps(message, allow_nan=False))
+      await self.conn.send(data)
     except websockets.exceptions.ConnectionClosed as e:
       raise ClientClosed from e
 
+    return size
+
 
 class WebsocketBridge(BridgeProtocol):
   def __init__(self, app, *, conf: 'ConfBridgeWebsocket'):
@@ -0,0 +1,212 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from . import logger as parent_logger
+from .bridges.protocol import BaseClient, ClientClosed
+
+
+logger = parent_logger.getChild("client_queue")
+
+
+@dataclass(frozen=True, kw_only=True)
+class ClientQueuePolicy:
+  """
+  Settings of the outbound message queue of each client.
+
+  Attributes
+    max_lag: The maximum time, in seconds, that a message can wait in the queue before the client is disconnected.
+    max_size: The maximum number of queued messages. State messages are coalesced when this size is reached, and the client is disconnected if the queue is still full.
+  """
+
+  max_lag: float = 30.0
+  max_size: int = 256
+
+
+@dataclass(kw_only=True)
+class ClientQueueEntry:
+  create_message: Optional[Callable[[], Any]] = None
+  message: Any = None
+  state: bool = False
+  time: float = field(default_factory=time.monotonic)
+
+
+class QueuedClient(BaseClient):
+  def __init__(self, client: BaseClient, /, policy: ClientQueuePolicy):
+    """
+    Wraps a client such that messages are sent from a dedicated task, which prevents a slow client from delaying others.
+
+    The `run()` method must be running for messages to be sent. It raises `ClientClosed` when the underlying client is closed or when the client is disconnected for lagging behind.
+
+    Parameters
+      client: The underlying client.
+      policy: The settings of the queue.
+    """
+
+    super().__init__()
+
+    self.client = client
+    self.id = client.id
+    self.privileged = client.privileged
+    self.remote = client.remote
+
+    self.bytes_sent = 0
+    self.coalesced_message_count = 0
+    self.sent_message_count = 0
+
+    self._closed = False
+    self._event = asyncio.Event()
+    self._full_state_factory: Optional[Callable[[], Any]] = None
+    self._pending_full_state = False
+    self._policy = policy
+    self._queue = deque[ClientQueueEntry]()
+    self._sending_task: Optional[asyncio.Task] = None
+
+  @property
+  def lag(self):
+    return (time.monotonic() - self._queue[0].time) if self._queue else 0.0
+
+  def _close(self, reason: str, /):
+    logger.warning(f"Disconnecting client '{self.id}': {reason}")
+
+    self._closed = True
+    self._queue.clear()
+    self._event.set()
+
+    # Interrupt a send operation which might never complete, such as when waiting for a stalled connection to drain
+    if self._sending_task:
+      self._sending_task.cancel()
+
+  def _coalesce(self):
+    # Drop all queued state messages and replace them with a single full state, computed when it is about to be sent
+    state_entries = [entry for entry in self._queue if entry.state]
+
+    if not state_entries:
+      return False
+
+    self._queue = deque(entry for entry in self._queue if not entry.state)
+    self.coalesced_message_count += len(state_entries)
+
+    return True
+
+  def _enqueue(self, entry: ClientQueueEntry, /, *, check_size: bool = True):
+    if self._closed:
+      raise ClientClosed
+
+    if self.lag > self._policy.max_lag:
+      self._close(f"lagging by {self.lag:.1f} s")
+      raise ClientClosed
+
+    if check_size and (len(self._queue) >= self._policy.max_size):
+      self._close(f"more than {self._policy.max_size} queued messages")
+      raise ClientClosed
+
+    self._queue.append(entry)
+    self._event.set()
+
+  def _enqueue_full_state(self):
+    def create_message():
+      assert self._full_state_factory
+      return self._full_state_factory()
+
+    # The full state replaces other entries and is therefore not subject to the size limit
+    self._pending_full_state = True
+    self._enqueue(ClientQueueEntry(create_message=create_message, state=True), check_size=False)
+
+  async def recv(self):
+    return await self.client.recv()
+
+  async def send(self, message: object, /):
+    """
+    Queues a message.
+
+    Raises
+      ClientClosed: If the client is closed or was disconnected for lagging behind.
+    """
+
+    if (len(self._queue) >= self._policy.max_size) and self._coalesce():
+      self._enqueue_full_state()
+
+    self._enqueue(ClientQueueEntry(message=message))
+
+  def send_state(self, message: object, /, *, create_full_state: Callable[[], Any]):
+    """
+    Queues a state message.
+
+    If the queue is full, all queued state messages, including this one, are replaced by a full state message created by `create_full_state()` just before being sent. Until then, further state messages are ignored.
+
+    Parameters
+      message: The state message.
+      create_full_state: A function which creates a full state message, and updates the state revision known by the client.
+
+    Raises
+      ClientClosed: If the client is closed or was disconnected for lagging behind.
+    """
+
+    if self._closed:
+      raise ClientClosed
+
+    self._full_state_factory = create_full_state
+
+    if self._pending_full_state:
+      self.coalesced_message_count += 1
+      return
+
+    if len(self._queue) >= self._policy.max_size:
+      self._coalesce()
+      self.coalesced_message_count += 1
+      self._enqueue_full_state()
+    else:
+      self._enqueue(ClientQueueEntry(message=message, state=True))
+
+  def export_metrics(self):
+    return {
+      "bytesSent": self.bytes_sent,
+      "coalescedMessageCount": self.coalesced_message_count,
+      "lag": self.lag,
+      "queueSize": len(self._queue),
+      "sentMessageCount": self.sent_message_count
+    }
+
+  async def run(self):
+    while True:
+      await self._event.wait()
+      self._event.clear()
+
+      while self._queue and not self._closed:
+        entry = self._queue[0]
+
+        if entry.create_message:
+          self._pending_full_state = False
+          message = entry.create_message()
+        else:
+          message = entry.message
+
+        self._sending_task = asyncio.current_task()
+
+        try:
+          self.bytes_sent += await self.client.send(message)
+        except asyncio.CancelledError:
+          if self._closed:
+            raise ClientClosed from None
+
+          raise
+        finally:
+          self._sending_task = None
+
+        self.sent_message_count += 1
+
+        # The queue may have been replaced while sending
+        if self._queue and (self._queue[0] is entry):
+          self._queue.popleft()
+
+      if self._closed:
+        raise ClientClosed
+
+
+__all__ = [
+  'ClientQueuePolicy',
+  'QueuedClient'
+]
@@ -8,6 +8,7 @@ from .bridges.protocol import BridgeProtocol
 from .bridges.socket import SocketBridge, SocketBridgeOptions, SocketBridgeTcpOptions, SocketBridgeUnixOptions
 from .bridges.stdio import StdioBridge
 from .bridges.websocket import WebsocketBridge
+from .client_queue import ClientQueuePolicy
 
 
 VERSION = 5
@@ -172,6 +173,40 @@ class ConfAdvertisement:
     )
 
 
+@dataclass(kw_only=True)
+class ConfClientQueue:
+  max_lag: float
+  max_size: int
+
+  def create_policy(self):
+    return ClientQueuePolicy(
+      max_lag=self.max_lag,
+      max_size=self.max_size
+    )
+
+  def export(self):
+    return {
+      "maxLag": self.max_lag,
+      "maxSize": self.max_size
+    }
+
+  @classmethod
+  def create(cls):
+    policy = ClientQueuePolicy()
+
+    return cls(
+      max_lag=policy.max_lag,
+      max_size=policy.max_size
+    )
+
+  @classmethod
+  def load(cls, data):
+    return cls(
+      max_lag=data["maxLag"],
+      max_size=data["maxSize"]
+    )
+
+
 @dataclass(kw_only=True)
 class ConfStatic:
   hostname: str
@@ -199,6 +234,7 @@ class Conf:
   advertisement: Optional[ConfAdvertisement]
   auth: ConfAuth
   bridges: list[ConfBridge]
+  client_queue: ConfClientQueue
   identifier: str
   static: Optional[ConfStatic]
   version: int
@@ -208,6 +244,7 @@ class Conf:
       "advertisement": (self.advertisement and self.advertisement.export()),
       "auth": self.auth.export(),
       "bridges": [bridge.export() for bridge in self.bridges],
+      "clientQueue": self.client_queue.export(),
       "identifier": self.identifier,
       "static": (self.static and self.static.export()),
       "version": self.version
@@ -219,6 +256,7 @@ class Conf:
       advertisement=None,
       auth=ConfAuth.create(),
       bridges=list(),
+      client_queue=ConfClientQueue.create(),
       identifier=str(uuid.uuid4()),
       static=None,
       version=VERSION
@@ -233,6 +271,8 @@ class Conf:
       advertisement=(data["advertisement"] and ConfAdvertisement.load(data["advertisement"])),
       auth=ConfAuth.load(data["auth"]),
       bridges=[ConfBridge.load(data_bridge) for data_bridge in data["bridges"]],
+      # Missing from configurations created before this setting was added
+      client_queue=(ConfClientQueue.load(data["clientQueue"]) if "clientQueue" in data else ConfClientQueue.create()),
       identifier=data["identifier"],
       static=(data["static"] and ConfStatic.load(data["static"])),
       version=data["version"]
@@ -0,0 +1,124 @@
+from collections import deque
+from typing import Any, Optional
+
+
+# Number of patches kept to bring lagging clients up to date
+STATE_PATCH_HISTORY_SIZE = 100
+
+
+def escape_pointer_key(key: Any, /):
+  return str(key).replace("~", "~0").replace("/", "~1")
+
+def create_patch(old_value: Any, new_value: Any, /, path: str = str()) -> list[dict[str, Any]]:
+  """
+  Creates a JSON patch which transforms a value into another.
+
+  Objects are compared member by member, while other values, including lists, are replaced as a whole when they differ.
+
+  Parameters
+    old_value: The original value.
+    new_value: The new value.
+    path: The JSON pointer of the value.
+
+  Returns
+    A list of JSON patch operations.
+  """
+
+  # Cached exports, such as those of protocols, are the same object across states and need not be compared
+  if old_value is new_value:
+    return list()
+
+  if isinstance(old_value, dict) and isinstance(new_value, dict):
+    operations = list[dict[str, Any]]()
+
+    for key in old_value.keys() - new_value.keys():
+      operations.append({ "op": "remove", "path": f"{path}/{escape_pointer_key(key)}" })
+
+    for key, new_item in new_value.items():
+      item_path = f"{path}/{escape_pointer_key(key)}"
+
+      if key in old_value:
+        operations += create_patch(old_value[key], new_item, item_path)
+      else:
+        operations.append({ "op": "add", "path": item_path, "value": new_item })
+
+    return operations
+
+  if (type(old_value) is type(new_value)) and (old_value == new_value):
+    return list()
+
+  return [{ "op": "replace", "path": path, "value": new_value }]
+
+
+class StatePatcher:
+  def __init__(self):
+    """
+    Creates an object which tracks revisions of the host state and the patches between them.
+
+    Master locations and analyses are not compared but rather transmitted with custom `locationDiff` and `masterAnalysisDiff` operations, or as a whole for new masters, as they are already exported as diffs by masters.
+    """
+
+    self.revision = 0
+
+    self._patches = deque[tuple[int, list[dict[str, Any]]]](maxlen=STATE_PATCH_HISTORY_SIZE)
+    self._state: Optional[dict[str, Any]] = None
+
+  def update(self, state: dict[str, Any], /):
+    """
+    Records a new revision of the state.
+
+    Parameters
+      state: The state, as exported with `Host.get_state(update=True)`. It is modified by this method.
+    """
+
+    master_operations = list[dict[str, Any]]()
+
+    for experiment_id, experiment in state["experiments"].items():
+      if (master := experiment["master"]):
+        master_path = f"/experiments/{escape_pointer_key(experiment_id)}/master"
+        location_revision = master.pop("locationRevision")
+
+        if "location" in master:
+          master_operations += [
+            { "op": "add", "path": f"{master_path}/location", "value": master.pop("location") },
+            { "op": "add", "path": f"{master_path}/locationRevision", "value": location_revision }
+          ]
+        else:
+          master_operations.append({
+            "op": "locationDiff",
+            "path": master_path,
+            "value": {
+              **master.pop("locationDiff"),
+              "revision": location_revision
+            }
+          })
+
+        if "masterAnalysis" in master:
+          master_operations.append({ "op": "add", "path": f"{master_path}/masterAnalysis", "value": master.pop("masterAnalysis") })
+        elif any((master_analysis_diff := master.pop("masterAnalysisDiff")).values()):
+          master_operations.append({ "op": "masterAnalysisDiff", "path": master_path, "value": master_analysis_diff })
+
+    if self._state is not None:
+      self._patches.append((self.revision + 1, create_patch(self._state, state) + master_operations))
+
+    self._state = state
+    self.revision += 1
+
+  def get_patch(self, revision: int, /):
+    """
+    Returns the operations which bring the state from a revision to the latest revision, or `None` if the revision is too old.
+    """
+
+    if revision == self.revision:
+      return list()
+
+    if (not self._patches) or (revision < self._patches[0][0] - 1):
+      return None
+
+    return [operation for patch_revision, patch in self._patches if patch_revision > revision for operation in patch]
+
+
+__all__ = [
+  'StatePatcher',
+  'create_patch'
+]
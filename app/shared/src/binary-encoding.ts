@@ -0,0 +1,269 @@
+/**
+ * Binary encoding of JSON values, matching `pr1_server.bridges.encoding`.
+ *
+ * Each value is preceded by a one-byte tag. Integers are encoded as signed VLQs, lengths as unsigned VLQs, floats as little-endian 64-bit floats and strings as their UTF-8 length followed by their UTF-8 data.
+ */
+
+
+const TAG_NULL = 0;
+const TAG_FALSE = 1;
+const TAG_TRUE = 2;
+const TAG_INT = 3;
+const TAG_FLOAT = 4;
+const TAG_STR = 5;
+const TAG_LIST = 6;
+const TAG_DICT = 7;
+
+const textDecoder = new TextDecoder();
+const textEncoder = new TextEncoder();
+
+
+class BinaryWriter {
+  private buffer = new Uint8Array(256);
+  private view = new DataView(this.buffer.buffer);
+  length = 0;
+
+  private reserve(length: number) {
+    if ((this.length + length) > this.buffer.length) {
+      let buffer = new Uint8Array(Math.max(this.buffer.length * 2, this.length + length));
+      buffer.set(this.buffer.subarray(0, this.length));
+
+      this.buffer = buffer;
+      this.view = new DataView(buffer.buffer);
+    }
+  }
+
+  getData() {
+    return this.buffer.subarray(0, this.length);
+  }
+
+  writeByte(value: number) {
+    this.reserve(1);
+    this.buffer[this.length++] = value;
+  }
+
+  writeBytes(value: Uint8Array) {
+    this.reserve(value.length);
+    this.buffer.set(value, this.length);
+    this.length += value.length;
+  }
+
+  writeFloat(value: number) {
+    this.reserve(8);
+    this.view.setFloat64(this.length, value, true);
+    this.length += 8;
+  }
+
+  writeSignedVlq(value: number) {
+    // Equivalent to writing the VLQ of (|value| << 1) | sign, without exceeding the range of safe integers
+    let magnitude = Math.abs(value);
+    let byte = (magnitude % 0x40) * 2 + ((value < 0) ? 1 : 0);
+    let rest = Math.floor(magnitude / 0x40);
+
+    if (rest < 1) {
+      this.writeByte(byte);
+    } else {
+      this.writeByte(byte | 0x80);
+      this.writeVlq(rest);
+    }
+  }
+
+  writeString(value: string) {
+    let data = textEncoder.encode(value);
+
+    this.writeVlq(data.length);
+    this.writeBytes(data);
+  }
+
+  writeVlq(value: number) {
+    // Arithmetic operations are used instead of bitwise operations to support integers larger than 32 bits
+    let currentValue = value;
+
+    while (true) {
+      let byte = currentValue % 0x80;
+      currentValue = Math.floor(currentValue / 0x80);
+
+      if (currentValue < 1) {
+        this.writeByte(byte);
+        break;
+      }
+
+      this.writeByte(byte | 0x80);
+    }
+  }
+}
+
+class BinaryReader {
+  private offset = 0;
+  private view: DataView;
+
+  constructor(private data: Uint8Array) {
+    this.view = new DataView(data.buffer, data.byteOffset, data.byteLength);
+  }
+
+  private check(length: number) {
+    if ((this.offset + length) > this.data.length) {
+      throw new Error('Unexpected end of data');
+    }
+  }
+
+  readByte() {
+    this.check(1);
+    return this.data[this.offset++];
+  }
+
+  readFloat() {
+    this.check(8);
+
+    let value = this.view.getFloat64(this.offset, true);
+    this.offset += 8;
+
+    return value;
+  }
+
+  readSignedVlq() {
+    let byte = this.readByte();
+    let negative = (byte & 0x01) > 0;
+    let result = (byte & 0x7f) >> 1;
+    let factor = 0x40;
+
+    while ((byte & 0x80) > 0) {
+      byte = this.readByte();
+      result += (byte & 0x7f) * factor;
+      factor *= 0x80;
+    }
+
+    return negative ? -result : result;
+  }
+
+  readString() {
+    let length = this.readVlq();
+    this.check(length);
+
+    let value = textDecoder.decode(this.data.subarray(this.offset, this.offset + length));
+    this.offset += length;
+
+    return value;
+  }
+
+  readVlq() {
+    let result = 0;
+    let factor = 1;
+
+    while (true) {
+      let byte = this.readByte();
+      result += (byte & 0x7f) * factor;
+      factor *= 0x80;
+
+      if ((byte & 0x80) < 1) {
+        return result;
+      }
+    }
+  }
+}
+
+
+function writeValue(writer: BinaryWriter, value: unknown) {
+  switch (typeof value) {
+    case 'boolean':
+      writer.writeByte(value ? TAG_TRUE : TAG_FALSE);
+      break;
+    case 'number':
+      if (Number.isSafeInteger(value)) {
+        writer.writeByte(TAG_INT);
+        writer.writeSignedVlq(value);
+      } else {
+        writer.writeByte(TAG_FLOAT);
+        writer.writeFloat(value);
+      }
+
+      break;
+    case 'string':
+      writer.writeByte(TAG_STR);
+      writer.writeString(value);
+      break;
+    case 'undefined':
+      // Same as JSON.stringify() for array items
+      writer.writeByte(TAG_NULL);
+      break;
+    case 'object':
+      if (value === null) {
+        writer.writeByte(TAG_NULL);
+      } else if (Array.isArray(value)) {
+        writer.writeByte(TAG_LIST);
+        writer.writeVlq(value.length);
+
+        for (let item of value) {
+          writeValue(writer, item);
+        }
+      } else {
+        let entries = Object.entries(value).filter(([_key, item]) => (item !== undefined));
+
+        writer.writeByte(TAG_DICT);
+        writer.writeVlq(entries.length);
+
+        for (let [key, item] of entries) {
+          writer.writeString(key);
+          writeValue(writer, item);
+        }
+      }
+
+      break;
+    default:
+      throw new Error(`Value of type ${typeof value} is not serializable`);
+  }
+}
+
+function readValue(reader: BinaryReader): unknown {
+  let tag = reader.readByte();
+
+  switch (tag) {
+    case TAG_NULL:
+      return null;
+    case TAG_FALSE:
+      return false;
+    case TAG_TRUE:
+      return true;
+    case TAG_INT:
+      return reader.readSignedVlq();
+    case TAG_FLOAT:
+      return reader.readFloat();
+    case TAG_STR:
+      return reader.readString();
+    case TAG_LIST: {
+      let length = reader.readVlq();
+      let list = new Array(length);
+
+      for (let index = 0; index < length; index += 1) {
+        list[index] = readValue(reader);
+      }
+
+      return list;
+    }
+    case TAG_DICT: {
+      let length = reader.readVlq();
+      let dict: Record<string, unknown> = {};
+
+      for (let index = 0; index < length; index += 1) {
+        let key = reader.readString();
+        dict[key] = readValue(reader);
+      }
+
+      return dict;
+    }
+    default:
+      throw new Error(`Invalid tag ${tag}`);
+  }
+}
+
+
+export function encodeBinary(value: unknown) {
+  let writer = new BinaryWriter();
+  writeValue(writer, value);
+
+  return writer.getData();
+}
+
+export function decodeBinary(data: Uint8Array) {
+  return readValue(new BinaryReader(data));
+}
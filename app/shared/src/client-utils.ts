@@ -20,20 +20,20 @@ export function serializeMessage(message: ClientProtocol.Message) {
   return (JSON.stringify(message) + '\n');
 }
 
-export async function* deserializeMessagesOfIterator(iterable: AsyncIterable<string>) {
-  for await (let msg of iterable) {
-    let message;
-
-    try {
-      message = JSON.parse(msg) as ServerProtocol.Message;
-    } catch (err) {
-      if (err instanceof SyntaxError) {
-        throw createErrorWithCode('Malformed message', 'APP_MALFORMED');
-      }
-
-      throw err;
+export function deserializeMessage(msg: string) {
+  try {
+    return JSON.parse(msg) as ServerProtocol.Message;
+  } catch (err) {
+    if (err instanceof SyntaxError) {
+      throw createErrorWithCode('Malformed message', 'APP_MALFORMED');
     }
 
-    yield message;
+    throw err;
+  }
+}
+
+export async function* deserializeMessagesOfIterator(iterable: AsyncIterable<string>) {
+  for await (let msg of iterable) {
+    yield deserializeMessage(msg);
   }
 }
@@ -1,7 +1,10 @@
 import { Deferred, defer } from './defer';
 import { createErrorWithCode } from './error';
 import { Brand } from './types/util';
-import { HostIdentifier, HostState } from './types/host';
+import { HostIdentifier, HostState, HostStatePatchOperation } from './types/host';
+import { ExperimentId } from './types/experiment';
+import { Master, MasterId } from './types/master';
+import { applyMasterAnalysisDiff, applyMasterLocationDiff, parseJsonPointer, updateNestedValue } from './misc';
 import { ClientProtocol, RequestFunc, ServerProtocol } from './types/communication';
 
 
@@ -34,6 +37,7 @@ export class Client {
   private messageCallback: ((message: ServerProtocol.Message) => void) | null = null;
   private nextRequestId = 0x10000;
   private requests = new Map<number, Deferred<unknown>>();
+  private resyncingState = false;
   private userClose: (() => Promise<void>) | null;
   private userClosing = false;
 
@@ -46,6 +50,7 @@ export class Client {
 
   initializationData: Omit<ServerProtocol.InitializationMessage, 'type'> | null = null;
   state: HostState | null = null;
+  stateRevision = 0;
 
   /** @deprecated */
   identifier: HostIdentifier | null = null;
@@ -167,6 +172,7 @@ export class Client {
 
     this.initializationData = initializationMessage;
     this.state = stateMessage.data;
+    this.stateRevision = stateMessage.revision;
 
     return {
       ok: true,
@@ -177,6 +183,110 @@ export class Client {
     } as const;
   }
 
+  private applyStatePatch(patch: HostStatePatchOperation[]) {
+    let state = this.state!;
+
+    for (let operation of patch) {
+      let path = parseJsonPointer(operation.path);
+
+      switch (operation.op) {
+        case 'add':
+        case 'replace':
+          state = updateNestedValue(state, path, () => operation.value);
+          break;
+        case 'remove':
+          state = updateNestedValue(state, path, () => undefined);
+          break;
+        case 'locationDiff': {
+          let { revision, ...locationDiff } = operation.value;
+
+          state = updateNestedValue(state, path, (master: Master | null | undefined) => {
+            if (!master || (master.locationRevision >= revision)) {
+              return master;
+            }
+
+            if (master.locationRevision < locationDiff.baseRevision) {
+              // Missed a location diff, keep the previous location until the full master is received
+              this.resyncMaster(path[1] as ExperimentId, master.id);
+              return master;
+            }
+
+            return {
+              ...master,
+              location: applyMasterLocationDiff(master.location, locationDiff),
+              locationRevision: revision
+            };
+          });
+
+          break;
+        }
+        case 'masterAnalysisDiff': {
+          let diff = operation.value;
+
+          state = updateNestedValue(state, path, (master: Master | null | undefined) => {
+            if (!master) {
+              return master;
+            }
+
+            let masterAnalysis = applyMasterAnalysisDiff(master.masterAnalysis, diff);
+
+            if (!masterAnalysis) {
+              // Missed items, keep the previous analysis until the full master is received
+              this.resyncMaster(path[1] as ExperimentId, master.id);
+              return master;
+            }
+
+            return {
+              ...master,
+              masterAnalysis
+            };
+          });
+
+          break;
+        }
+      }
+    }
+
+    return state;
+  }
+
+  private async resyncState() {
+    if (!this.resyncingState) {
+      this.resyncingState = true;
+
+      try {
+        await this.request({ type: 'resyncState' });
+      } finally {
+        this.resyncingState = false;
+      }
+    }
+  }
+
+  private async resyncMaster(experimentId: ExperimentId, masterId: MasterId) {
+    let master = await this.request({
+      type: 'getExperimentMaster',
+      experimentId
+    });
+
+    let experiment = this.state?.experiments[experimentId];
+
+    if (experiment && master && (master.id === masterId) && (!experiment.master || ((experiment.master.id === masterId) && (experiment.master.locationRevision <= master.locationRevision)))) {
+      let state = {
+        ...this.state!,
+        experiments: {
+          ...this.state!.experiments,
+          [experimentId]: {
+            ...experiment,
+            master
+          }
+        }
+      };
+
+      this.state = state;
+      this.messageCallback?.({ type: 'state', data: state, revision: this.stateRevision });
+    }
+  }
+
   onMessage(callback: ((message: ServerProtocol.Message) => void)) {
     this.messageCallback = callback;
   }
@@ -231,10 +341,24 @@ export class Client {
           }
 
           case 'state': {
-            this.state = {
-              ...this.state,
-              ...message.data
-            };
+            this.state = message.data;
+            this.stateRevision = message.revision;
+
+            break;
+          }
+
+          case 'statePatch': {
+            if (message.revision <= this.stateRevision) {
+              break;
+            }
+
+            if (message.baseRevision > this.stateRevision) {
+              this.resyncState();
+              break;
+            }
+
+            this.state = this.applyStatePatch(message.patch);
+            this.stateRevision = message.revision;
 
             break;
           }
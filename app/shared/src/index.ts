@@ -1,3 +1,4 @@
+export * from './binary-encoding';
 export * from './client-utils';
 export * from './client';
 export * from './defer';
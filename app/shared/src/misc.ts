@@ -1,5 +1,5 @@
 import type { CompilationAnalysis } from './types/compilation';
-import type { MasterAnalysis } from './types/master';
+import type { MasterAnalysis, MasterAnalysisDiff, MasterAnalysisItemKind, MasterBlockIndex, MasterLocationDiff, MasterRuntimeBlockLocation, MasterRuntimeBlockLocationEntry } from './types/master';
 
 
 export function createReport(analysis: CompilationAnalysis | MasterAnalysis | null) {
@@ -9,3 +9,123 @@ export function createReport(analysis: CompilationAnalysis | MasterAnalysis | nu
     ...(analysis?.warnings ?? []).map((diagnostic) => [diagnostic, 'warning'] as const)
   ];
 }
+
+
+/**
+ * Applies an analysis diff to the analysis of a master.
+ *
+ * Returns `null` if the diff adds items after missing ones, in which case the master must be obtained again.
+ */
+export function applyMasterAnalysisDiff(analysis: MasterAnalysis, diff: MasterAnalysisDiff): MasterAnalysis | null {
+  let newAnalysis = { ...analysis };
+
+  for (let kind of (Object.keys(diff) as MasterAnalysisItemKind[])) {
+    let items: unknown[] = [...analysis[kind]];
+
+    for (let [rawIndex, item] of Object.entries(diff[kind])) {
+      let index = parseInt(rawIndex);
+
+      if (index > items.length) {
+        return null;
+      }
+
+      items[index] = item;
+    }
+
+    newAnalysis[kind] = items as any;
+  }
+
+  return newAnalysis;
+}
+
+
+/**
+ * Applies a location diff to the location of a master.
+ *
+ * The location must be at revision `diff.baseRevision` or later. The entries of the diff hold their latest state, hence entries which have already been updated are left unchanged.
+ */
+export function applyMasterLocationDiff(location: MasterRuntimeBlockLocation, diff: MasterLocationDiff) {
+  let entries = new Map<MasterBlockIndex, MasterRuntimeBlockLocationEntry>();
+
+  let addEntries = (currentLocation: MasterRuntimeBlockLocation) => {
+    let { children, ...entry } = currentLocation;
+    entries.set(entry.entryIndex, entry);
+
+    for (let childLocation of Object.values(children)) {
+      addEntries(childLocation);
+    }
+  };
+
+  addEntries(location);
+
+  for (let [rawEntryIndex, entry] of Object.entries(diff.entries)) {
+    let entryIndex = parseInt(rawEntryIndex);
+
+    if (entry) {
+      entries.set(entryIndex, entry);
+    } else {
+      entries.delete(entryIndex);
+    }
+  }
+
+  let childrenEntries = new Map<MasterBlockIndex, MasterRuntimeBlockLocationEntry[]>();
+  let rootEntry = location as MasterRuntimeBlockLocationEntry;
+
+  for (let entry of entries.values()) {
+    if (entry.parentEntryIndex === 0) {
+      rootEntry = entry;
+    } else {
+      let siblingEntries = childrenEntries.get(entry.parentEntryIndex);
+
+      if (siblingEntries) {
+        siblingEntries.push(entry);
+      } else {
+        childrenEntries.set(entry.parentEntryIndex, [entry]);
+      }
+    }
+  }
+
+  let createLocation = (entry: MasterRuntimeBlockLocationEntry): MasterRuntimeBlockLocation => ({
+    ...entry,
+    children: Object.fromEntries(
+      (childrenEntries.get(entry.entryIndex) ?? []).map((childEntry) => [childEntry.childId, createLocation(childEntry)])
+    )
+  });
+
+  return createLocation(rootEntry);
+}
+
+
+export function parseJsonPointer(pointer: string) {
+  return pointer.split('/').slice(1).map((segment) => segment.replaceAll('~1', '/').replaceAll('~0', '~'));
+}
+
+/**
+ * Updates a value nested in objects without modifying the objects.
+ *
+ * The updater is called with `undefined` if the value is missing, and the value is removed if the updater returns `undefined`. Objects are left unchanged if the value's parent is missing.
+ */
+export function updateNestedValue(object: unknown, path: string[], updater: (value: any) => unknown): any {
+  if (path.length < 1) {
+    return updater(object);
+  }
+
+  if ((typeof object !== 'object') || (object === null)) {
+    return object;
+  }
+
+  let [key, ...restPath] = path;
+  let value = (object as Record<string, unknown>)[key];
+  let newValue = updateNestedValue(value, restPath, updater);
+
+  if (newValue === value) {
+    return object;
+  }
+
+  if (newValue === undefined) {
+    let { [key]: _, ...newObject } = (object as Record<string, unknown>);
+    return newObject;
+  }
+
+  return { ...object, [key]: newValue };
+}
@@ -1,16 +1,38 @@
 import type { ChannelId, ClientId } from '../client';
-import type { ExperimentId, ExperimentReportEventIndex, ExperimentReportEvents, ExperimentReportInfo } from './experiment';
-import type { HostIdentifier, HostState } from './host';
-import type { MasterId } from './master';
+import type { DocumentId } from './draft';
+import type { Experiment, ExperimentCatalogEntry, ExperimentId, ExperimentReportEventIndex, ExperimentReportEvents, ExperimentReportInfo } from './experiment';
+import type { HostIdentifier, HostState, HostStatePatchOperation } from './host';
+import type { Master, MasterAnalysis, MasterAnalysisItemKind, MasterId } from './master';
 import type { PluginName } from './plugin';
 import type { ProtocolBlockPath } from './protocol';
 import type { UnionToIntersection } from './util';
 
 
+export interface ClientMetrics {
+  bytesSent: number;
+  coalescedMessageCount: number;
+  lag: number;
+  queueSize: number;
+  sentMessageCount: number;
+}
+
+export interface StartupProfile {
+  records: {
+    category: 'executor' | 'experiment' | 'host' | 'import';
+    duration: number;
+    name: string;
+    startTime: number;
+  }[];
+}
+
 export type RequestFunc = UnionToIntersection<
   // Server requests
   (
+    (options: { type: 'getClientMetrics'; }) => Promise<Record<ClientId, ClientMetrics>>
+  ) | (
     (options: { type: 'isBusy'; }) => Promise<boolean>
+  ) | (
+    (options: { type: 'resyncState'; }) => Promise<void>
   )
 
   // Host requests
@@ -19,6 +41,7 @@ export type RequestFunc = UnionToIntersection<
       type: 'compileDraft';
       draft: any;
       options: {
+        profile?: boolean;
         trusted: boolean;
       };
       studyExperimentId: ExperimentId | null;
@@ -36,6 +59,16 @@ export type RequestFunc = UnionToIntersection<
       experimentId: ExperimentId;
       trash: boolean;
     }) => Promise<void>
+  ) | (
+    (options: {
+      type: 'discardDraft';
+      documentIds: DocumentId[];
+    }) => Promise<void>
+  ) | (
+    (options: {
+      type: 'getExperimentMaster';
+      experimentId: ExperimentId;
+    }) => Promise<Master | null>
   ) | (
     (options: {
       type: 'getExperimentReportInfo';
@@ -47,6 +80,35 @@ export type RequestFunc = UnionToIntersection<
       eventIndices: ExperimentReportEventIndex[];
       experimentId: ExperimentId;
     }) => Promise<ExperimentReportEvents>
+  ) | (
+    (options: {
+      type: 'getMasterAnalysis';
+      experimentId: ExperimentId;
+      kind: MasterAnalysisItemKind;
+      limit: number;
+      offset?: number;
+    }) => Promise<{
+      items: MasterAnalysis[MasterAnalysisItemKind];
+      totalCount: number;
+    }>
+  ) | (
+    (options: { type: 'getStartupProfile'; }) => Promise<StartupProfile>
+  ) | (
+    (options: {
+      type: 'listExperiments';
+      archived?: boolean;
+      limit: number;
+      offset?: number;
+      query?: string;
+    }) => Promise<{
+      experiments: ExperimentCatalogEntry[];
+      totalCount: number;
+    }>
+  ) | (
+    (options: {
+      type: 'loadExperiment';
+      experimentId: ExperimentId;
+    }) => Promise<Experiment | null>
   ) | (
     (options: {
       type: 'reloadUnits';
@@ -91,6 +153,9 @@ export type RequestFunc = UnionToIntersection<
 >;
 
 
+export type MessageEncoding = 'binary' | 'json';
+export type SocketFraming = 'lengthPrefixed' | 'newline';
+
 export namespace ClientProtocol {
   export interface ChannelMessage {
     type: 'channel';
@@ -98,17 +163,27 @@ export namespace ClientProtocol {
     data: unknown;
   }
 
+  export interface EncodingMessage {
+    type: 'encoding';
+    encoding: MessageEncoding;
+  }
+
   export interface ExitMessage {
     type: 'exit';
   }
 
+  export interface FramingMessage {
+    type: 'framing';
+    framing: SocketFraming;
+  }
+
   export interface RequestMessage {
     type: 'request';
     id: number;
     data: unknown;
   }
 
-  export type Message = ChannelMessage | ExitMessage | RequestMessage;
+  export type Message = ChannelMessage | EncodingMessage | ExitMessage | FramingMessage | RequestMessage;
 }
 
 export namespace ServerProtocol {
@@ -118,9 +193,21 @@ export namespace ServerProtocol {
     data: unknown;
   }
 
+  export interface EncodingMessage {
+    type: 'encoding';
+    encoding: MessageEncoding;
+  }
+
+  export interface FramingMessage {
+    type: 'framing';
+    framing: SocketFraming;
+  }
+
   export interface InitializationMessage {
     type: 'initialize';
     clientId: ClientId;
+    encodings: MessageEncoding[];
+    framings: SocketFraming[];
     identifier: HostIdentifier;
     staticUrl: string | null;
     version: number;
@@ -135,7 +222,15 @@ export namespace ServerProtocol {
   export interface StateMessage {
     type: 'state';
     data: HostState;
+    revision: number;
+  }
+
+  export interface StatePatchMessage {
+    type: 'statePatch';
+    baseRevision: number;
+    patch: HostStatePatchOperation[];
+    revision: number;
   }
 
-  export type Message = ChannelMessage | InitializationMessage | ResponseMessage | StateMessage;
+  export type Message = ChannelMessage | EncodingMessage | FramingMessage | InitializationMessage | ResponseMessage | StateMessage | StatePatchMessage;
 }
@@ -17,6 +17,14 @@ export interface Experiment {
   title: string;
 }
 
+export interface ExperimentCatalogEntry {
+  id: ExperimentId;
+  archived: boolean;
+  creationDate: number;
+  hasReport: boolean;
+  title: string;
+}
+
 export interface ExperimentReportInfo {
   draft: any;
   endDate: number;
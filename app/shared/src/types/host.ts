@@ -1,4 +1,5 @@
 import { Experiment, ExperimentId } from './experiment';
+import type { MasterAnalysisDiff, MasterLocationDiff } from './master';
 import type { PluginName } from './plugin';
 import type { PluginInfo } from './unit';
 import type { Brand } from './util';
@@ -17,5 +18,26 @@ export interface HostState {
   };
 
   executors: Record<PluginName, unknown>;
+
+  // Only experiments loaded by the host, such as running experiments, other experiments are listed with the 'listExperiments' request
   experiments: Record<ExperimentId, Experiment>;
 }
+
+export type HostStatePatchOperation = {
+  op: 'add' | 'replace';
+  path: string;
+  value: unknown;
+} | {
+  op: 'remove';
+  path: string;
+} | {
+  op: 'locationDiff';
+  path: string;
+  value: MasterLocationDiff & {
+    revision: number;
+  };
+} | {
+  op: 'masterAnalysisDiff';
+  path: string;
+  value: MasterAnalysisDiff;
+};
@@ -17,10 +17,28 @@ export interface MasterBlockLocation {
 }
 
 
+export type MasterBlockIndex = number;
+
+export interface MasterRuntimeBlockLocation extends MasterBlockLocation {
+  children: Record<MasterBlockId, MasterRuntimeBlockLocation>;
+  childId: MasterBlockId;
+  entryIndex: MasterBlockIndex;
+  parentEntryIndex: MasterBlockIndex;
+}
+
+export type MasterRuntimeBlockLocationEntry = Omit<MasterRuntimeBlockLocation, 'children'>;
+
+export interface MasterLocationDiff {
+  baseRevision: number;
+  entries: Record<MasterBlockIndex, MasterRuntimeBlockLocationEntry | null>;
+}
+
+
 export interface Master {
   id: MasterId;
   initialAnalysis: CompilationAnalysis;
-  location: MasterBlockLocation;
+  location: MasterRuntimeBlockLocation;
+  locationRevision: number;
   masterAnalysis: MasterAnalysis;
   protocol: Protocol;
   startDate: number;
@@ -32,10 +50,18 @@ export interface MasterAnalysis {
   warnings: MasterDiagnostic[];
 }
 
+export type MasterAnalysisItemKind = keyof MasterAnalysis;
+
+// Items which were added or whose occurrence count changed, by index
+export type MasterAnalysisDiff = {
+  [Kind in MasterAnalysisItemKind]: Record<number, MasterAnalysis[Kind][number]>;
+};
+
 export type MasterItem<T> = Omit<T, 'runtimeInfo'> & {
   runtimeInfo: {
     authorPath: number[];
     eventIndex: number;
+    occurrenceCount: number;
   };
 }
 
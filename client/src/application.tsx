@@ -130,7 +130,7 @@ export class Application extends Component<ApplicationProps, ApplicationState> {
     this.pool.add(() => client.start());
 
     client.onMessage((message) => {
-      if (message.type === 'state') {
+      if ((message.type === 'state') || (message.type === 'statePatch')) {
         console.log('New state ->', client.state);
 
         this.setState((state) => ({
@@ -1,4 +1,4 @@
-import { ExperimentId } from 'pr1-shared';
+import { ExperimentCatalogEntry, ExperimentId } from 'pr1-shared';
 import { useEffect, useRef, useState } from 'react';
 
 import descriptionStyles from '../../../styles/components/description.module.scss';
@@ -8,6 +8,7 @@ import * as Form from '../standard-form';
 import { Host } from '../../host';
 
 
+const ListedExperimentCount = 50;
 const NewExperimentOptionId = '_new' as const;
 
 export function StartProtocolModal(props: {
@@ -21,10 +22,34 @@ export function StartProtocolModal(props: {
     newExperimentTitle: string | null;
   }): void;
 }) {
-  let experiments = Object.values(props.host.state.experiments);
-  let [experimentId, setExperimentId] = useState<ExperimentId | typeof NewExperimentOptionId>(
-    experiments.find((experiment) => !experiment.master)?.id ?? NewExperimentOptionId
-  );
+  let [experiments, setExperiments] = useState<ExperimentCatalogEntry[]>([]);
+  let [experimentId, setExperimentId] = useState<ExperimentId | typeof NewExperimentOptionId>(NewExperimentOptionId);
+
+  // Only loaded experiments are in the host state, which is however needed to know whether an experiment is running
+  let isExperimentRunning = (experimentId: ExperimentId) => !!props.host.state.experiments[experimentId]?.master;
+
+  useEffect(() => {
+    let cancelled = false;
+
+    props.host.client.request({
+      type: 'listExperiments',
+      archived: false,
+      limit: ListedExperimentCount
+    }).then((result) => {
+      if (!cancelled) {
+        setExperiments(result.experiments);
+        setExperimentId((currentExperimentId) =>
+          (currentExperimentId === NewExperimentOptionId)
+            ? (result.experiments.find((experiment) => !isExperimentRunning(experiment.id))?.id ?? NewExperimentOptionId)
+            : currentExperimentId
+        );
+      }
+    });
+
+    return () => {
+      cancelled = true;
+    };
+  }, []);
 
   let [newExperimentTitle, setNewExperimentTitle] = useState<string>('');
   let refNewExperimentTitleInput = useRef<HTMLInputElement>(null);
@@ -62,7 +87,7 @@ export function StartProtocolModal(props: {
             ...experiments.map((experiment) => ({
               id: experiment.id,
               label: experiment.title,
-              disabled: experiment.master
+              disabled: isExperimentRunning(experiment.id)
             })),
             { id: ('_header2' as ExperimentId), label: 'New experiment', disabled: true },
             { id: NewExperimentOptionId, label: 'New experiment' }
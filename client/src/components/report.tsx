@@ -29,10 +29,12 @@ export function ReportDiagnostic(props: {
   diagnostic: AnyDiagnostic;
   kind: 'error' | 'warning';
 }) {
+  let occurrenceCount = (props.diagnostic.runtimeInfo?.occurrenceCount ?? 1);
+
   return (
     <div className={styles.entryRoot} data-kind={props.kind}>
       <Icon name={{ error: 'report', warning: 'warning' }[props.kind]} className={styles.entryIcon} />
-      <div className={styles.entryTitle}>{props.diagnostic.message}</div>
+      <div className={styles.entryTitle}>{props.diagnostic.message}{(occurrenceCount > 1) && ` (×${occurrenceCount})`}</div>
       {/* <button type="button" className={styles.entryLocation}>5 minutes ago</button> */}
       {props.diagnostic.description && (
         <p className={styles.entryDescription}>{formatRichText(props.diagnostic.description)}</p>
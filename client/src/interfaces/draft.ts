@@ -19,6 +19,7 @@ export interface HostDraftDocument {
 }
 
 export interface HostDraftCompilerOptions {
+  profile?: boolean;
   trusted: boolean;
 }
 
@@ -26,6 +27,7 @@ export interface HostDraftCompilerOptions {
 export interface HostDraftCompilerResult {
   analysis: DraftLanguageAnalysis;
   missingDocumentPaths: DocumentPath[];
+  profile: HostDraftCompilationProfileEntry[] | null;
   protocol: Protocol | null;
   valid: boolean;
 
@@ -35,6 +37,14 @@ export interface HostDraftCompilerResult {
   } | null;
 }
 
+export interface HostDraftCompilationProfileEntry {
+  callCount: number;
+  namespace: string;
+  operation: string;
+  selfTime: number;
+  totalTime: number;
+}
+
 export interface HostDraftMark {
   childrenMarks: Record<number, HostDraftMark>;
   childrenOffsets: Record<number, Term>;
@@ -318,11 +318,21 @@ export class ViewDraft extends Component<ViewDraftProps, ViewDraftState> {
   override componentWillUnmount() {
     this.controller.abort();
 
+    let documentIds = this.state.documentItems.valueSeq().map((documentItem) => documentItem.slotSnapshot.id).toArray();
+
     for (let documentItem of this.state.documentItems.values()) {
       documentItem.controller.abort();
       documentItem.textModel?.dispose();
       documentItem.textModel = null;
     }
+
+    // Let the host release the previous revisions of the draft's documents
+    this.pool.add(async () => {
+      await this.props.host.client.request({
+        type: 'discardDraft',
+        documentIds
+      });
+    });
   }
 
 
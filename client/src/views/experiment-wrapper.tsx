@@ -5,6 +5,7 @@ import { ViewHashOptions, ViewProps } from '../interfaces/view';
 import { BaseUrl } from '../constants';
 import { ViewExperiment } from './experiment';
 import { ViewExecution } from './execution';
+import { Pool } from '../util';
 
 
 export interface ViewExperimentWrapperRoute {
@@ -23,6 +24,9 @@ export interface ViewExperimentWrapperState {
 }
 
 export class ViewExperimentWrapper extends Component<ViewExperimentWrapperProps, ViewExperimentWrapperState> {
+  private loadingExperimentId: ExperimentId | null = null;
+  private pool = new Pool();
+
   constructor(props: ViewExperimentWrapperProps) {
     super(props);
 
@@ -34,9 +38,24 @@ export class ViewExperimentWrapper extends Component<ViewExperimentWrapperProps,
   }
 
   componentDidRender() {
-    if (!this.experiment) {
-      ViewExperiments.navigate();
-      return;
+    let experimentId = this.props.route.params.experimentId;
+
+    if (this.experiment) {
+      this.loadingExperimentId = null;
+    } else if (this.loadingExperimentId !== experimentId) {
+      // Experiments not loaded by the host are missing from the host state until loaded
+      this.loadingExperimentId = experimentId;
+
+      this.pool.add(async () => {
+        let experiment = await this.props.host.client.request({
+          type: 'loadExperiment',
+          experimentId
+        });
+
+        if (!experiment) {
+          ViewExperiments.navigate();
+        }
+      });
     }
   }
 
@@ -1,9 +1,10 @@
+import { ExperimentCatalogEntry } from 'pr1-shared';
 import { Component } from 'react';
-import seqOrd from 'seq-ord';
 
 import viewStyles from '../../styles/components/view.module.scss';
 
 import { ContextMenuArea } from '../components/context-menu-area';
+import * as Form from '../components/standard-form';
 import { TitleBar } from '../components/title-bar';
 import { BaseUrl } from '../constants';
 import { ViewProps } from '../interfaces/view';
@@ -12,14 +13,68 @@ import { Pool } from '../util';
 import { formatTimeDifference } from '../format';
 
 
-export class ViewExperiments extends Component<ViewProps> {
+const PageSize = 50;
+
+export interface ViewExperimentsState {
+  entries: ExperimentCatalogEntry[] | null;
+  query: string;
+  totalCount: number;
+}
+
+export class ViewExperiments extends Component<ViewProps, ViewExperimentsState> {
   pool = new Pool();
 
+  // Incremented to ignore responses to outdated requests
+  private listingRevision = 0;
+
+  constructor(props: ViewProps) {
+    super(props);
+
+    this.state = {
+      entries: null,
+      query: '',
+      totalCount: 0
+    };
+  }
+
+  override componentDidMount() {
+    this.list();
+  }
+
+  override componentDidUpdate(prevProps: ViewProps) {
+    // Refresh the list when an experiment is created or deleted
+    let prevExperimentIds = Object.keys(prevProps.host.state.experiments);
+    let experimentIds = Object.keys(this.props.host.state.experiments);
+
+    if ((experimentIds.length !== prevExperimentIds.length) || experimentIds.some((experimentId) => !(experimentId in prevProps.host.state.experiments))) {
+      this.list({ count: Math.max(this.state.entries?.length ?? 0, PageSize) });
+    }
+  }
+
+  list(options?: { append?: boolean; count?: number; query?: string; }) {
+    let append = options?.append ?? false;
+    let query = options?.query ?? this.state.query;
+    let listingRevision = ++this.listingRevision;
+
+    this.pool.add(async () => {
+      let result = await this.props.host.client.request({
+        type: 'listExperiments',
+        limit: (options?.count ?? PageSize),
+        offset: (append ? (this.state.entries?.length ?? 0) : 0),
+        query: (query.trim() || undefined)
+      });
+
+      if (listingRevision === this.listingRevision) {
+        this.setState((state) => ({
+          entries: [...((append && state.entries) || []), ...result.experiments],
+          totalCount: result.totalCount
+        }));
+      }
+    });
+  }
+
   override render() {
-    let experiments = Object.values(this.props.host.state.experiments).sort(seqOrd(function* (a, b, rules) {
-      yield rules.numeric(b.creationDate, a.creationDate);
-      yield rules.text(a.title, b.title);
-    }));
+    let entries = this.state.entries ?? [];
 
     return (
       <main className={viewStyles.root}>
@@ -29,14 +84,23 @@ export class ViewExperiments extends Component<ViewProps> {
             <h1>Experiments</h1>
           </header>
 
-          {/* <div className="header header--2">
-            <h2>Active experiments</h2>
-          </div> */}
+          <Form.TextField
+            label="Search"
+            onInput={(query) => {
+              this.setState({ query });
+              this.list({ query });
+            }}
+            placeholder="Experiment title"
+            value={this.state.query} />
 
-          {(experiments.length > 0)
+          {(entries.length > 0)
             ? (
               <div className="clist-root">
-                {experiments.map((experiment) => {
+                {entries.map((entry) => {
+                  // Loaded experiments are kept up to date in the host state
+                  let experiment = this.props.host.state.experiments[entry.id];
+                  let title = experiment?.title ?? entry.title;
+
                   return (
                     <ContextMenuArea
                       createMenu={(_event) => [
@@ -48,34 +112,37 @@ export class ViewExperiments extends Component<ViewProps> {
 
                         switch (command) {
                           case 'delete':
-                            this.pool.add(async () =>
-                              void await this.props.host.client.request({
+                            this.pool.add(async () => {
+                              await this.props.host.client.request({
                                 type: 'deleteExperiment',
-                                experimentId: experiment.id,
+                                experimentId: entry.id,
                                 trash: true
-                              })
-                            );
+                              });
+
+                              this.list({ count: Math.max(entries.length, PageSize) });
+                            });
+
                             break;
                           case 'reveal':
                             this.pool.add(async () =>
                               void await this.props.host.client.request({
                                 type: 'revealExperimentDirectory',
-                                experimentId: experiment.id
+                                experimentId: entry.id
                               })
                             );
                             break;
                         }
                       }}
-                      key={experiment.id}>
-                      <a href={`${BaseUrl}/experiment/${experiment.id}`} className="clist-entrywide">
+                      key={entry.id}>
+                      <a href={`${BaseUrl}/experiment/${entry.id}`} className="clist-entrywide">
                         <div className="clist-header">
-                          <div className="clist-title">{experiment.title}</div>
+                          <div className="clist-title">{title}</div>
                         </div>
                         <dl className="clist-data">
                           <dt>Created</dt>
-                          <dd>{formatTimeDifference(experiment.creationDate - Date.now())}</dd>
+                          <dd>{formatTimeDifference(entry.creationDate - Date.now())}</dd>
                           <dt>Protocol</dt>
-                          <dd>{experiment.master?.protocol.name ?? 'Idle'}</dd>
+                          <dd>{experiment?.master?.protocol.name ?? 'Idle'}</dd>
                         </dl>
                       </a>
                     </ContextMenuArea>
@@ -85,9 +152,15 @@ export class ViewExperiments extends Component<ViewProps> {
             )
             : (
               <div className="clist-blank">
-                <p>No experiment</p>
+                <p>{this.state.entries ? 'No experiment' : 'Loading'}</p>
               </div>
             )}
+
+          {(entries.length < this.state.totalCount) && (
+            <button type="button" className="btn" onClick={() => void this.list({ append: true })}>
+              Show more ({this.state.totalCount - entries.length} remaining)
+            </button>
+          )}
         </div>
       </main>
     )
@@ -1 +1,6 @@
-from pr1 import *
+import pr1
+
+
+# Names are resolved lazily, as for the pr1 package itself
+def __getattr__(name: str):
+  return getattr(pr1, name)
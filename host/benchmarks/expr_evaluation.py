@@ -0,0 +1,66 @@
+# Measures the time taken to evaluate expressions typical of protocols with repeats and shorthands, through all phases.
+#
+# Usage: python benchmarks/expr_evaluation.py [evaluation count]
+
+import ast
+import sys
+import time
+
+from pr1 import reader
+from pr1.fiber.eval import EvalContext, EvalEnv, EvalEnvValue, EvalSymbol
+from pr1.fiber.expr import PythonExprObject
+from pr1.staticanalysis.expr import DeferredExprDef
+from pr1.ureg import ureg
+
+
+EXPRESSIONS = [
+  "(index + 1) * 10 * unit.ms",
+  "index * volume / 4",
+  "volume * (1 + index % 3) if index else volume",
+  "[volume, volume * 2, volume * 3][index % 3]",
+  "2 * 3 + 4",
+  "f\"sample_{index}_{outer}\""
+]
+
+GLOBAL_SYMBOL = EvalSymbol(0)
+OUTER_SYMBOL = EvalSymbol(1)
+REPEAT_SYMBOL = EvalSymbol(2)
+
+
+def create_envs():
+  return [
+    EvalEnv({
+      'unit': EvalEnvValue(lambda node: DeferredExprDef('unit', node=node, phase=0, symbol=GLOBAL_SYMBOL)),
+      'volume': EvalEnvValue(lambda node: DeferredExprDef('volume', node=node, phase=0, symbol=GLOBAL_SYMBOL))
+    }, symbol=GLOBAL_SYMBOL),
+    EvalEnv({
+      'outer': EvalEnvValue(lambda node: DeferredExprDef('outer', node=node, phase=1, symbol=OUTER_SYMBOL))
+    }, symbol=OUTER_SYMBOL),
+    EvalEnv({
+      'index': EvalEnvValue(lambda node: DeferredExprDef('index', node=node, phase=2, symbol=REPEAT_SYMBOL))
+    }, symbol=REPEAT_SYMBOL)
+  ]
+
+
+def main():
+  evaluation_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+  envs = create_envs()
+
+  for source in EXPRESSIONS:
+    contents = reader.LocatedString(source, reader.LocationArea())
+    evaluable = PythonExprObject(contents, ast.parse(source, mode='eval'), envs=envs).analyze()[1]
+
+    start_time = time.perf_counter()
+
+    for index in range(evaluation_count):
+      _, result = evaluable.evaluate(EvalContext({ GLOBAL_SYMBOL: { 'unit': ureg, 'volume': 5.0 } }))
+      _, result = result.evaluate(EvalContext({ OUTER_SYMBOL: { 'outer': 'a' } }))
+      _, result = result.evaluate(EvalContext({ REPEAT_SYMBOL: { 'index': index } }))
+
+    end_time = time.perf_counter()
+
+    print(f"{(end_time - start_time) / evaluation_count * 1e6:8.2f} µs  {source}")
+
+
+if __name__ == "__main__":
+  main()
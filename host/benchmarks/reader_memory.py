@@ -0,0 +1,56 @@
+# Measures the memory retained by the location metadata of a large generated protocol.
+#
+# Usage: python benchmarks/reader_memory.py [step count]
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from pr1 import reader
+
+
+def generate_protocol(step_count: int):
+  output = "name: Generated protocol\n\nsteps:\n  actions:\n"
+
+  for index in range(step_count):
+    output += f"    # Step no. {index + 1}\n"
+    output += f"    - name: Step no. {index + 1}\n"
+    output += f"      repeat: {index % 5 + 1}\n"
+    output += f"      actions:\n"
+    output += f"        - wait: {index % 60 + 1} sec\n"
+    output += f"        - Mock.valueFloat: {index * 0.5} ul/min\n"
+    output += f"          wait: 1 min\n"
+
+  return output
+
+
+def main():
+  step_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+  contents = generate_protocol(step_count)
+
+  start_time = time.time()
+  reader.loads(reader.Source(contents))
+  end_time = time.time()
+
+  # Measure memory on a second run as tracing slows down allocations
+  gc.collect()
+  tracemalloc.start()
+
+  source = reader.Source(contents)
+  result, errors, warnings = reader.loads(source)
+
+  gc.collect()
+  current_size, peak_size = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+
+  assert not errors
+
+  print(f"Lines:     {len(source._line_cumlengths) - 1}")
+  print(f"Time:      {(end_time - start_time) * 1000:.1f} ms")
+  print(f"Retained:  {current_size / 1e6:.2f} MB")
+  print(f"Peak:      {peak_size / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+  main()
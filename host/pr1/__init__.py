@@ -1,39 +1,100 @@
+import importlib
+import importlib.util
 import logging
+import sys
 
 logger = logging.getLogger("pr1.host")
 
-from .analysis import *
-from .devices.claim import *
-from .devices.nodes.collection import *
-from .devices.nodes.common import *
-from .devices.nodes.numeric import *
-from .devices.nodes.primitive import *
-from .devices.nodes.readable import *
-from .devices.nodes.value import *
-from .devices.nodes.watcher import *
-from .error import *
-from .eta import *
-from .host import *
-from .input import *
-from .input.dynamic import *
-from .input.file import *
-from .langservice import *
-from .master.analysis import *
-from .plugin.manager import *
-from .procedure import *
-from .rich_text import *
-from .staticanalysis.expr import *
-from .staticanalysis.expression import *
-from .staticanalysis.support import *
-from .staticanalysis.types import *
-from .units.base import *
-from .ureg import *
-from .util.asyncio import *
-from .util.decorators import *
-from .util.misc import *
-from .util.pool import *
-
-from .fiber.expr import *
-from .fiber.master2 import *
-from .fiber.parser import *
-from .fiber.process import *
+from .profiler import startup_profiler
+
+# The unit registry is imported eagerly because importing the 'ureg' submodule would otherwise replace it with the submodule
+from .ureg import ureg
+
+
+# Modules whose exports are available as attributes of this package. They are only imported when one of their exports is first accessed, such that tools which only need a subsystem, such as the reader or the static analyzer, do not import the whole runtime.
+_LAZY_MODULES = [
+  '.analysis',
+  '.devices.claim',
+  '.devices.nodes.collection',
+  '.devices.nodes.common',
+  '.devices.nodes.numeric',
+  '.devices.nodes.primitive',
+  '.devices.nodes.readable',
+  '.devices.nodes.value',
+  '.devices.nodes.watcher',
+  '.error',
+  '.eta',
+  '.host',
+  '.input',
+  '.input.dynamic',
+  '.input.file',
+  '.langservice',
+  '.master.analysis',
+  '.plugin.manager',
+  '.procedure',
+  '.profiler',
+  '.rich_text',
+  '.staticanalysis.expr',
+  '.staticanalysis.expression',
+  '.staticanalysis.support',
+  '.staticanalysis.types',
+  '.units.base',
+  '.ureg',
+  '.util.asyncio',
+  '.util.decorators',
+  '.util.misc',
+  '.util.pool',
+
+  '.fiber.expr',
+  '.fiber.master2',
+  '.fiber.parser',
+  '.fiber.process'
+]
+
+# Names exported by several modules, which resolve to the last of these modules as with star imports
+_LAZY_OVERRIDES = {
+  'BaseParser': '.fiber.parser',
+  'ProcessProgram': '.fiber.process',
+  'ProcessProgramMode': '.fiber.process'
+}
+
+
+def _import_lazy_module(module_name: str, /):
+  if (module := sys.modules.get(__name__ + module_name)):
+    return module
+
+  with startup_profiler.measure('import', __name__ + module_name):
+    return importlib.import_module(module_name, __name__)
+
+def __getattr__(name: str):
+  # Computing __all__ requires importing all modules, which is only necessary for star imports
+  if name == '__all__':
+    exports = {'logger'}
+
+    for module_name in _LAZY_MODULES:
+      exports |= set(_import_lazy_module(module_name).__all__)
+
+    value = sorted(exports)
+  elif name.startswith('_'):
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+  elif (module_name := _LAZY_OVERRIDES.get(name)):
+    value = getattr(_import_lazy_module(module_name), name)
+
+  # Let submodules, such as 'reader', be imported without importing other modules
+  elif importlib.util.find_spec(f"{__name__}.{name}"):
+    value = _import_lazy_module(f".{name}")
+  else:
+    for module_name in _LAZY_MODULES:
+      module = _import_lazy_module(module_name)
+
+      if name in module.__all__:
+        value = getattr(module, name)
+        break
+    else:
+      raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+  globals()[name] = value
+  return value
+
+def __dir__():
+  return sorted({*globals().keys(), *__getattr__('__all__')})
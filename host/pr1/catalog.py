@@ -0,0 +1,154 @@
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from . import logger as parent_logger
+from .experiment import Experiment, ExperimentId
+
+
+logger = parent_logger.getChild("catalog")
+
+
+@dataclass(frozen=True, kw_only=True)
+class ExperimentCatalogEntry:
+  archived: bool
+  creation_time: float
+  has_report: bool
+  id: ExperimentId
+  title: str
+
+  def export(self):
+    return {
+      "id": self.id,
+      "archived": self.archived,
+      "creationDate": (self.creation_time * 1000),
+      "hasReport": self.has_report,
+      "title": self.title
+    }
+
+
+class ExperimentCatalog:
+  def __init__(self, experiments_path: Path, /):
+    """
+    Opens the catalog of experiments stored in a directory.
+
+    The catalog is an index of the summary of each experiment, stored in a SQLite database in the same directory, such that experiments can be listed and searched without being loaded. Experiments created or deleted while the host was not running are added to or removed from the catalog when it is opened.
+
+    Parameters
+      experiments_path: The path of the directory containing experiments.
+    """
+
+    self._connection = sqlite3.connect(experiments_path / ".catalog.sqlite")
+    self._connection.execute("""
+      CREATE TABLE IF NOT EXISTS experiments (
+        id TEXT PRIMARY KEY,
+        archived INTEGER NOT NULL,
+        creation_time REAL NOT NULL,
+        has_report INTEGER NOT NULL,
+        title TEXT NOT NULL
+      )
+    """)
+
+    self._experiments_path = experiments_path
+    self._synchronize()
+
+  def __len__(self):
+    return self._connection.execute("SELECT COUNT(*) FROM experiments").fetchone()[0]
+
+  def __contains__(self, experiment_id: ExperimentId, /):
+    return self._connection.execute("SELECT 1 FROM experiments WHERE id = ?", (experiment_id,)).fetchone() is not None
+
+  def _synchronize(self):
+    catalog_ids = {row[0] for row in self._connection.execute("SELECT id FROM experiments")}
+    directory_ids = {path.name for path in self._experiments_path.iterdir() if path.is_dir() and not path.name.startswith(".")}
+
+    added_count = 0
+
+    for experiment_id in directory_ids - catalog_ids:
+      if (experiment := Experiment.try_unserialize(self._experiments_path / experiment_id)):
+        self.put(experiment, commit=False)
+        added_count += 1
+
+    removed_ids = catalog_ids - directory_ids
+    self._connection.executemany("DELETE FROM experiments WHERE id = ?", [(experiment_id,) for experiment_id in removed_ids])
+    self._connection.commit()
+
+    if added_count or removed_ids:
+      logger.debug(f"Synchronized catalog, added {added_count} and removed {len(removed_ids)} experiments")
+
+  def close(self):
+    self._connection.close()
+
+  def get(self, experiment_id: ExperimentId, /):
+    row = self._connection.execute("SELECT id, archived, creation_time, has_report, title FROM experiments WHERE id = ?", (experiment_id,)).fetchone()
+    return self._create_entry(row) if row else None
+
+  def list_entries(self, *, archived: Optional[bool] = None, limit: int, offset: int = 0, query: Optional[str] = None):
+    """
+    Lists experiments, most recent first.
+
+    Parameters
+      archived: Whether to only list archived or non-archived experiments, or `None` to list both.
+      limit: The maximum number of experiments to return.
+      offset: The number of experiments to skip.
+      query: A text which must be contained in the title of returned experiments, case-insensitively.
+
+    Returns
+      A tuple containing the returned entries and the total number of experiments matching the filters.
+    """
+
+    conditions = list[str]()
+    parameters = list[object]()
+
+    if archived is not None:
+      conditions.append("archived = ?")
+      parameters.append(int(archived))
+
+    if query:
+      conditions.append("title LIKE ? ESCAPE '\\'")
+      parameters.append("%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+
+    where_clause = (" WHERE " + " AND ".join(conditions)) if conditions else str()
+
+    total_count: int = self._connection.execute(f"SELECT COUNT(*) FROM experiments{where_clause}", parameters).fetchone()[0]
+    rows = self._connection.execute(
+      f"SELECT id, archived, creation_time, has_report, title FROM experiments{where_clause} ORDER BY creation_time DESC, title LIMIT ? OFFSET ?",
+      [*parameters, limit, offset]
+    ).fetchall()
+
+    return [self._create_entry(row) for row in rows], total_count
+
+  def put(self, experiment: Experiment, /, *, commit: bool = True):
+    """
+    Adds an experiment to the catalog or updates its entry.
+    """
+
+    self._connection.execute(
+      "INSERT OR REPLACE INTO experiments (id, archived, creation_time, has_report, title) VALUES (?, ?, ?, ?, ?)",
+      (experiment.id, int(experiment.archived), experiment.creation_time, int(experiment.has_report), experiment.title)
+    )
+
+    if commit:
+      self._connection.commit()
+
+  def remove(self, experiment_id: ExperimentId, /):
+    self._connection.execute("DELETE FROM experiments WHERE id = ?", (experiment_id,))
+    self._connection.commit()
+
+  def _create_entry(self, row: tuple, /):
+    experiment_id, archived, creation_time, has_report, title = row
+
+    return ExperimentCatalogEntry(
+      archived=bool(archived),
+      creation_time=creation_time,
+      has_report=bool(has_report),
+      id=ExperimentId(experiment_id),
+      title=title
+    )
+
+
+__all__ = [
+  'ExperimentCatalog',
+  'ExperimentCatalogEntry'
+]
@@ -1,13 +1,23 @@
+import asyncio
+from asyncio import Future, Task
+from collections import OrderedDict
 from comserde import serializable
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
 from dataclasses import dataclass
 import functools
+import json
 from pathlib import PurePosixPath
+import threading
 from typing import Any, Optional, TYPE_CHECKING
 
+from . import logger
 from .document import Document
+from .util.misc import fast_hash
 
 if TYPE_CHECKING:
   from .fiber.parser import FiberProtocol, GlobalContext
+  from .fiber.profiler import CompilationProfiler
   from .input import LanguageServiceAnalysis
   from .host import Host
 
@@ -23,19 +33,29 @@ class Draft:
   def entry_document(self):
     return next(document for document in self.documents if document.id == self.entry_document_id)
 
-  def compile(self, *, host: 'Host'):
+  @functools.cached_property
+  def hash(self):
+    return fast_hash(json.dumps({
+      "documents": [[document.id, str(document.path), document.contents] for document in self.documents],
+      "entryDocumentId": self.entry_document_id,
+      "id": self.id
+    }))
+
+  def compile(self, *, host: 'Host', profile: bool = False):
     from .fiber.parser import FiberParser
 
     parser = FiberParser(
       draft=self,
       host=host,
-      Parsers=host.manager.Parsers
+      Parsers=host.manager.Parsers,
+      profile=profile
     )
 
     return DraftCompilation(
       analysis=parser.analysis,
       document_paths={self.entry_document.path},
       draft_id=self.id,
+      profiler=parser.profiler,
       protocol=parser.protocol
     )
 
@@ -62,6 +82,7 @@ class DraftCompilation:
   analysis: 'LanguageServiceAnalysis'
   document_paths: set[PurePosixPath]
   draft_id: str
+  profiler: 'Optional[CompilationProfiler]' = None
   protocol: 'Optional[FiberProtocol]'
 
   def export(self, context: 'GlobalContext'):
@@ -79,6 +100,178 @@ class DraftCompilation:
         "warnings": [warning.export() for warning in self.analysis.warnings]
       },
       "missingDocumentPaths": [], # str(path).split("/") for path in self.document_paths],
+      "profile": self.profiler and self.profiler.export(),
       "protocol": self.protocol and self.protocol.export(context),
       "valid": (not self.analysis.errors)
     }
+
+
+# Approximate memory used by a compilation for each character of its documents, as measured on generated protocols
+COMPILATION_SIZE_PER_CHARACTER = 250
+
+class DraftCompilationCache:
+  def __init__(self, *, max_size: int):
+    """
+    Creates a least-recently-used cache of draft compilations.
+
+    Compilations are identified by the contents of their draft and by the revision of the plugin manager used to compile them.
+
+    Parameters
+      max_size: The maximum estimated memory used by cached compilations, in bytes.
+    """
+
+    self.max_size = max_size
+
+    self._entries = OrderedDict[str, tuple[DraftCompilation, int]]()
+    self._lock = threading.Lock()
+    self._size = 0
+
+  def clear(self):
+    with self._lock:
+      self._entries.clear()
+      self._size = 0
+
+  def compile(self, draft: Draft, *, host: 'Host', profile: bool = False):
+    """
+    Compiles a draft or returns its cached compilation.
+
+    Profiled compilations are never retrieved from nor stored in the cache, as their measurements would otherwise be meaningless.
+    """
+
+    if profile:
+      return draft.compile(host=host, profile=True)
+
+    key = f"{host.manager.revision}:{draft.hash}"
+
+    with self._lock:
+      if (entry := self._entries.get(key)):
+        self._entries.move_to_end(key)
+        logger.debug(f"Reusing compilation of draft '{draft.id}'")
+
+        return entry[0]
+
+    compilation = draft.compile(host=host)
+    size = sum(len(document.contents) for document in draft.documents) * COMPILATION_SIZE_PER_CHARACTER
+
+    if size <= self.max_size:
+      with self._lock:
+        self._entries[key] = (compilation, size)
+        self._size += size
+
+        while self._size > self.max_size:
+          _, (_, evicted_size) = self._entries.popitem(last=False)
+          self._size -= evicted_size
+
+    return compilation
+
+
+@dataclass
+class DraftCompilerItem:
+  draft: Draft
+  futures: list[Future[DraftCompilation]]
+  profile: bool = False
+
+class DraftCompiler:
+  def __init__(self, cache: DraftCompilationCache, *, host: 'Host'):
+    """
+    Creates a compiler which compiles drafts in a worker thread, outside of the event loop.
+
+    Compilations run one at a time. The thread still shares the interpreter lock with the event loop, but releases it regularly, which keeps the loop responsive during long compilations.
+
+    Parameters
+      cache: The cache used to retrieve and store compilations.
+    """
+
+    self._cache = cache
+    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Draft compiler")
+    self._host = host
+    self._lock = asyncio.Lock()
+
+    self._queued_items = dict[str, DraftCompilerItem]()
+    self._running_draft_ids = set[str]()
+    self._tasks = set[Task[None]]()
+
+  async def compile(self, draft: Draft, *, profile: bool = False, supersede: bool = True):
+    """
+    Compiles a draft in the worker thread.
+
+    Parameters
+      draft: The draft to compile.
+      profile: Whether to profile the compilation. The profile is also provided to requests superseded by this one.
+      supersede: Whether the compilation can be superseded. When `True`, at most one compilation per draft id runs at a time, and a request which is still waiting for a previous compilation of the same draft is resolved with the compilation of the latest request instead.
+
+    Returns
+      The draft's compilation.
+    """
+
+    if not supersede:
+      return await self._compile(draft, profile=profile)
+
+    future = Future[DraftCompilation]()
+
+    if (item := self._queued_items.get(draft.id)):
+      logger.debug(f"Superseding queued compilation of draft '{draft.id}'")
+
+      item.draft = draft
+      item.futures.append(future)
+      item.profile = item.profile or profile
+    else:
+      self._queued_items[draft.id] = DraftCompilerItem(draft, [future], profile)
+
+      if not (draft.id in self._running_draft_ids):
+        self._start(draft.id)
+
+    return await asyncio.shield(future)
+
+  @contextlib.asynccontextmanager
+  async def suspend(self):
+    """
+    Waits for the running compilation, if any, and prevents compilations from starting until the context exits.
+
+    This is used to modify the state of the host on which compilations depend, such as its plugins.
+    """
+
+    async with self._lock:
+      yield
+
+  async def _compile(self, draft: Draft, *, profile: bool = False):
+    loop = asyncio.get_running_loop()
+
+    await self._lock.acquire()
+
+    try:
+      future = loop.run_in_executor(self._executor, functools.partial(self._cache.compile, draft, host=self._host, profile=profile))
+    except:
+      self._lock.release()
+      raise
+
+    # The lock is released once the compilation finishes, even if this call is cancelled before
+    future.add_done_callback(lambda _: self._lock.release())
+
+    return await asyncio.shield(future)
+
+  def _start(self, draft_id: str):
+    item = self._queued_items.pop(draft_id)
+    self._running_draft_ids.add(draft_id)
+
+    async def run():
+      try:
+        compilation = await self._compile(item.draft, profile=item.profile)
+      except Exception as e:
+        for future in item.futures:
+          if not future.done():
+            future.set_exception(e)
+      else:
+        for future in item.futures:
+          if not future.done():
+            future.set_result(compilation)
+      finally:
+        self._running_draft_ids.remove(draft_id)
+
+        if draft_id in self._queued_items:
+          self._start(draft_id)
+
+    task = asyncio.create_task(run())
+    task.add_done_callback(self._tasks.discard)
+
+    self._tasks.add(task)
@@ -1,6 +1,6 @@
 import math
 from dataclasses import dataclass
-from typing import Self, TypeAlias
+from typing import Iterable, Self, TypeAlias
 
 
 @dataclass(frozen=True)
@@ -87,8 +87,85 @@ class DurationTerm:
 Term: TypeAlias = DatetimeTerm | DurationTerm
 
 
+class DurationTermSums:
+  def __init__(self, terms: Iterable[DurationTerm], /):
+    """
+    Computes the prefix sums of a sequence of duration terms, such that the sum of any range of these terms is obtained in constant time.
+
+    Non-finite values, such as those of unknown or forever terms, are counted separately from finite ones, such that sums can be obtained by subtracting prefix sums while producing the same result as adding terms one by one.
+
+    Parameters
+      terms: The duration terms.
+    """
+
+    self._values = [_FloatSum.zero()]
+    self._resolutions = [_FloatSum.zero()]
+
+    for term in terms:
+      self._values.append(self._values[-1] + term.value)
+      self._resolutions.append(self._resolutions[-1] + term.resolution)
+
+  def __len__(self):
+    return len(self._values) - 1
+
+  def sum(self, start: int = 0, end: int | None = None, /):
+    """
+    Returns the sum of a range of terms.
+
+    Parameters
+      start: The index of the first term.
+      end: The index following that of the last term, or `None` to include all remaining terms.
+
+    Returns
+      The sum of the terms, or a zero term if the range is empty.
+    """
+
+    end_ = len(self) if end is None else end
+
+    if end_ <= start:
+      return DurationTerm.zero()
+
+    return DurationTerm(
+      (self._values[end_] - self._values[start]),
+      (self._resolutions[end_] - self._resolutions[start])
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class _FloatSum:
+  finite: float
+  nan_count: int
+  negative_infinity_count: int
+  positive_infinity_count: int
+
+  def __add__(self, other: float, /):
+    return _FloatSum(
+      (self.finite + other) if math.isfinite(other) else self.finite,
+      self.nan_count + math.isnan(other),
+      self.negative_infinity_count + (other == -math.inf),
+      self.positive_infinity_count + (other == math.inf)
+    )
+
+  def __sub__(self, other: Self, /):
+    if (self.nan_count > other.nan_count) or ((self.positive_infinity_count > other.positive_infinity_count) and (self.negative_infinity_count > other.negative_infinity_count)):
+      return math.nan
+
+    if self.positive_infinity_count > other.positive_infinity_count:
+      return math.inf
+
+    if self.negative_infinity_count > other.negative_infinity_count:
+      return -math.inf
+
+    return self.finite - other.finite
+
+  @classmethod
+  def zero(cls):
+    return cls(0.0, 0, 0, 0)
+
+
 __all__ = [
   'DatetimeTerm',
   'DurationTerm',
+  'DurationTermSums',
   'Term'
 ]
@@ -1,3 +1,4 @@
+import bisect
 import functools
 import itertools
 import pickle
@@ -5,10 +6,11 @@ import time
 from dataclasses import dataclass, field
 from pathlib import Path
 from pprint import pprint
-from typing import TYPE_CHECKING, Any, NewType, Optional, Self
+from typing import TYPE_CHECKING, Any, Iterator, NewType, Optional, Self
 
 import comserde
 
+from . import logger
 from .fiber.parser import BaseProgramLocation, GlobalContext
 from .history import TreeAdditionChange, TreeRemovalChange, TreeUpdateChange
 from .master.analysis import MasterAnalysis
@@ -37,43 +39,158 @@ class ReportStaticEntry:
     }
 
 
+# Number of events between two checkpoints of a report index
+REPORT_CHECKPOINT_INTERVAL = 1000
+
+# Incremented when the format of report indices changes, to rebuild outdated indices
+REPORT_INDEX_VERSION = 2
+
+@dataclass(kw_only=True)
+class ReportCheckpoint:
+  entries: list[tuple[int, int, int, BaseProgramLocation]] # (index, parent_index, block_child_id, location), parents first
+  event_index: EventIndex
+  offset: int
+
+@dataclass(kw_only=True)
+class ReportIndex:
+  checkpoints: list[ReportCheckpoint]
+  event_offsets: list[int]
+  event_times: list[float]
+  master_analysis: MasterAnalysis
+  report_size: int
+  root_static_entry: ReportStaticEntry
+  version: int
+
+
 class ExperimentReportReader:
-  def __init__(self, path: Path, /):
+  def __init__(self, path: Path, /, index_path: Path):
+    """
+    Opens an experiment report.
+
+    The report is summarized by an index stored in a separate file, which contains the offset and time of each event as well as periodic checkpoints of the entry tree. The index is built on the first opening of the report by replaying all events, and rebuilt when the report changes.
+
+    Parameters
+      path: The path of the report.
+      index_path: The path of the report's index.
+    """
+
+    self._index_path = index_path
     self._path = path
 
     with self._get_file() as file:
       self.header: ExperimentReportHeader = comserde.load(file, ExperimentReportHeader)
       self._header_size = file.tell()
 
-    self.master_analysis = MasterAnalysis()
+    self._index = self._load_index() or self._build_index()
+
+    self.master_analysis = self._index.master_analysis
+    self.root_static_entry = self._index.root_static_entry
 
-    for event_index, event, root_entry in self._iter_events():
-      self.end_time = event.time
+    if self._index.event_times:
+      self.end_time = self._index.event_times[-1]
+
+  def _build_index(self):
+    checkpoints = list[ReportCheckpoint]()
+    event_offsets = list[int]()
+    event_times = list[float]()
+    master_analysis = MasterAnalysis()
+    root_static_entry = ReportStaticEntry()
+
+    def create_checkpoint_entries(entry: ReportEntry) -> Iterator[tuple[int, int, int, BaseProgramLocation]]:
+      for block_child_id, child_entry in entry.children.items():
+        assert child_entry.location
+
+        yield (child_entry.index, entry.index, block_child_id, child_entry.location)
+        yield from create_checkpoint_entries(child_entry)
+
+    for event_index, event, entries, offset, next_offset in self._iter_events(root_static_entry=root_static_entry):
+      event_offsets.append(offset)
+      event_times.append(event.time)
 
       if event.analysis:
-        self.master_analysis += event.analysis
+        master_analysis += event.analysis
+
+      if (event_index + 1) % REPORT_CHECKPOINT_INTERVAL == 0:
+        checkpoints.append(ReportCheckpoint(
+          entries=list(create_checkpoint_entries(entries[0])),
+          event_index=event_index,
+          offset=next_offset
+        ))
+
+    index = ReportIndex(
+      checkpoints=checkpoints,
+      event_offsets=event_offsets,
+      event_times=event_times,
+      master_analysis=master_analysis,
+      report_size=self._path.stat().st_size,
+      root_static_entry=root_static_entry,
+      version=REPORT_INDEX_VERSION
+    )
+
+    temp_index_path = self._index_path.with_name(self._index_path.name + ".tmp")
 
-      # if root_entry:
-      #   print(root_entry.format_hierarchy())
-      #   print()
+    try:
+      with temp_index_path.open("wb") as file:
+        pickle.dump(index, file)
 
-  def _iter_events(self):
-    with self._get_file() as file:
-      file.seek(self._header_size)
+      temp_index_path.replace(self._index_path)
+    except OSError:
+      logger.warning(f"Failed to save report index at {self._index_path}")
 
-      entries = dict[int, ReportEntry]()
-      entry_counter = IndexCounter(start=1)
+    return index
 
-      self.root_static_entry = ReportStaticEntry()
+  def _load_index(self) -> Optional[ReportIndex]:
+    try:
+      with self._index_path.open("rb") as file:
+        index = pickle.load(file)
+    except FileNotFoundError:
+      return None
+    except Exception:
+      logger.warning(f"Failed to load report index at {self._index_path}, rebuilding it")
+      return None
 
+    if (not isinstance(index, ReportIndex)) or (index.version != REPORT_INDEX_VERSION) or (index.report_size != self._path.stat().st_size):
+      return None
+
+    return index
+
+  def _iter_events(self, checkpoint: Optional[ReportCheckpoint] = None, *, root_static_entry: Optional[ReportStaticEntry] = None):
+    # Static entries are only tracked when replaying from the start of the report.
+    assert (checkpoint is None) or (root_static_entry is None)
+
+    with self._get_file() as file:
+      entries = dict[int, ReportEntry]()
       entries[0] = ReportEntry(
         index=0,
         location=None,
-        static_counterpart=self.root_static_entry
+        static_counterpart=root_static_entry
       )
 
-      for raw_event_index in itertools.count():
+      if checkpoint:
+        file.seek(checkpoint.offset)
+
+        for entry_index, parent_index, block_child_id, location in checkpoint.entries:
+          parent_entry = entries[parent_index]
+          entry = ReportEntry(
+            index=entry_index,
+            location=location,
+            parent=(parent_entry, block_child_id)
+          )
+
+          entries[entry_index] = entry
+          parent_entry.children[block_child_id] = entry
+
+        entry_counter = IndexCounter(start=1, items=(entries.keys() - {0}))
+        first_event_index = checkpoint.event_index + 1
+      else:
+        file.seek(self._header_size)
+
+        entry_counter = IndexCounter(start=1)
+        first_event_index = 0
+
+      for raw_event_index in itertools.count(first_event_index):
         event_index = EventIndex(raw_event_index)
+        offset = file.tell()
 
         try:
           event: ExperimentReportEvent = comserde.load(file, ExperimentReportEvent)
@@ -88,14 +205,16 @@ class ExperimentReportReader:
               entry_index = entry_counter.new()
               entry = ReportEntry(
                 index=entry_index,
-                location=change.location,
-                static_counterpart=parent_entry.static_counterpart.children.setdefault(change.block_child_id, ReportStaticEntry())
+                location=change.location
               )
 
-              if (entry.static_counterpart.occurence_count < 20) or event.analysis:
-                entry.static_counterpart.occurences.append((event_index, None))
+              if parent_entry.static_counterpart:
+                entry.static_counterpart = parent_entry.static_counterpart.children.setdefault(change.block_child_id, ReportStaticEntry())
+
+                if (entry.static_counterpart.occurence_count < 20) or event.analysis:
+                  entry.static_counterpart.occurences.append((event_index, None))
 
-              entry.static_counterpart.occurence_count += 1
+                entry.static_counterpart.occurence_count += 1
 
               entries[entry_index] = entry
               parent_entry.children[change.block_child_id] = entry
@@ -104,7 +223,9 @@ class ExperimentReportReader:
               entries[change.index].location = change.location
             case TreeRemovalChange():
               entry = entries[change.index]
-              entry.static_counterpart.occurences[-1] = (entry.static_counterpart.occurences[-1][0], event_index)
+
+              if entry.static_counterpart:
+                entry.static_counterpart.occurences[-1] = (entry.static_counterpart.occurences[-1][0], event_index)
 
               del entries[change.index]
 
@@ -113,20 +234,43 @@ class ExperimentReportReader:
 
               entry_counter.delete(change.index)
 
-        yield event_index, event, entries.get(1)
+        yield event_index, event, entries, offset, file.tell()
 
   def _get_file(self):
     return self._path.open("rb")
 
   def export_events(self, context: GlobalContext, event_indices: set[EventIndex], /):
     result = dict[EventIndex, Any]()
+    remaining_event_indices = sorted(event_index for event_index in event_indices if 0 <= event_index < len(self._index.event_offsets))
+    checkpoint_event_indices = [checkpoint.event_index for checkpoint in self._index.checkpoints]
+
+    def find_checkpoint(event_index: EventIndex):
+      checkpoint_index = bisect.bisect_left(checkpoint_event_indices, event_index) - 1
+      return self._index.checkpoints[checkpoint_index] if checkpoint_index >= 0 else None
+
+    # Replay events from the last checkpoint before the first requested event, and restart from a later checkpoint when one precedes the next requested event.
+    while remaining_event_indices:
+      checkpoint = find_checkpoint(remaining_event_indices[0])
+
+      for event_index, event, entries, _, _ in self._iter_events(checkpoint):
+        if event_index == remaining_event_indices[0]:
+          root_entry = entries.get(1)
+          result[event_index] = {
+            "date": (event.time * 1000),
+            "location": root_entry and root_entry.export(context)
+          }
+
+          del remaining_event_indices[0]
 
-    for event_index, event, root_entry in self._iter_events():
-      if event_index in event_indices:
-        result[event_index] = {
-          "date": (event.time * 1000),
-          "location": root_entry and root_entry.export(context)
-        }
+          if not remaining_event_indices:
+            break
+
+          next_checkpoint = find_checkpoint(remaining_event_indices[0])
+
+          if next_checkpoint and (next_checkpoint.event_index >= event_index):
+            break
+      else:
+        break
 
     return result
 
@@ -145,7 +289,7 @@ class ReportEntry(Exportable, HierarchyNode):
   index: int
   location: Optional[BaseProgramLocation] = None
   parent: Optional[tuple[Self, int]] = None
-  static_counterpart: ReportStaticEntry
+  static_counterpart: Optional[ReportStaticEntry] = None
 
   def __get_node_name__(self):
     return f"[{self.index}] " + (f"\x1b[37m{self.location!r}\x1b[0m" if self.location else "<no change>")
@@ -192,6 +336,10 @@ class Experiment:
     self.archived, self.creation_time, self.id, self.path, self.title = state
     self.has_report = self.report_path.exists()
 
+  @property
+  def report_index_path(self):
+    return (self.path / "execution.idx")
+
   @property
   def report_path(self):
     return (self.path / "execution.dat")
@@ -199,19 +347,20 @@ class Experiment:
   @property
   def report_reader(self):
     if not self._report_reader:
-      self._report_reader = ExperimentReportReader(self.report_path)
+      self._report_reader = ExperimentReportReader(self.report_path, index_path=self.report_index_path)
 
     return self._report_reader
 
   def prepare(self):
     self._report_reader = None
+    self.report_index_path.unlink(missing_ok=True)
 
-  def export(self):
+  def export(self, *, update: bool = False):
     return {
       "id": self.id,
       "creationDate": (self.creation_time * 1000),
       "hasReport": self.has_report,
-      "master": self.master and self.master.export(),
+      "master": self.master and self.master.export(update=update),
       "title": self.title
     }
 
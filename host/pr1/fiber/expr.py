@@ -2,28 +2,31 @@ import ast
 import builtins
 import functools
 import re
+import threading
 import traceback
+import weakref
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import KW_ONLY, dataclass
 from enum import Enum
-from types import EllipsisType, NoneType
-from typing import Any, Callable, Generic, Literal, TypeVar, cast, overload
+from types import EllipsisType, FunctionType, NoneType
+from typing import Any, Callable, Generic, Hashable, Literal, Optional, TypeVar, cast, overload
 
 from quantops import Quantity
 
 from ..util.asyncio import try_all
 from ..analysis import DiagnosticAnalysis
 from ..error import Diagnostic, DiagnosticDocumentReference
-from ..host import logger
+from .. import logger
 from ..langservice import LanguageServiceAnalysis
 from ..reader import (LocatedString, LocatedValue, LocationArea,
                       PossiblyLocatedValue)
-from ..staticanalysis.context import StaticAnalysisContext
+from ..staticanalysis.context import StaticAnalysisAnalysis, StaticAnalysisContext
 from ..staticanalysis.expr import (BaseExprDefFactory, BaseExprEval,
                                    ConstantExprEval, Dependency, EvaluationError,
                                    InvalidExpressionError)
 from ..staticanalysis.expression import evaluate_eval_expr
-from ..staticanalysis.support import prelude
+from ..staticanalysis.support import get_prelude
 from ..util.misc import Exportable, log_exception
 from .eval import EvalContext, EvalEnvs, EvalOptions, EvalSymbol, EvalVariables
 from .eval import evaluate as dynamic_evaluate
@@ -31,6 +34,7 @@ from .staticeval import evaluate as static_evaluate
 
 expr_regexp = re.compile(r"^([$@%])?{{((?:\\.|[^\\}]|}(?!}))*)}}$")
 escape_regexp = re.compile(r"\\(.)")
+identifier_regexp = re.compile(r"[^\W\d]\w*")
 
 def unescape(value: LocatedString) -> LocatedString:
   # Complex replacement of escape_regexp.sub(r"\1", value))
@@ -257,6 +261,105 @@ class Evaluable(Exportable, ABC, Generic[T]):
         raise ValueError
 
 
+class UncacheableValueError(Exception):
+  pass
+
+class IdentityKey:
+  def __init__(self, value: Any, /):
+    # Only a weak reference to the value is kept, such that cached analyses do not keep alive objects such as those
+    # created for a single compilation. Once the value is collected, the key is no longer equal to any other key.
+    try:
+      self._ref = weakref.ref(value)
+    except TypeError as e:
+      raise UncacheableValueError from e
+
+    self._id = id(value)
+
+  def __eq__(self, other: object, /):
+    return isinstance(other, IdentityKey) and (other._id == self._id) and ((value := self._ref()) is not None) and (other._ref() is value)
+
+  def __hash__(self):
+    return self._id
+
+
+def create_value_key(value: Any, /) -> Hashable:
+  """
+  Returns a key which identifies a value captured by an expression factory.
+
+  Raises
+    UncacheableValueError: If the value can neither be compared by value nor weakly referenced.
+  """
+
+  if isinstance(value, (bool, float, int, str, NoneType)):
+    return (type(value), value)
+
+  return IdentityKey(value)
+
+def create_factory_key(factory: BaseExprDefFactory, /) -> Hashable:
+  """
+  Returns a key which is equal for equivalent expression factories.
+
+  Raises
+    UncacheableValueError: If the factory or one of its captured values cannot be used in a key.
+  """
+
+  # Factories are usually lambdas created anew for each compilation, which are equivalent if they share their code and captured values
+  if not isinstance(factory, FunctionType):
+    return IdentityKey(factory)
+
+  captured_keys = list[Hashable]()
+
+  for cell in (factory.__closure__ or ()):
+    try:
+      captured_keys.append(create_value_key(cell.cell_contents))
+    except ValueError as e: # Empty cell
+      raise UncacheableValueError from e
+
+  return (
+    factory.__code__,
+    tuple(captured_keys),
+    tuple(create_value_key(value) for value in (factory.__defaults__ or ()))
+  )
+
+
+class ExprAnalysisCache:
+  def __init__(self, *, max_size: int):
+    """
+    Creates a least-recently-used cache of the static analysis of expressions.
+
+    Expressions are identified by their source and by the factories of the variables they might reference, such that identical expressions found in different steps or in successive compilations are only analyzed once. Only analyses without diagnostics are cached, as the locations of diagnostics refer to the expression's original document.
+
+    Parameters
+      max_size: The maximum number of cached expressions.
+    """
+
+    self.max_size = max_size
+
+    self._entries = OrderedDict[Hashable, BaseExprEval]()
+    self._lock = threading.Lock()
+
+  def clear(self):
+    with self._lock:
+      self._entries.clear()
+
+  def get(self, key: Hashable, /):
+    with self._lock:
+      if (expr := self._entries.get(key)):
+        self._entries.move_to_end(key)
+
+      return expr
+
+  def put(self, key: Hashable, expr: BaseExprEval, /):
+    with self._lock:
+      self._entries[key] = expr
+
+      while len(self._entries) > self.max_size:
+        self._entries.popitem(last=False)
+
+
+expr_analysis_cache = ExprAnalysisCache(max_size=10_000)
+
+
 @dataclass
 class PythonExprObject:
   contents: LocatedString
@@ -273,8 +376,21 @@ class PythonExprObject:
       for name, value in env.values.items():
         variables[name] = value.ExprDefFactory
 
+    symbols = [env.symbol for env in self.envs]
+
+    # Identifiers found in the source are a superset of the names which the expression references
     try:
-      analysis, result = evaluate_eval_expr(self.tree.body, ({}, variables), prelude, StaticAnalysisContext(
+      cache_key = (self.contents.value, tuple(
+        (name, create_factory_key(variables[name])) for name in sorted(set(identifier_regexp.findall(self.contents.value))) if name in variables
+      ))
+    except UncacheableValueError:
+      cache_key = None
+
+    if (cache_key is not None) and ((cached_expr := expr_analysis_cache.get(cache_key)) is not None):
+      return StaticAnalysisAnalysis(), EvaluablePythonExpr(self.contents, cached_expr, symbols)
+
+    try:
+      analysis, result = evaluate_eval_expr(self.tree.body, ({}, variables), get_prelude(), StaticAnalysisContext(
         input_value=self.contents
       ))
     except Exception:
@@ -282,7 +398,12 @@ class PythonExprObject:
       traceback.print_exc()
       return LanguageServiceAnalysis(errors=[Diagnostic("Static analysis failure")]), Ellipsis
 
-    return analysis, EvaluablePythonExpr(self.contents, result.to_evaluated(), [env.symbol for env in self.envs])
+    expr = result.to_evaluated()
+
+    if (cache_key is not None) and (not analysis.errors) and (not analysis.warnings):
+      expr_analysis_cache.put(cache_key, expr)
+
+    return analysis, EvaluablePythonExpr(self.contents, expr, symbols)
 
   @classmethod
   def parse(cls, raw_str: LocatedString, /):
@@ -375,5 +496,7 @@ __all__ = [
   'Evaluable',
   'EvaluableConstantValue',
   'EvaluablePythonExpr',
-  'PythonExprObject'
+  'ExprAnalysisCache',
+  'PythonExprObject',
+  'expr_analysis_cache'
 ]
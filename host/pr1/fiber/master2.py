@@ -8,16 +8,16 @@ from dataclasses import dataclass, field
 from os import PathLike
 from pathlib import Path
 from traceback import StackSummary
-from typing import IO, TYPE_CHECKING, Any, Optional, Self, TypeVar
+from typing import IO, TYPE_CHECKING, Any, Mapping, Optional, Self, TypeVar
 import asyncio
 import traceback
 
-from ..report import ExperimentReportEvent
+from ..report import ExperimentReportEvent, ExperimentReportWriter
 from ..eta import DurationTerm, Term
 from ..analysis import BaseAnalysis, DiagnosticAnalysis
 from ..draft import DraftCompilation
 from ..util.asyncio import wait_all
-from ..host import logger
+from .. import logger
 from ..util.decorators import provide_logger
 from ..history import TreeAdditionChange, TreeChange, TreeRemovalChange, TreeUpdateChange
 from ..util.pool import Pool
@@ -52,15 +52,20 @@ class Master:
     # TODO: Add additional analysis items (e.g. unavailable device)
     self._initial_analysis = DiagnosticAnalysis.downcast(compilation.analysis)
     self._master_analysis = MasterAnalysis()
+    self._master_analysis_exported = False
 
+    self._dirty_handles = set[ProgramHandle]()
     self._entry_counter = IndexCounter(start=1)
     self._events = list[ProgramExecEvent]()
-    self._file: IO[bytes]
-    self._location: Any
+    self._location_diff = dict[int, Optional[ProgramHandleEntry]]()
+    self._location_diff_base_revision: Optional[int] = None
+    self._location_pending_entries = dict[int, Optional[ProgramHandleEntry]]()
+    self._location_revision = 0
     self._logger: Logger
     self._next_analysis_item_id = 0
     self._owner: ProgramOwner
     self._pool: Pool
+    self._report_writer: ExperimentReportWriter
     self._root_entry: Optional[ProgramHandleEntry] = None
     self._task: Optional[Task[None]] = None
     self._update_callback: Optional[SimpleCallbackFunction] = None
@@ -109,9 +114,12 @@ class Master:
 
     self._handle = ProgramHandle(self, id=0)
     self._handle._program = self.protocol.root.create_program(self._handle)
+    self._handle._mark_dirty()
     self._owner = ProgramOwner(self._handle, self._handle._program)
 
-    with self.experiment.report_path.open("wb") as self._file:
+    self._report_writer = ExperimentReportWriter(self.experiment.report_path, policy=self.host.report_writer_policy)
+
+    try:
       assert (self.protocol.name is not None)
 
       report_header = ExperimentReportHeader(
@@ -122,7 +130,7 @@ class Master:
         start_time=self.start_time
       )
 
-      comserde.dump(report_header, self._file)
+      self._report_writer.write(report_header, sync=True)
       self._logger.debug(f"Saving data in {self.experiment.report_path}")
 
       async with Pool.open() as self._pool:
@@ -139,8 +147,10 @@ class Master:
             self._update_handle = None
 
         self._pool.close()
+    finally:
+      await self._report_writer.close()
 
-    del self._file
+    del self._report_writer
 
     self.experiment.has_report = True
     self.experiment.save()
@@ -155,20 +165,63 @@ class Master:
 
     current_handle._program.receive(message)
 
+  @property
+  def master_analysis(self):
+    return self._master_analysis
+
   def study_block(self, block: BaseBlock):
     return self._owner.study_block(block)
 
 
-  def export(self) -> object:
-    # if not self._root_entry:
-    #   return None
+  def export(self, *, update: bool = False) -> object:
+    """
+    Exports the master.
+
+    Parameters
+      update: Whether to export the entries of the location and the analysis items which changed since the previous update export, rather than the full location and analysis. Update exports are meant to be broadcast to all clients, which must then hold the location at revision `baseRevision` or later to apply the changes. The first update export contains the full location and analysis.
+    """
+
+    context = GlobalContext(self.host)
+
+    if update and (self._location_diff_base_revision is not None):
+      location_export = {
+        "locationDiff": {
+          "baseRevision": self._location_diff_base_revision,
+          "entries": {
+            entry_index: (entry and entry.export_entry(context)) for entry_index, entry in self._location_diff.items()
+          }
+        }
+      }
+    else:
+      location_export = {
+        "location": (self._root_entry and self._root_entry.export(context))
+      }
+
+    # Analysis items are only appended or counted again, hence only changed items are exported after the first update export
+    if update and self._master_analysis_exported:
+      master_analysis_export = {
+        "masterAnalysisDiff": self._master_analysis.export_changes()
+      }
+    else:
+      master_analysis_export = {
+        "masterAnalysis": self._master_analysis.export()
+      }
+
+    if update:
+      self._location_diff.clear()
+      self._location_diff_base_revision = self._location_revision
+
+      if not self._master_analysis_exported:
+        self._master_analysis.export_changes()
+        self._master_analysis_exported = True
 
     return {
       "id": self.id,
       "initialAnalysis": self._initial_analysis.export(),
-      "location": self._location,
-      "masterAnalysis": self._master_analysis.export(),
-      "protocol": self.protocol.export(GlobalContext(self.host)),
+      **location_export,
+      "locationRevision": self._location_revision,
+      **master_analysis_export,
+      "protocol": self.protocol.export(context),
       "startDate": (self.start_time * 1000)
     }
 
@@ -187,6 +240,10 @@ class Master:
     changes = list[TreeChange]()
     user_significant = False
 
+    # Only visit handles which changed since the last update, along with their ancestors. Other handles would neither produce changes nor analysis items.
+    dirty_handles = self._dirty_handles
+    self._dirty_handles = set()
+
     def update_handle(handle: ProgramHandle, parent_entry: Optional[ProgramHandleEntry] = None, entry_id: int = 0, entry_path: list[int] = list()):
       nonlocal user_significant
 
@@ -200,8 +257,10 @@ class Master:
         assert handle._updated_term
 
         current_entry = ProgramHandleEntry(
+          child_id=entry_id,
           index=self._entry_counter.new(),
           location=handle._location,
+          parent_index=(parent_entry.index if parent_entry else 0),
           start_time=time.time()
         )
 
@@ -216,6 +275,8 @@ class Master:
           parent_index=(parent_entry.index if parent_entry else 0)
         ))
 
+        self._location_pending_entries[current_entry.index] = current_entry
+
       elif handle._updated_location:
         assert handle._location
         current_entry.location = handle._location
@@ -225,11 +286,14 @@ class Master:
           location=handle._location
         ))
 
+        self._location_pending_entries[current_entry.index] = current_entry
+
       # Collect errors here for their order to be correct.
       analysis.add_runtime(handle._analysis, entry_path, 0)
 
       for child_id, child_handle in list(handle._children.items()):
-        update_handle(child_handle, current_entry, child_id, [*entry_path, child_id])
+        if child_handle in dirty_handles:
+          update_handle(child_handle, current_entry, child_id, [*entry_path, child_id])
 
       # Recalculate the term of this handle
       # This must be done after updating children as their term needs to be correct.
@@ -237,6 +301,7 @@ class Master:
         handle._calculate_term()
         assert handle._term_info
         current_entry.term, current_entry.children_terms = handle._term_info
+        self._location_pending_entries[current_entry.index] = current_entry
 
       if handle._consumed:
         self._entry_counter.delete(current_entry.index)
@@ -250,6 +315,7 @@ class Master:
 
         if parent_entry:
           del parent_entry.children[entry_id]
+          self._location_pending_entries[current_entry.index] = None
         # else:
         #   self._root_entry = None
 
@@ -258,12 +324,17 @@ class Master:
       handle._analysis = RuntimeAnalysis()
       handle._updated_location = False
 
-    update_handle(self._handle)
+    if self._handle in dirty_handles:
+      update_handle(self._handle)
+
     self._master_analysis += analysis
 
     if self._update_callback and user_significant:
       assert self._root_entry
-      self._location = self._root_entry.export(GlobalContext(self.host))
+
+      self._location_diff |= self._location_pending_entries
+      self._location_pending_entries.clear()
+      self._location_revision += 1
 
       self._update_callback()
 
@@ -273,7 +344,8 @@ class Master:
       time=time.time()
     )
 
-    comserde.dump(event, self._file)
+    # Synchronize the report with the disk when a step starts or ends, or when an error occurs
+    self._report_writer.write(event, sync=(bool(analysis.errors) or any(isinstance(change, (TreeAdditionChange, TreeRemovalChange)) for change in changes)))
 
     # from pprint import pprint
     # pprint(changes)
@@ -316,10 +388,12 @@ class Master:
 
 @dataclass(kw_only=True)
 class ProgramHandleEntry(HierarchyNode):
-  children_terms: dict[int, Term] = field(default_factory=dict)
+  child_id: int
+  children_terms: Mapping[int, Term] = field(default_factory=dict)
   children: dict[int, Self] = field(default_factory=dict)
   index: int
   location: BaseProgramLocation
+  parent_index: int
   start_time: float
   term: Term = field(default_factory=DurationTerm.unknown)
 
@@ -334,7 +408,15 @@ class ProgramHandleEntry(HierarchyNode):
       "children": {
         child_id: child.export(context) for child_id, child in self.children.items()
       },
+      **self.export_entry(context)
+    }
+
+  def export_entry(self, context: GlobalContext):
+    return {
+      "childId": self.child_id,
       "childrenTerms": { child_id: child_term.export() for child_id, child_term in self.children_terms.items() },
+      "entryIndex": self.index,
+      "parentEntryIndex": self.parent_index,
       "startDate": (self.start_time * 1000),
       "term": self.term.export(),
       **self.location.export(context)
@@ -366,7 +448,7 @@ class ProgramHandle:
 
     self._analysis = RuntimeAnalysis()
     self._location: Optional[BaseProgramLocation] = None
-    self._term_info: Optional[tuple[Term, dict[int, Term]]] = None
+    self._term_info: Optional[tuple[Term, Mapping[int, Term]]] = None
 
     self._consumed = False
     self._failed = False
@@ -405,6 +487,8 @@ class ProgramHandle:
     assert not (handle._id in self._children)
     self._children[handle._id] = handle
 
+    handle._mark_dirty()
+
     return ProgramOwner(handle, handle._program)
 
   def increment_lock(self):
@@ -459,6 +543,7 @@ class ProgramHandle:
     self._analysis += event.analysis
     self._location = event.location or self._location
     self._updated_location = True
+    self._mark_dirty()
 
     if (not self._locked) and lock:
       self._locked = True
@@ -472,6 +557,8 @@ class ProgramHandle:
 
   def send_analysis(self, analysis: BaseAnalysis, /):
     self._analysis += analysis
+    self._mark_dirty()
+
     self.master.update_soon()
 
   def send_term(self):
@@ -481,8 +568,18 @@ class ProgramHandle:
     while isinstance(current_handle := current_handle._parent, ProgramHandle):
       current_handle._updated_term = True
 
+    self._mark_dirty()
     self.master.update_soon()
 
+  def _mark_dirty(self):
+    dirty_handles = self.master._dirty_handles
+    current_handle = self
+
+    # Ancestors of a dirty handle are always dirty, hence the walk can stop at the first one already marked.
+    while isinstance(current_handle, ProgramHandle) and not (current_handle in dirty_handles):
+      dirty_handles.add(current_handle)
+      current_handle = current_handle._parent
+
   def _calculate_term(self):
     self._updated_term = False
 
@@ -495,6 +592,7 @@ class ProgramHandle:
   def send_location(self, location: BaseProgramLocation, /):
     self._location = location
     self._updated_location = True
+    self._mark_dirty()
 
     self.master.update_soon()
 
@@ -522,12 +620,15 @@ class ProgramOwner:
   async def run(self, point: Optional[BaseProgramPoint], stack: EvalStack):
     self._handle.context = EvalContext(stack, cwd_path=self._handle.master.experiment.path)
 
+    # Hold back new programs while the report writer catches up with the disk, rather than blocking the event loop when writing
+    await self._handle.master._report_writer.wait_writable()
     await self._program.run(point, stack)
 
     for child_handle in self._handle._children.values():
       assert child_handle._consumed
 
     self._handle._consumed = True
+    self._handle._mark_dirty()
 
     del self._handle.context
 
@@ -1,14 +1,15 @@
 from abc import ABC, abstractmethod
 from dataclasses import KW_ONLY, dataclass, field
+import functools
 import getpass
 import math
 from types import EllipsisType
-from typing import (TYPE_CHECKING, Any, ClassVar, Generic, Literal, Optional,
+from typing import (TYPE_CHECKING, Any, Callable, ClassVar, Generic, Literal, Mapping, Optional,
                     Sequence, TypeVar, final)
 
 from ..eta import DurationTerm, Term
 from ..staticanalysis.expr import DeferredExprDef
-from ..staticanalysis.support import prelude
+from ..staticanalysis.support import get_prelude
 from ..staticanalysis.expression import instantiate_type_instance
 from .. import input as lang
 from .. import reader
@@ -16,11 +17,13 @@ from ..draft import Draft
 from ..error import Diagnostic, DiagnosticDocumentReference, Trace
 from ..langservice import LanguageServiceAnalysis, LanguageServiceToken
 from ..reader import LocatedString, LocatedValue, LocationArea
+from .. import logger
 from ..ureg import ureg
 from ..util.decorators import debug
 from ..util.misc import Exportable, ExportableABC, HierarchyNode
 from .eval import EvalContext, EvalEnv, EvalEnvs, EvalEnvValue, EvalStack, EvalSymbol, EvalVariables
 from .expr import Evaluable
+from .profiler import CompilationProfiler, measure, measure_transformer
 
 if TYPE_CHECKING:
   from ..host import Host
@@ -177,7 +180,7 @@ class BaseProgram(ABC):
   def swap(self, block: 'BaseBlock'):
     pass
 
-  def term_info(self, children_terms: dict[int, Term]) -> tuple[Term, dict[int, Term]]:
+  def term_info(self, children_terms: dict[int, Term]) -> tuple[Term, Mapping[int, Term]]:
     return DurationTerm.unknown(), dict()
 
   @abstractmethod
@@ -203,8 +206,31 @@ class BaseProgramLocation(ABC):
 class BaseProgramPoint(ExportableABC):
   pass
 
-class BaseBlock(ABC, HierarchyNode):
+def _cache_duration(func: Callable[[Any], DurationTerm], /):
+  key = func.__qualname__
+
+  @functools.wraps(func)
   def duration(self):
+    # The cache is keyed by method in case an override calls the method of its parent class
+    cache: dict[str, DurationTerm] = self.__dict__.setdefault('_duration_cache', dict())
+
+    if (result := cache.get(key)) is None:
+      result = func(self)
+      cache[key] = result
+
+    return result
+
+  return duration
+
+class BaseBlock(ABC, HierarchyNode):
+  def __init_subclass__(cls, **kwargs):
+    super().__init_subclass__(**kwargs)
+
+    # Blocks are immutable once created, hence the duration of each block only needs to be calculated once
+    if 'duration' in cls.__dict__:
+      cls.duration = _cache_duration(cls.__dict__['duration'])
+
+  def duration(self) -> DurationTerm:
     return DurationTerm.unknown()
 
   @abstractmethod
@@ -379,6 +405,7 @@ class Layer:
   _: KW_ONLY
   envs: EvalEnvs
   extra_info: Optional[Attrs | EllipsisType] = None
+  profiler: Optional[CompilationProfiler] = None
 
   def adopt(self, adoption_stack: EvalStack, trace: Trace):
     analysis = LanguageServiceAnalysis()
@@ -387,7 +414,8 @@ class Layer:
     adopted_transforms = list[tuple[BasePassiveTransformer, Any]]()
 
     for transformer, transform in self.passive_transforms:
-      transform_result = analysis.add(transformer.adopt(transform.data, current_adoption_stack, trace)) #, trace=trace)
+      with measure_transformer(self.profiler, transformer, 'adopt'):
+        transform_result = analysis.add(transformer.adopt(transform.data, current_adoption_stack, trace)) #, trace=trace)
 
       if isinstance(transform_result, EllipsisType) or not transform_result:
         continue
@@ -403,7 +431,9 @@ class Layer:
     analysis, (adopted_transforms, current_adoption_stack) = self.adopt(adoption_stack, trace)
 
     lead_transformer, lead_transform = self.lead_transform
-    block = analysis.add(lead_transformer.adopt(lead_transform.data, current_adoption_stack, trace)) #, trace=trace)
+
+    with measure_transformer(self.profiler, lead_transformer, 'adopt'):
+      block = analysis.add(lead_transformer.adopt(lead_transform.data, current_adoption_stack, trace)) #, trace=trace)
 
     if isinstance(block, EllipsisType):
       return analysis, Ellipsis
@@ -418,7 +448,8 @@ class Layer:
 
     for transformer, transform_data in adopted_transforms[::-1]:
       if not isinstance(transform_data, EllipsisType):
-        execute_result = analysis.add(transformer.execute(transform_data, current_block))
+        with measure_transformer(self.profiler, transformer, 'execute'):
+          execute_result = analysis.add(transformer.execute(transform_data, current_block))
 
         if not isinstance(execute_result, EllipsisType):
           current_block = execute_result
@@ -496,26 +527,43 @@ class FiberProtocol: # (Exportable):
   name: Optional[str]
   root: BaseBlock
 
+  _export: 'Optional[tuple[Host, object]]' = field(default=None, init=False, repr=False, compare=False)
+
   def export(self, context: GlobalContext) -> object:
-    return {
-      "draft": self.draft.export(),
-      "name": self.name,
-      "root": self.root.export(context)
-    }
+    # The protocol never changes once compiled, hence it is only exported once, and the same object is returned afterwards
+    if (self._export is None) or (self._export[0] is not context.host):
+      self._export = (context.host, {
+        "draft": self.draft.export(),
+        "name": self.name,
+        "root": self.root.export(context)
+      })
+
+    return self._export[1]
 
 
 class FiberParser:
-  def __init__(self, draft: Draft, *, Parsers: Sequence[type[BaseParser]], host: 'Host'):
+  def __init__(self, draft: Draft, *, Parsers: Sequence[type[BaseParser]], host: 'Host', profile: bool = False):
     # Must be before self._parsers is initialized
     self.draft = draft
     self.host = host
+    self.profiler = CompilationProfiler() if profile else None
 
     self._next_eval_symbol = 0
     self._parsers: list[BaseParser] = [Parser(self) for Parser in Parsers]
 
-    self.analysis, protocol = self._parse()
+    if self.profiler:
+      for parser in self._parsers:
+        for transformer in parser.transformers:
+          self.profiler.transformer_namespaces[transformer] = parser.namespace
+
+    with measure(self.profiler, 'fiber', 'parse'):
+      self.analysis, protocol = self._parse()
+
     self.protocol = protocol if not isinstance(protocol, EllipsisType) else None
 
+    if self.profiler:
+      self.profiler.log_summary(logger)
+
   def _parse(self):
     # Initialization
 
@@ -540,7 +588,7 @@ class FiberParser:
         description="The unit registry."
       ),
       'username': EvalEnvValue(
-        lambda node: DeferredExprDef('username', node=node, phase=0, symbol=global_symbol, type=instantiate_type_instance(prelude[0]['str'])),
+        lambda node: DeferredExprDef('username', node=node, phase=0, symbol=global_symbol, type=instantiate_type_instance(get_prelude()[0]['str'])),
         description="The user's name."
       )
     }, name="Global", symbol=global_symbol)
@@ -550,7 +598,7 @@ class FiberParser:
 
     # Syntax
 
-    data, reader_errors, reader_warnings = reader.loads(self.draft.entry_document.source)
+    data, reader_errors, reader_warnings = self.host.document_reader.loads(self.draft.entry_document.source)
 
     analysis.errors += reader_errors
     analysis.warnings += reader_warnings
@@ -610,7 +658,8 @@ class FiberParser:
       if isinstance(unit_attrs, EllipsisType):
         continue
 
-      protocol_unit_data = analysis.add(parser.enter_protocol(unit_attrs, root_envs))
+      with measure(self.profiler, parser.namespace, 'enter_protocol'):
+        protocol_unit_data = analysis.add(parser.enter_protocol(unit_attrs, root_envs))
       root_envs += protocol_unit_data.envs
 
       if protocol_unit_data.details:
@@ -670,7 +719,8 @@ class FiberParser:
     # Leave
 
     for parser in self._parsers:
-      analysis += parser.leave_protocol()
+      with measure(self.profiler, parser.namespace, 'leave_protocol'):
+        analysis += parser.leave_protocol()
 
 
     # Return
@@ -698,6 +748,18 @@ class FiberParser:
     *,
     extra_attributes: Optional[dict[str, lang.Attribute | lang.Type]] = None,
     mode: Literal['any', 'lead', 'passive'] = 'lead'
+  ):
+    with measure(self.profiler, 'fiber', 'parse_layer'):
+      return self._parse_layer(attrs, envs, extra_attributes=extra_attributes, mode=mode)
+
+  def _parse_layer(
+    self,
+    attrs: Any,
+    /,
+    envs: EvalEnvs,
+    *,
+    extra_attributes: Optional[dict[str, lang.Attribute | lang.Type]],
+    mode: Literal['any', 'lead', 'passive']
   ):
     analysis = LanguageServiceAnalysis()
     context = AnalysisContext(
@@ -738,7 +800,8 @@ class FiberParser:
         if isinstance(result, EllipsisType):
           return analysis, Ellipsis
 
-        _ = analysis.add(parser.preload(result))
+        with measure(self.profiler, parser.namespace, 'preload'):
+          _ = analysis.add(parser.preload(result))
         result_by_parser[parser] = result
 
     failure = False
@@ -759,7 +822,8 @@ class FiberParser:
         continue
 
       if isinstance(transformer, BaseLeadTransformer):
-        new_lead_transforms = analysis.add(transformer.prepare(unit_attrs, current_envs))
+        with measure(self.profiler, parser.namespace, 'prepare'):
+          new_lead_transforms = analysis.add(transformer.prepare(unit_attrs, current_envs))
 
         if not isinstance(new_lead_transforms, EllipsisType):
           if (not lead_transforms) and new_lead_transforms:
@@ -767,7 +831,8 @@ class FiberParser:
 
           lead_transforms += [(transformer, transform) for transform in new_lead_transforms]
       else:
-        new_passive_transform = analysis.add(transformer.prepare(unit_attrs, current_envs))
+        with measure(self.profiler, parser.namespace, 'prepare'):
+          new_passive_transform = analysis.add(transformer.prepare(unit_attrs, current_envs))
 
         if new_passive_transform and not isinstance(new_passive_transform, EllipsisType):
           extra_envs += new_passive_transform.envs
@@ -795,6 +860,7 @@ class FiberParser:
       passive_transforms,
       envs=extra_envs,
       extra_info=extra_info,
+      profiler=self.profiler
     )
 
     return analysis, layer
@@ -805,7 +871,8 @@ class FiberParser:
 
     for parser in self._parsers:
       for transformer in parser.leaf_transformers:
-        current_block = analysis.add(transformer.execute(block))
+        with measure(self.profiler, parser.namespace, 'execute'):
+          current_block = analysis.add(transformer.execute(block))
 
         if isinstance(current_block, EllipsisType):
           return analysis, Ellipsis
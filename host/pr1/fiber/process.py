@@ -11,7 +11,7 @@ from ..eta import DatetimeTerm, DurationTerm
 from ..error import Diagnostic
 from ..reader import PossiblyLocatedValue
 from .expr import Evaluable
-from ..host import logger
+from .. import logger
 from ..master.analysis import RuntimeAnalysis
 from ..util.decorators import provide_logger
 from ..util.misc import Exportable, UnreachableError, log_exception
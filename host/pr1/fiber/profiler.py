@@ -0,0 +1,91 @@
+import contextlib
+import time
+from dataclasses import dataclass
+from logging import Logger
+from typing import Optional
+
+
+@dataclass
+class CompilationProfileEntry:
+  call_count: int = 0
+  self_time: float = 0.0
+  total_time: float = 0.0
+
+  def export(self):
+    return {
+      "callCount": self.call_count,
+      "selfTime": self.self_time,
+      "totalTime": self.total_time
+    }
+
+
+class CompilationProfiler:
+  def __init__(self):
+    """
+    Creates a profiler which records the wall time and call count of compilation operations, keyed by plugin namespace.
+
+    The self time of an operation excludes the time spent in nested measured operations, such as the adoption of child layers by a transformer. The total time of a recursive operation, such as the parsing of a layer, only includes its outermost calls.
+    """
+
+    self.entries = dict[tuple[str, str], CompilationProfileEntry]()
+    self.transformer_namespaces = dict[object, str]()
+
+    self._active_keys = list[tuple[str, str]]()
+    self._children_times = list[float]()
+
+  @contextlib.contextmanager
+  def measure(self, namespace: str, operation: str):
+    key = (namespace, operation)
+    recursive = key in self._active_keys
+
+    self._active_keys.append(key)
+    self._children_times.append(0.0)
+    start_time = time.perf_counter()
+
+    try:
+      yield
+    finally:
+      total_time = time.perf_counter() - start_time
+      children_time = self._children_times.pop()
+      self._active_keys.pop()
+
+      if self._children_times:
+        self._children_times[-1] += total_time
+
+      entry = self.entries.setdefault(key, CompilationProfileEntry())
+      entry.call_count += 1
+      entry.self_time += total_time - children_time
+
+      if not recursive:
+        entry.total_time += total_time
+
+  def measure_transformer(self, transformer: object, operation: str):
+    return self.measure(self.transformer_namespaces.get(transformer, transformer.__class__.__name__), operation)
+
+  def export(self):
+    return [{
+      **entry.export(),
+      "namespace": namespace,
+      "operation": operation
+    } for (namespace, operation), entry in self.entries.items()]
+
+  def log_summary(self, logger: Logger, *, count: int = 10):
+    entries = sorted(self.entries.items(), key=(lambda item: -item[1].self_time))[:count]
+
+    logger.debug(f"Compilation profile, top {len(entries)} operations by self time")
+
+    for (namespace, operation), entry in entries:
+      logger.debug(f"  {namespace}.{operation}: {entry.self_time * 1000:.2f} ms self, {entry.total_time * 1000:.2f} ms total, {entry.call_count} calls")
+
+
+def measure(profiler: Optional[CompilationProfiler], namespace: str, operation: str, /):
+  return profiler.measure(namespace, operation) if profiler else contextlib.nullcontext()
+
+def measure_transformer(profiler: Optional[CompilationProfiler], transformer: object, operation: str, /):
+  return profiler.measure_transformer(transformer, operation) if profiler else contextlib.nullcontext()
+
+
+__all__ = [
+  'CompilationProfileEntry',
+  'CompilationProfiler'
+]
@@ -8,7 +8,7 @@ from types import EllipsisType
 from typing import Any, AsyncIterator, Generator, Optional, Protocol, Sequence, cast
 
 from .eval import EvalStack
-from ..host import logger
+from .. import logger
 from ..error import Diagnostic
 from ..master.analysis import MasterAnalysis, MasterError
 from .process import BaseProcess, ProcessEvent, ProcessExecEvent, ProcessFailureEvent, ProcessPauseEvent, ProcessTerminationEvent, ProgramExecEvent
@@ -9,17 +9,22 @@ from typing import Any, Optional, Protocol, cast
 
 from . import logger, reader
 from .analysis import DiagnosticAnalysis
+from .catalog import ExperimentCatalog
 from .devices.nodes.collection import CollectionNode
 from .devices.nodes.common import BaseNode, NodeId, NodePath
 from .document import Document
-from .draft import Draft, DraftCompilation
+from .draft import Draft, DraftCompilation, DraftCompilationCache, DraftCompiler
 from .experiment import Experiment, ExperimentId
+from .fiber.expr import expr_analysis_cache
 from .fiber.master2 import Master
 from .fiber.parser import AnalysisContext, GlobalContext
 from .input import (Attribute, BoolType, KVDictType, PrimitiveType, RecordType,
                     StrType, UnionType)
 from .langservice import LanguageServiceAnalysis
 from .plugin.manager import PluginManager
+from .profiler import startup_profiler
+from .units.base import BaseExecutor
+from .report import ExperimentReportWriterPolicy
 from .util.misc import create_datainstance
 from .util.pool import Pool
 
@@ -69,9 +74,15 @@ class PluginConf(Protocol):
   path: Optional[str]
 
 class HostConf(Protocol):
+  compilation_cache_size: int
+  executor_start_timeout: float
   id: str
   name: str
   plugin: dict[str, PluginConf]
+  report_flush_interval: float
+  report_flush_size: int
+  report_max_buffer_size: int
+  report_sync: bool
 
 
 class Host:
@@ -80,22 +91,31 @@ class Host:
     self.data_dir = backend.data_dir
     self.update_callback = update_callback
 
-    self.experiments = dict[str, Experiment]()
+    # Experiments loaded in memory and included in the state, which are a subset of those in the catalog
+    self.experiments = dict[ExperimentId, Experiment]()
+    self.experiments_catalog: ExperimentCatalog
     self.experiments_path = self.data_dir / "experiments"
     self.experiments_path.mkdir(exist_ok=True)
 
     self.devices = dict[NodeId, BaseNode]()
+    self.document_reader = reader.IncrementalReader()
     self.pool: Pool
     self.root_node = HostRootNode(self.devices)
 
-    self.previous_state = {
-      "info": None
-    }
-
 
     # -- Load configuration -------------------------------
 
     conf_type = RecordType({
+      'compilation_cache_size': Attribute(
+        PrimitiveType(int),
+        default=100,
+        description="The maximum estimated memory used by cached draft compilations, in megabytes."
+      ),
+      'executor_start_timeout': Attribute(
+        PrimitiveType(float),
+        default=30.0,
+        description="The time to wait for each executor to start, in seconds. Executors which take longer keep starting in the background while the host starts."
+      ),
       'id': StrType(),
       'name': StrType(),
       'plugins': UnionType(
@@ -109,6 +129,26 @@ class Host:
           })
         )
       ),
+      'report_flush_interval': Attribute(
+        PrimitiveType(float),
+        default=1.0,
+        description="The maximum time between two writes of an experiment report to disk, in seconds."
+      ),
+      'report_flush_size': Attribute(
+        PrimitiveType(int),
+        default=64,
+        description="The size of buffered report data above which it is written to disk, in kilobytes."
+      ),
+      'report_max_buffer_size': Attribute(
+        PrimitiveType(int),
+        default=16,
+        description="The maximum size of buffered report data, in megabytes. Running experiments wait for data to be written to disk before starting new steps when this size is reached."
+      ),
+      'report_sync': Attribute(
+        BoolType(),
+        default=True,
+        description="Whether to synchronize experiment reports with the disk when a step starts or ends and when an error occurs."
+      ),
       'version': PrimitiveType(int)
     })
 
@@ -144,8 +184,17 @@ class Host:
       }) for namespace, raw_plugin_conf in (raw_conf.value.plugins.value or dict()).items()
     }
 
+    self.compilation_cache = DraftCompilationCache(max_size=(conf.compilation_cache_size * 1_000_000))
+    self.draft_compiler = DraftCompiler(self.compilation_cache, host=self)
+    self.executor_start_timeout = conf.executor_start_timeout
     self.id = conf.id
     self.name = conf.name
+    self.report_writer_policy = ExperimentReportWriterPolicy(
+      flush_interval=conf.report_flush_interval,
+      flush_size=(conf.report_flush_size * 1_000),
+      max_buffer_size=(conf.report_max_buffer_size * 1_000_000),
+      sync=conf.report_sync
+    )
     self.start_time = round(time.time() * 1000)
 
 
@@ -154,12 +203,13 @@ class Host:
     self.executors = dict()
     self.manager = PluginManager(reader.LocatedValue(plugins_conf, raw_conf.area))
 
-    logger.info(f"Loaded {len(self.manager.plugins)} plugins")
+    logger.info(f"Enabled {len(self.manager.plugins)} plugins")
 
     analysis = DiagnosticAnalysis()
 
     for namespace in self.manager.plugins.keys():
-      executor = analysis.add_downcast(self.manager.create_executor(namespace, host=self))
+      with startup_profiler.measure('host', f"Create executor of plugin '{namespace}'"):
+        executor = analysis.add_downcast(self.manager.create_executor(namespace, host=self))
 
       if not isinstance(executor, EllipsisType):
         self.executors[namespace] = executor
@@ -176,10 +226,16 @@ class Host:
     async with Pool.open("Host pool") as self.pool:
       logger.debug("Initializing executors")
 
-      for executor in self.executors.values():
-        await self.pool.wait_until_ready(executor.start())
+      # Executors are independent and are therefore started concurrently
+      await asyncio.gather(*[self._start_executor(namespace, executor) for namespace, executor in self.executors.items()])
 
       logger.debug("Initialized executors")
+
+      with startup_profiler.measure('experiment', "Open catalog"):
+        self.experiments_catalog = ExperimentCatalog(self.experiments_path)
+
+      logger.debug(f"Found {len(self.experiments_catalog)} experiments")
+
       yield
 
 
@@ -190,41 +246,77 @@ class Host:
       for line in self.root_node.format_hierarchy().splitlines():
         logger.debug(line)
 
-      for path in self.experiments_path.iterdir():
-        if not path.name.startswith("."):
-          if (experiment := Experiment.try_unserialize(path)):
-            self.experiments[experiment.id] = experiment
+  async def _start_executor(self, namespace: str, executor: BaseExecutor, /):
+    start_time = time.perf_counter()
 
-      logger.debug(f"Loaded {len(self.experiments)} experiments")
+    try:
+      await asyncio.wait_for(self.pool.wait_until_ready(executor.start()), self.executor_start_timeout)
+    except asyncio.TimeoutError:
+      logger.warning(f"Executor of plugin '{namespace}' did not start within {self.executor_start_timeout:.1f} s, continuing in the background")
+      startup_profiler.add('executor', f"{namespace} (timed out)", duration=(time.perf_counter() - start_time), start_time=start_time)
+    else:
+      startup_profiler.add('executor', namespace, duration=(time.perf_counter() - start_time), start_time=start_time)
 
   def busy(self):
     return any(chip.master for chip in self.experiments.values())
 
+  def get_experiment(self, experiment_id: ExperimentId, /):
+    """
+    Returns an experiment, loading it if necessary.
+
+    Loaded experiments are included in the state until the host stops or they are deleted.
+
+    Raises
+      KeyError: If the experiment does not exist.
+    """
+
+    if (experiment := self.experiments.get(experiment_id)):
+      return experiment
+
+    if experiment_id not in self.experiments_catalog:
+      raise KeyError(f"Experiment '{experiment_id}' not found")
+
+    with startup_profiler.measure('experiment', f"Load experiment '{experiment_id}'"):
+      experiment = Experiment.try_unserialize(self.experiments_path / experiment_id)
+
+    if not experiment:
+      raise KeyError(f"Experiment '{experiment_id}' not found")
+
+    self.experiments[experiment.id] = experiment
+    self.update_callback()
+
+    return experiment
+
   async def reload_units(self):
     logger.info("Reloading development units")
 
-    self.manager.reload()
+    # Compilations in the worker thread use the plugins being reloaded
+    async with self.draft_compiler.suspend():
+      self.manager.reload()
+      self.compilation_cache.clear()
+      self.document_reader.clear()
+      expr_analysis_cache.clear()
 
-    analysis = DiagnosticAnalysis()
+      analysis = DiagnosticAnalysis()
 
-    for unit_info in self.manager.plugin_infos.values():
-      namespace = unit_info.namespace
+      for unit_info in self.manager.plugin_infos.values():
+        namespace = unit_info.namespace
 
-      if unit_info.enabled and unit_info.development:
-        if namespace in self.executors:
-          await self.executors[namespace].destroy()
-          del self.executors[namespace]
+        if unit_info.enabled and unit_info.development:
+          if namespace in self.executors:
+            await self.executors[namespace].destroy()
+            del self.executors[namespace]
 
-        unit_analysis, executor = self.manager.create_executor(namespace, host=self)
-        analysis += unit_analysis
+          unit_analysis, executor = self.manager.create_executor(namespace, host=self)
+          analysis += unit_analysis
 
-        if not isinstance(executor, EllipsisType):
-          self.executors[namespace] = executor
-          await executor.initialize()
+          if not isinstance(executor, EllipsisType):
+            self.executors[namespace] = executor
+            await executor.initialize()
 
     analysis.log_diagnostics(logger)
 
-  def get_state(self):
+  def get_state(self, *, update: bool = False):
     return {
       "info": {
         "id": self.id,
@@ -235,7 +327,7 @@ class Host:
           plugin_info.namespace: {
             "development": plugin_info.development,
             "enabled": plugin_info.enabled,
-            "hasClient": hasattr(plugin_info.plugin, 'client_path'),
+            "hasClient": plugin_info.enabled and hasattr(plugin_info.plugin, 'client_path'),
             "metadata": {
               "author": plugin_info.metadata.author,
               "description": plugin_info.metadata.description,
@@ -254,28 +346,13 @@ class Host:
         }
       },
       "experiments": {
-        experiment.id: experiment.export() for experiment in self.experiments.values()
+        experiment.id: experiment.export(update=update) for experiment in self.experiments.values()
       },
       "executors": {
         namespace: executor.export() for namespace, executor in self.executors.items()
       }
     }
 
-  def get_state_update(self):
-    state = self.get_state()
-    state_update = dict()
-
-    if state["info"] != self.previous_state["info"]:
-      state_update.update({ "info": state["info"] })
-
-    state_update.update({
-      "experiments": state["experiments"],
-      "executors": state["executors"]
-    })
-
-    self.previous_state = state
-    return state_update
-
   async def process_request(self, request, *, agent) -> Any:
     if request["type"] == "createDraftSample":
       return "# Example protocol\nname: My protocol\n\nstages:\n  - steps:\n      - name: Step no. 1\n        duration: 5 min"
@@ -292,7 +369,7 @@ class Host:
         draft = Draft.load(request["draft"])
 
         try:
-          compilation = draft.compile(host=self)
+          compilation = await self.draft_compiler.compile(draft, profile=request["options"].get("profile", False))
         except:
           import traceback
           traceback.print_exc()
@@ -305,7 +382,7 @@ class Host:
           )
 
         if compilation.protocol and (experiment_id := request["studyExperimentId"]):
-          experiment = self.experiments[experiment_id]
+          experiment = self.get_experiment(experiment_id)
           assert experiment.master
 
           study = experiment.master.study_block(compilation.protocol.root)
@@ -329,14 +406,16 @@ class Host:
         )
 
         experiment.save()
+
         self.experiments[experiment_id] = experiment
+        self.experiments_catalog.put(experiment)
 
         return {
           "experimentId": experiment.id
         }
 
       case "deleteExperiment":
-        experiment = self.experiments[request["experimentId"]]
+        experiment = self.get_experiment(request["experimentId"])
 
         # TODO: checks
 
@@ -345,32 +424,69 @@ class Host:
         else:
           shutil.rmtree(experiment.path)
 
-        del self.experiments[request["experimentId"]]
+        self.experiments.pop(experiment.id, None)
+        self.experiments_catalog.remove(experiment.id)
+
+      case "discardDraft":
+        for document_id in request["documentIds"]:
+          self.document_reader.discard(document_id)
+
+      case "listExperiments":
+        entries, total_count = self.experiments_catalog.list_entries(
+          archived=request.get("archived"),
+          limit=request["limit"],
+          offset=request.get("offset", 0),
+          query=request.get("query")
+        )
+
+        return {
+          "experiments": [entry.export() for entry in entries],
+          "totalCount": total_count
+        }
+
+      case "getStartupProfile":
+        return startup_profiler.export()
+
+      case "loadExperiment":
+        try:
+          return self.get_experiment(request["experimentId"]).export()
+        except KeyError:
+          return None
+
+      case "getExperimentMaster":
+        experiment = self.get_experiment(request["experimentId"])
+        return experiment.master and experiment.master.export()
 
       case "getExperimentReportInfo":
-        experiment = self.experiments[request["experimentId"]]
+        experiment = self.get_experiment(request["experimentId"])
         return experiment.report_reader.export(GlobalContext(self))
 
+      case "getMasterAnalysis":
+        experiment = self.get_experiment(request["experimentId"])
+        master_analysis = experiment.master.master_analysis if experiment.master else experiment.report_reader.master_analysis
+
+        return master_analysis.export_page(request["kind"], limit=request["limit"], offset=request.get("offset", 0))
+
       case "getExperimentReportEvents":
-        experiment = self.experiments[request["experimentId"]]
+        experiment = self.get_experiment(request["experimentId"])
         return experiment.report_reader.export_events(GlobalContext(self), set(request["eventIndices"]))
 
       case "requestToExecutor":
         return await self.executors[request["namespace"]].request(request["data"], agent=agent)
 
       case "requestToRunner":
-        experiment = self.experiments[request["experimentId"]]
+        experiment = self.get_experiment(request["experimentId"])
         assert experiment.master
 
         return await experiment.master.runners[request["namespace"]].request(request["data"], agent=agent)
 
       case "revealExperimentDirectory":
         if not agent.client.remote:
-          experiment = self.experiments[request["experimentId"]]
+          experiment = self.get_experiment(request["experimentId"])
           self.backend.reveal(experiment.path)
 
       case "sendMessageToActiveBlock":
-        experiment = self.experiments[request["experimentId"]]
+        experiment = self.get_experiment(request["experimentId"])
         assert experiment.master
 
         experiment.master.receive(request["path"], request["message"])
@@ -378,13 +494,17 @@ class Host:
         return None
 
       case "startDraft":
-        experiment = self.experiments[request["experimentId"]]
+        experiment = self.get_experiment(request["experimentId"])
 
         if experiment.master:
           raise Exception("Already running")
 
         draft = Draft.load(request["draft"])
-        compilation = draft.compile(host=self)
+        compilation = await self.draft_compiler.compile(draft, supersede=False)
+
+        # The experiment might have started running during compilation
+        if experiment.master:
+          raise Exception("Already running")
 
         logger.info(f"Running protocol on experiment '{experiment.id}'")
 
@@ -405,6 +525,7 @@ class Host:
             await run_task
           finally:
             experiment.master = None
+            self.experiments_catalog.put(experiment)
 
           logger.info(f"Ran protocol on experiment '{experiment.id}'")
           self.update_callback()
@@ -1,7 +1,7 @@
 from abc import abstractmethod
-from dataclasses import KW_ONLY, dataclass, field
+from dataclasses import KW_ONLY, dataclass, field, replace
 from pathlib import Path
-from typing import Any, Generic, Optional, TypeVar
+from typing import Any, Generic, Hashable, Literal, Optional, TypeVar, get_args
 
 import comserde
 
@@ -13,6 +13,8 @@ from ..util.misc import ExportableABC
 
 T_DiagnosticOrEffect = TypeVar('T_DiagnosticOrEffect', Diagnostic, 'Effect')
 
+MasterAnalysisItemKind = Literal['effects', 'errors', 'warnings']
+
 
 @comserde.serializable
 @dataclass(kw_only=True)
@@ -69,11 +71,22 @@ class RuntimeMasterAnalysisItem(Generic[T_DiagnosticOrEffect]):
   author_path: list[int]
   event_index: int
 
+  # Items are pickled in reports, which keeps this count. Items pickled before it was added fall back to the class default.
+  occurrence_count: int = 1
+
+  def get_key(self) -> Hashable:
+    """
+    Returns a key which is equal for identical items, regardless of the event in which they occurred.
+    """
+
+    return (tuple(self.author_path), repr(self.value))
+
   def export(self):
     return self.value.export() | {
       "runtimeInfo": {
         "authorPath": self.author_path,
         "eventIndex": self.event_index,
+        "occurrenceCount": self.occurrence_count
       }
     }
 
@@ -97,20 +110,44 @@ class MasterAnalysis(BaseAnalysis):
   errors: list[RuntimeMasterAnalysisItem[Diagnostic]] = field(default_factory=list)
   warnings: list[RuntimeMasterAnalysisItem[Diagnostic]] = field(default_factory=list)
 
+  _changed_items: set[tuple[MasterAnalysisItemKind, int]] = comserde.field(default_factory=set, init=False, compare=False, repr=False, serialize=False)
+  _item_indices: dict[tuple[MasterAnalysisItemKind, Hashable], int] = comserde.field(default_factory=dict, init=False, compare=False, repr=False, serialize=False)
+
   def add_runtime(self, other: RuntimeAnalysis, /, author_path: list[int], event_index: int):
-    def add_items(items: list[T_DiagnosticOrEffect]):
-      return [RuntimeMasterAnalysisItem(item, author_path=author_path, event_index=event_index) for item in items]
+    for item in other.effects:
+      self._add_item('effects', RuntimeMasterAnalysisItem(item, author_path=author_path, event_index=event_index))
+
+    for item in other.errors:
+      self._add_item('errors', RuntimeMasterAnalysisItem(item, author_path=author_path, event_index=event_index))
 
-    self.effects += add_items(other.effects)
-    self.errors += add_items(other.errors)
-    self.warnings += add_items(other.warnings)
+    for item in other.warnings:
+      self._add_item('warnings', RuntimeMasterAnalysisItem(item, author_path=author_path, event_index=event_index))
 
   def _add(self, other: 'MasterAnalysis', /):
     super()._add(other)
 
-    self.errors += other.errors
-    self.effects += other.effects
-    self.warnings += other.warnings
+    for item in other.errors:
+      self._add_item('errors', item)
+
+    for item in other.effects:
+      self._add_item('effects', item)
+
+    for item in other.warnings:
+      self._add_item('warnings', item)
+
+  def _add_item(self, kind: MasterAnalysisItemKind, item: RuntimeMasterAnalysisItem, /):
+    # Identical items, such as a warning produced on each cycle of a loop, are merged into their first occurrence
+    items: list[RuntimeMasterAnalysisItem] = getattr(self, kind)
+    key = (kind, item.get_key())
+
+    if (index := self._item_indices.get(key)) is not None:
+      items[index].occurrence_count += item.occurrence_count
+    else:
+      index = len(items)
+      items.append(replace(item))
+      self._item_indices[key] = index
+
+    self._changed_items.add((kind, index))
 
   def export(self):
     return {
@@ -119,11 +156,61 @@ class MasterAnalysis(BaseAnalysis):
       "warnings": [warning.export() for warning in self.warnings]
     }
 
+  def export_changes(self):
+    """
+    Exports items which were added, or whose occurrence count changed, since the previous call.
+
+    Only changes produced by merging analyses are tracked, as with `+=`.
+
+    Returns
+      A dictionary with, for each kind of item, a dictionary which maps the index of each changed item to its export.
+    """
+
+    changes: dict[MasterAnalysisItemKind, dict[int, Any]] = {
+      "effects": {},
+      "errors": {},
+      "warnings": {}
+    }
+
+    for kind, index in self._changed_items:
+      changes[kind][index] = getattr(self, kind)[index].export()
+
+    self._changed_items.clear()
+    return changes
+
+  def export_page(self, kind: MasterAnalysisItemKind, /, *, limit: int, offset: int = 0):
+    """
+    Exports a range of items of a given kind.
+
+    Parameters
+      kind: The kind of items to export.
+      limit: The maximum number of items to export.
+      offset: The index of the first item to export.
+
+    Raises
+      ValueError: If the kind is unknown, or if the limit or offset is not a non-negative integer.
+    """
+
+    if kind not in get_args(MasterAnalysisItemKind):
+      raise ValueError(f"Invalid item kind {kind!r}")
+
+    for name, value in [('limit', limit), ('offset', offset)]:
+      if (not isinstance(value, int)) or isinstance(value, bool) or (value < 0):
+        raise ValueError(f"Invalid {name} {value!r}")
+
+    items: list[RuntimeMasterAnalysisItem] = getattr(self, kind)
+
+    return {
+      "items": [item.export() for item in items[offset:(offset + limit)]],
+      "totalCount": len(items)
+    }
+
 
 __all__ = [
   'Effect',
   'FileCreatedEffect',
   'GenericEffect',
   'MasterAnalysis',
+  'MasterAnalysisItemKind',
   'RuntimeAnalysis'
 ]
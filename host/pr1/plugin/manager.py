@@ -2,6 +2,7 @@ import importlib
 import importlib.metadata
 import importlib.util
 import sys
+from collections.abc import Mapping
 from dataclasses import dataclass
 from importlib.metadata import EntryPoint
 from types import EllipsisType
@@ -10,6 +11,7 @@ from typing import TYPE_CHECKING, Any, NewType, Optional, Protocol
 from .. import logger
 from ..analysis import DiagnosticAnalysis
 from ..fiber.parser import AnalysisContext, BaseParser
+from ..profiler import startup_profiler
 from ..reader import LocatedValue
 from ..units.base import BaseExecutor, BaseRunner, Metadata
 from ..util.misc import create_datainstance
@@ -37,22 +39,85 @@ class PluginInfo:
   entry_point: EntryPoint
   options: LocatedValue[Optional[Any]]
   namespace: PluginName
-  plugin: PluginProtocol
+  _plugin: Optional[PluginProtocol] = None
 
   @property
-  def metadata(self):
-    return self.plugin.metadata
+  def loaded(self):
+    return self._plugin is not None
 
   @property
-  def version(self):
-    return self.plugin.version
+  def metadata(self) -> Metadata:
+    if self._plugin:
+      return getattr(self._plugin, 'metadata', Metadata())
+
+    # Avoid importing the plugin only to display its metadata
+    distribution = self.entry_point.dist
+
+    return Metadata(
+      description=(distribution and distribution.metadata.get('Summary')),
+      title=self.namespace,
+      version=(distribution and distribution.version)
+    )
+
+  @property
+  def plugin(self) -> PluginProtocol:
+    """
+    The plugin's module, imported on first access.
+    """
+
+    if self._plugin is None:
+      with startup_profiler.measure('import', self.entry_point.module):
+        self._plugin = self.entry_point.load()
+
+      logger.debug(f"Imported plugin '{self.namespace}'")
+
+    return self._plugin
+
+  @plugin.setter
+  def plugin(self, value: PluginProtocol):
+    self._plugin = value
+
+  @property
+  def version(self) -> int:
+    """
+    The plugin's version, or 0 if the plugin has not been imported, which is only the case of disabled plugins.
+    """
+
+    return self._plugin.version if self._plugin else 0
+
+
+class LazyPluginMapping(Mapping[PluginName, PluginProtocol]):
+  def __init__(self, plugin_infos: dict[PluginName, PluginInfo], /):
+    self._plugin_infos = plugin_infos
+
+  def __getitem__(self, key: PluginName, /):
+    return self._plugin_infos[key].plugin
+
+  def __iter__(self):
+    return iter(self._plugin_infos)
+
+  def __len__(self):
+    return len(self._plugin_infos)
 
 
 class PluginManager:
   def __init__(self, conf):
+    """
+    Registers the plugins installed as entry points.
+
+    Enabled plugins are imported immediately to check that their namespace matches the name of their entry point, and are otherwise ignored. Disabled plugins are never imported, hence they are registered under the name of their entry point without this check.
+    """
+
     self.load(conf)
     self.revision = 0
 
+  @property
+  def Parsers(self):
+    if self._Parsers is None:
+      self._Parsers = [plugin.Parser for plugin in self.plugins.values() if hasattr(plugin, 'Parser')]
+
+    return self._Parsers
+
   def create_executor(self, namespace: PluginName, host: 'Host'):
     context = AnalysisContext()
     plugin_info = self.plugin_infos[namespace]
@@ -78,23 +143,18 @@ class PluginManager:
 
   def load(self, conf: 'LocatedValue[dict[str, PluginConf]]'):
     self.plugin_infos = dict[PluginName, PluginInfo]()
-    self.plugins = dict[PluginName, PluginProtocol]()
+    self._Parsers: Optional[list[type[BaseParser]]] = None
 
     for entry_point in [
       *importlib.metadata.entry_points(group="automancer.plugins"),
       *importlib.metadata.entry_points(group="pr1.units") # Deprecated
     ]:
-      plugin: PluginProtocol = entry_point.load()
-      namespace = plugin.namespace
+      # The entry point's name is used as the namespace such that the plugin need not be imported
+      namespace = PluginName(entry_point.name)
 
       if namespace in self.plugin_infos:
-        logger.warn(f"Duplicate plugin with name '{namespace}'")
-        logger.warn("This plugin will be ignored.")
-        continue
-
-      if namespace != entry_point.name:
-        logger.warn(f"Invalid plugin name '{namespace}' for entry point '{entry_point.name}'")
-        logger.warn("This plugin will be ignored.")
+        logger.warning(f"Duplicate plugin with name '{namespace}'")
+        logger.warning("This plugin will be ignored.")
         continue
 
       plugin_conf: 'PluginConf' = conf.value.get(namespace, create_datainstance(dict(
@@ -108,28 +168,26 @@ class PluginManager:
         enabled=plugin_conf.enabled,
         entry_point=entry_point,
         namespace=namespace,
-        options=plugin_conf.options,
-        plugin=plugin
+        options=plugin_conf.options
       )
 
+      if plugin_info.enabled and (plugin_info.plugin.namespace != namespace):
+        logger.warning(f"Invalid plugin name '{plugin_info.plugin.namespace}' for entry point '{namespace}'")
+        logger.warning("This plugin will be ignored.")
+        continue
+
       self.plugin_infos[namespace] = plugin_info
       logger.debug(f"Registered plugin '{namespace}'")
 
     for plugin_info in self.plugin_infos.values():
-      if plugin_info.enabled:
-        self.plugins[plugin_info.namespace] = plugin_info.plugin
-
-        if plugin_info.development:
-          logger.info(f"Loaded plugin '{plugin_info.namespace}' in development mode")
-        else:
-          logger.debug(f"Loaded plugin '{plugin_info.namespace}'")
-
+      if plugin_info.enabled and plugin_info.development:
+        logger.info(f"Enabled plugin '{plugin_info.namespace}' in development mode")
 
-    self.Parsers = [plugin.Parser for plugin in self.plugins.values() if hasattr(plugin, 'Parser')]
+    self.plugins = LazyPluginMapping({ namespace: plugin_info for namespace, plugin_info in self.plugin_infos.items() if plugin_info.enabled })
 
   def reload(self):
     for plugin_info in self.plugin_infos.values():
-      if plugin_info.development and plugin_info.enabled:
+      if plugin_info.development and plugin_info.enabled and plugin_info.loaded:
         reload_count = 1
 
         importlib.reload(sys.modules[plugin_info.entry_point.module])
@@ -140,10 +198,10 @@ class PluginManager:
             reload_count += 1
 
         plugin_info.plugin = plugin_info.entry_point.load()
-        self.plugins[plugin_info.namespace] = plugin_info.plugin
 
         logger.debug(f"Reloaded plugin '{plugin_info.namespace}' by reloading {reload_count} modules")
 
+    self._Parsers = None
     self.revision += 1
 
 
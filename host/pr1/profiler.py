@@ -0,0 +1,95 @@
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Literal
+
+
+StartupProfileCategory = Literal['executor', 'experiment', 'host', 'import']
+
+
+@dataclass(frozen=True, kw_only=True)
+class StartupProfileRecord:
+  category: StartupProfileCategory
+  duration: float
+  name: str
+  start_time: float
+
+  def export(self):
+    return {
+      "category": self.category,
+      "duration": self.duration,
+      "name": self.name,
+      "startTime": self.start_time
+    }
+
+
+class StartupProfiler:
+  def __init__(self):
+    """
+    Records the time spent on the operations performed while the host starts, such as importing modules, starting executors and loading experiments.
+
+    Records are always collected as they are cheap to produce, and are only displayed when requested.
+    """
+
+    self.records = list[StartupProfileRecord]()
+    self.start_time = time.perf_counter()
+
+  def add(self, category: StartupProfileCategory, name: str, *, duration: float, start_time: float):
+    self.records.append(StartupProfileRecord(
+      category=category,
+      duration=duration,
+      name=name,
+      start_time=(start_time - self.start_time)
+    ))
+
+  @contextmanager
+  def measure(self, category: StartupProfileCategory, name: str):
+    """
+    Records the time spent in a `with` block.
+
+    Parameters
+      category: The category of the operation.
+      name: The name of the operation, such as a module name.
+    """
+
+    start_time = time.perf_counter()
+
+    try:
+      yield
+    finally:
+      self.add(category, name, duration=(time.perf_counter() - start_time), start_time=start_time)
+
+  def export(self):
+    return {
+      "records": [record.export() for record in self.records]
+    }
+
+  def format(self):
+    """
+    Formats the records as text, with the slowest operations of each category first.
+
+    Import times include the time spent importing the dependencies of each module which were not imported yet.
+    """
+
+    output = str()
+
+    for category in ('import', 'host', 'executor', 'experiment'):
+      records = sorted([record for record in self.records if record.category == category], key=(lambda record: -record.duration))
+
+      if records:
+        output += f"{category.capitalize()} ({sum(record.duration for record in records) * 1000:.1f} ms)\n"
+
+        for record in records:
+          output += f"  {record.duration * 1000:8.1f} ms  {record.name}\n"
+
+    return output
+
+
+startup_profiler = StartupProfiler()
+
+
+__all__ = [
+  'StartupProfileRecord',
+  'StartupProfiler',
+  'startup_profiler'
+]
@@ -1,11 +1,16 @@
+from collections import OrderedDict
 from dataclasses import dataclass, field
+import copy
+import dataclasses
 from enum import Enum
 import ast
+import bisect
 import functools
 import math
 import re
 import sys
-from typing import Any, Generic, Optional, TypeVar, cast
+import threading
+from typing import Any, Generic, Optional, Sequence, TypeVar, cast
 
 from .util.misc import DataInstance, create_datainstance
 from .error import Diagnostic, DiagnosticDocumentReference
@@ -40,7 +45,21 @@ class Location:
     return self.source.offset_position(self.offset)
 
 
+def _set_slots_state(obj: object, state: Any, /):
+  # Objects pickled before their class declared slots, such as those in existing reports, carry their __dict__ as state,
+  # while objects pickled since carry a (__dict__ or None, slots) tuple.
+  dict_state, slots_state = state if isinstance(state, tuple) else (state, None)
+
+  for key, value in [*(dict_state or dict()).items(), *(slots_state or dict()).items()]:
+    object.__setattr__(obj, key, value)
+
+
 class LocationRange:
+  __slots__ = ('end', 'source', 'start')
+
+  def __setstate__(self, state: Any):
+    _set_slots_state(self, state)
+
   def __init__(self, source: 'Source', start: int, end: int):
     self.end = end
     self.source = source
@@ -87,8 +106,18 @@ class LocationRange:
 
 
 class LocationArea:
-  def __init__(self, ranges: Optional[list[LocationRange]] = None):
-    self.ranges = ranges or list()
+  __slots__ = ('ranges',)
+
+  # Ranges are stored in a tuple, which avoids allocating a separate item array in the common single-range case and
+  # allows the empty tuple to be shared by all empty areas.
+  def __init__(self, ranges: Optional[Sequence[LocationRange]] = None):
+    self.ranges: tuple[LocationRange, ...] = tuple(ranges) if ranges else ()
+
+  def __setstate__(self, state: Any):
+    _set_slots_state(self, state)
+
+    # Ranges were previously stored in a list
+    self.ranges = tuple(self.ranges)
 
   @property
   def source(self):
@@ -116,13 +145,12 @@ class LocationArea:
       return output
 
     source = self.ranges[0].source
-    lines_source = source.splitlines()
+    lines_source = source.value.split("\n")
 
     lines_ranges = dict()
+    positions = source.offset_positions([offset for locrange in self.ranges for offset in (locrange.start, locrange.end)])
 
-    for locrange in self.ranges:
-      start = locrange.start_position
-      end = locrange.end_position
+    for start, end in zip(positions[0::2], positions[1::2]):
 
       for line_index in range(start.line, end.line + (1 if end.column > 0 else 0)):
         if not (line_index in lines_ranges):
@@ -157,7 +185,8 @@ class LocationArea:
     return output
 
   def __add__(self, other: 'LocationArea'):
-    ranges = (self.ranges + [other]) if isinstance(other, LocationRange) else (self.ranges + other.ranges)
+    ranges = (*self.ranges, other) if isinstance(other, LocationRange) else (self.ranges + other.ranges)
+
     output = list()
 
     for range in sorted(ranges):
@@ -172,6 +201,15 @@ class LocationArea:
   def __mod__(self, offset: tuple[int, int] | int):
     start, end = offset if isinstance(offset, tuple) else (offset, offset + 1)
 
+    if len(self.ranges) == 1:
+      range = self.ranges[0]
+      length = range.end - range.start
+
+      if (end < 0) or (start > length):
+        return LocationArea()
+
+      return LocationArea((LocationRange(range.source, range.start + max(start, 0), range.end - max(length - end, 0)),))
+
     index = 0
     output = list()
 
@@ -260,6 +298,15 @@ T_co = TypeVar('T_co', covariant=True)
 
 class LocatedValue(Generic[T_co]):
   __match_args__ = ('value', 'area')
+  __slots__ = ()
+
+  # Instances of LocatedValue itself are created as LocatedValueContainer instances, as this class cannot declare
+  # slots without conflicting with the layout of builtin types in LocatedDict, LocatedList and LocatedString.
+  def __new__(cls, *args, **kwargs):
+    return super().__new__(LocatedValueContainer if cls is LocatedValue else cls)
+
+  def __setstate__(self, state: Any):
+    _set_slots_state(self, state)
 
   def __init__(self, value: T_co, area: LocationArea, *, full_area: Optional[LocationArea] = None):
     self.area = area
@@ -316,6 +363,11 @@ class LocatedValue(Generic[T_co]):
 
 
 class UnlocatedValue(Generic[T]):
+  __slots__ = ('area', 'value')
+
+  def __setstate__(self, state: Any):
+    _set_slots_state(self, state)
+
   def __init__(self, value: T, /):
     self.area = None
     self.value = value
@@ -337,10 +389,13 @@ PossiblyLocatedValue = LocatedValue[T] | UnlocatedValue[T]
 
 
 class LocatedValueContainer(LocatedValue[T], Generic[T]):
+  __slots__ = ('area', 'full_area', 'value')
+
   def __repr__(self):
     return f"{self.__class__.__name__}({self.value!r})"
 
 
+# Subclasses of str cannot declare non-empty slots, hence instances of this class keep a __dict__.
 class LocatedString(str, LocatedValue[str]):
   def __new__(cls, value: str, *args, **kwargs):
     return super(LocatedString, cls).__new__(cls, value)
@@ -405,13 +460,17 @@ class LocatedString(str, LocatedValue[str]):
     stripped = self.value.rstrip(chars)
     return self[0:len(stripped)]
 
+  # Offsets at which each line starts, followed by the total length
   @functools.cached_property
   def _line_cumlengths(self):
     lengths = [0]
+    index = self.value.find("\n")
 
-    for line in self.splitlines(keepends=True):
-      lengths.append(lengths[-1] + len(line))
+    while index >= 0:
+      lengths.append(index + 1)
+      index = self.value.find("\n", index + 1)
 
+    lengths.append(len(self.value))
     return lengths
 
   def compute_location(self, position: Position):
@@ -442,10 +501,28 @@ class LocatedString(str, LocatedValue[str]):
     return self[start:end]
 
   def offset_position(self, offset: int):
-    line = self.value[:offset].count("\n")
-    column = (offset - self.value[:offset].rindex("\n") - 1) if line > 0 else offset
+    cumlengths = self._line_cumlengths
+    line = bisect.bisect_right(cumlengths, offset, hi=(len(cumlengths) - 1)) - 1
+
+    return Position(line, offset - cumlengths[line])
+
+  # Converts offsets, in any order, to positions in a single pass over the line table
+  def offset_positions(self, offsets: list[int], /):
+    cumlengths = self._line_cumlengths
+    line_count = len(cumlengths) - 1
+
+    line = 0
+    positions = [cast(Position, None)] * len(offsets)
+
+    for index in sorted(range(len(offsets)), key=offsets.__getitem__):
+      offset = offsets[index]
+
+      while (line + 1 < line_count) and (cumlengths[line + 1] <= offset):
+        line += 1
+
+      positions[index] = Position(line, offset - cumlengths[line])
 
-    return Position(line, column)
+    return positions
 
   @staticmethod
   def from_match_group(match: re.Match, group: int):
@@ -457,6 +534,8 @@ K = TypeVar('K')
 V = TypeVar('V')
 
 class LocatedDict(dict[K, V], LocatedValue[dict[K, V]], Generic[K, V]):
+  __slots__ = ('area', 'full_area', 'value')
+
   def __new__(cls, *args, **kwargs):
     return super(LocatedDict, cls).__new__(cls)
 
@@ -472,6 +551,8 @@ class LocatedDict(dict[K, V], LocatedValue[dict[K, V]], Generic[K, V]):
 
 
 class LocatedList(list[T], LocatedValue[list[T]], Generic[T]):
+  __slots__ = ('area', 'full_area', 'value')
+
   def __new__(cls, *args, **kwargs):
     return super(LocatedList, cls).__new__(cls)
 
@@ -496,6 +577,8 @@ class Source(LocatedString):
 ObjectComments = list[LocatedString]
 
 class ReliableLocatedDict(LocatedDict[K, V], Generic[K, V]):
+  __slots__ = ('comments', 'completion_ranges', 'fold_range')
+
   def __init__(self, value: dict, /, area: LocationArea, *, comments: dict[LocatedValue, ObjectComments], completion_ranges: Optional[set[LocationRange]] = None, fold_range: LocationRange, full_area: LocationArea):
     super().__init__(value, area)
 
@@ -515,6 +598,8 @@ class ReliableLocatedDict(LocatedDict[K, V], Generic[K, V]):
     )
 
 class ReliableLocatedList(LocatedList):
+  __slots__ = ('comments', 'completion_ranges', 'fold_range')
+
   def __init__(self, value: list, /, area: LocationArea, *, comments: list[ObjectComments], completion_ranges: Optional[set[LocationRange]] = None, fold_range: LocationRange, full_area: LocationArea):
     super().__init__(value, area)
 
@@ -628,125 +713,135 @@ def tokenize(raw_source: Source | str, /):
   source = Source(raw_source) if not isinstance(raw_source, Source) else raw_source
   tokens = list[Token]()
 
+  for full_line in source.splitlines(keepends=True):
+    token, line_errors, line_warnings = tokenize_line(full_line)
 
-  # Check if all characters are ASCII
-
-  for line in source.splitlines():
-    if not is_basic_ascii(line):
-      start_index = None
+    errors += line_errors
+    warnings += line_warnings
 
-      for index, ch in enumerate(line):
-        if is_basic_ascii(ch):
-          if start_index is not None:
-            warnings.append(InvalidCharacterError(line[start_index:index]))
-            start_index = None
-        else:
-          if start_index is None:
-            start_index = index
+    if token:
+      tokens.append(token)
 
-      if start_index is not None:
-        warnings.append(InvalidCharacterError(line[start_index:]))
+  return tokens, errors, warnings
 
 
-  # Iterate over all lines and identify their line break
-  for full_line in source.splitlines(keepends=True):
-    if full_line[-1] == "\n":
-      line = full_line[:-1]
-      line_break = full_line[-1]
-    else:
-      line = full_line
-      line_break = str()
+# Tokenizes a single line, including its line break if any
+def tokenize_line(full_line: LocatedString, /) -> tuple[Optional[Token], list[ReaderError], list[ReaderError]]:
+  errors = list[ReaderError]()
+  warnings = list[ReaderError]()
 
-    # Find and remove the comment on the line, if any
-    comment_offset = line.find("#")
+  # Identify the line break
+  if full_line[-1] == "\n":
+    line = full_line[:-1]
+    line_break = full_line[-1]
+  else:
+    line = full_line
+    line_break = str()
 
-    if comment_offset >= 0:
-      comment = line[(comment_offset + 1):].strip() or None
-      line = line[0:comment_offset]
+  # Check if all characters are ASCII
+  if not is_basic_ascii(line):
+    start_index = None
+
+    for index, ch in enumerate(line):
+      if is_basic_ascii(ch):
+        if start_index is not None:
+          warnings.append(InvalidCharacterError(line[start_index:index]))
+          start_index = None
+      else:
+        if start_index is None:
+          start_index = index
+
+    if start_index is not None:
+      warnings.append(InvalidCharacterError(line[start_index:]))
+
+  # Find and remove the comment on the line, if any
+  comment_offset = line.find("#")
+
+  if comment_offset >= 0:
+    comment = line[(comment_offset + 1):].strip() or None
+    line = line[0:comment_offset]
+  else:
+    comment = None
+
+  # Calculate the indentation
+  indent_offset = len(line) - len(line.lstrip(Whitespace))
+
+  # Remove whitespace on the right end of the line
+  unstripped_line = line
+  line = line.rstrip(Whitespace)
+
+  # If the line only contained whitespace, that whitespace has already been removed above.
+  if indent_offset % IndentationWidth > 0:
+    # Raise an error if there is an odd whitespace count on the left end of the line and it is not empty
+    if line:
+      errors.append(UnreadableIndentationError(line[indent_offset:]))
+      return None, errors, warnings
     else:
+      # Otherwise suppress the comment if the line is empty
       comment = None
 
-    # Calculate the indentation
-    indent_offset = len(line) - len(line.lstrip(Whitespace))
-
-    # Remove whitespace on the right end of the line
-    unstripped_line = line
-    line = line.rstrip(Whitespace)
-
-    # If the line only contained whitespace, that whitespace has already been removed above.
-    if indent_offset % IndentationWidth > 0:
-      # Raise an error if there is an odd whitespace count on the left end of the line and it is not empty
-      if line:
-        errors.append(UnreadableIndentationError(line[indent_offset:]))
-        continue
-      else:
-        # Otherwise suppress the comment if the line is empty
-        comment = None
-
-    # Initialize a token instance
-    offset = indent_offset
-    token = Token(
-      comment=comment,
-      data=line[offset:],
-      depth=(indent_offset // IndentationWidth),
-      key=None,
-      kind=TokenKind.Default,
-      raw_value=None,
-      value=None
-    )
-
-    # Skip this line if empty or full of whitespace
-    if not line:
-      token.raw_value = unstripped_line
-
-    # If the line starts with a '|', then the token is a string and this iteration ends
-    elif line[offset] == "|":
+  # Initialize a token instance
+  offset = indent_offset
+  token = Token(
+    comment=comment,
+    data=line[offset:],
+    depth=(indent_offset // IndentationWidth),
+    key=None,
+    kind=TokenKind.Default,
+    raw_value=None,
+    value=None
+  )
+
+  # Skip this line if empty or full of whitespace
+  if not line:
+    token.raw_value = unstripped_line
+
+  # If the line starts with a '|', then the token is a string and this iteration ends
+  elif line[offset] == "|":
+    offset = get_offset(line, offset)
+    token.kind = TokenKind.String
+    token.value = line[offset:] + line_break
+
+  # Otherwise, continue
+  else:
+    # If the line starts with a '-', then the token is a list
+    if line[offset] == "-":
       offset = get_offset(line, offset)
-      token.kind = TokenKind.String
-      token.value = line[offset:] + line_break
+      token.kind = TokenKind.List
 
-    # Otherwise, continue
-    else:
-      # If the line starts with a '-', then the token is a list
-      if line[offset] == "-":
-        offset = get_offset(line, offset)
-        token.kind = TokenKind.List
+    colon_offset = line.find(":", offset)
 
-      colon_offset = line.find(":", offset)
+    # If there is a ':', the token is a key or key-value pair, possibly also a list
+    if colon_offset >= 0:
+      key = line[offset:colon_offset].rstrip(Whitespace)
+      value_offset = get_offset(line, colon_offset)
+      value = line[value_offset:]
 
-      # If there is a ':', the token is a key or key-value pair, possibly also a list
-      if colon_offset >= 0:
-        key = line[offset:colon_offset].rstrip(Whitespace)
-        value_offset = get_offset(line, colon_offset)
-        value = line[value_offset:]
-
-        if key:
-          token.key = key
-        else:
-          errors.append(MissingKeyError(key))
-          token.key = None
-
-        token.value = value if value else None
+      if key:
+        token.key = key
+      else:
+        errors.append(MissingKeyError(key))
+        token.key = None
 
-      # If the token is a list, then it is just a value
-      elif token.kind == TokenKind.List:
-        value = line[offset:]
+      token.value = value if value else None
 
-        if value:
-          token.value = value
-        else:
-          errors.append(InvalidLineError(token.data))
-          token.raw_value = unstripped_line[offset:]
-          token.value = None
+    # If the token is a list, then it is just a value
+    elif token.kind == TokenKind.List:
+      value = line[offset:]
 
-      # Otherwise the line is invalid
+      if value:
+        token.value = value
       else:
         errors.append(InvalidLineError(token.data))
-        token.value = line[offset:]
+        token.raw_value = unstripped_line[offset:]
+        token.value = None
 
-    tokens.append(token)
+    # Otherwise the line is invalid
+    else:
+      errors.append(InvalidLineError(token.data))
+      token.value = line[offset:]
 
-  return tokens, errors, warnings
+  return token, errors, warnings
 
 
 # Removes the index of the first non-whitespace character in 'line' starting from 'origin'
@@ -803,7 +898,32 @@ class InvalidTokenError(ReaderError):
     )
 
 
-def analyze(tokens: list[Token]):
+# State of the analysis right before processing a top-level token, when only the root entry is on the stack
+@dataclass(frozen=True, kw_only=True)
+class AnalysisCheckpoint:
+  comments: list[tuple[LocatedString, int]]
+  entry: StackEntry
+  error_count: int
+  token_index: int
+
+def copy_stack_entry(entry: StackEntry, /):
+  copied_entry = StackEntry(
+    comments=entry.comments.copy(),
+    key=entry.key,
+    area=entry.area,
+    mode=entry.mode,
+    parent_key=entry.parent_key,
+    token=entry.token,
+    value=(entry.value.copy() if isinstance(entry.value, dict | list) else entry.value)
+  )
+
+  copied_entry.dict_ranges = entry.dict_ranges.copy()
+  copied_entry.list_ranges = entry.list_ranges.copy()
+
+  return copied_entry
+
+
+def analyze(tokens: list[Token], /, *, checkpoint: Optional[tuple[AnalysisCheckpoint, list[ReaderError]]] = None, checkpoints: Optional[list[AnalysisCheckpoint]] = None):
   errors = list[ReaderError]()
   warnings = list[ReaderError]()
 
@@ -811,6 +931,17 @@ def analyze(tokens: list[Token]):
   stack = [StackEntry()]
   whitespace_tokens = list[Token]()
 
+  # Resume from a checkpoint, provided with the errors of the analysis that produced it
+  if checkpoint:
+    resumed_checkpoint, resumed_errors = checkpoint
+
+    comments = resumed_checkpoint.comments.copy()
+    errors = resumed_errors[:resumed_checkpoint.error_count]
+    stack = [copy_stack_entry(resumed_checkpoint.entry)]
+    start_index = resumed_checkpoint.token_index
+  else:
+    start_index = 0
+
   # Pops the stack until reaching 'new_depth'
   def descend(new_depth: int):
     depth = len(stack) - 1
@@ -852,7 +983,8 @@ def analyze(tokens: list[Token]):
     whitespace_tokens.clear()
 
 
-  for token in tokens:
+  for token_index in range(start_index, len(tokens)):
+    token = tokens[token_index]
     depth = len(stack) - 1
     head = stack[-1]
 
@@ -874,6 +1006,14 @@ def analyze(tokens: list[Token]):
     descend(token.depth)
     head = stack[-1]
 
+    if (checkpoints is not None) and (token.depth < 1):
+      checkpoints.append(AnalysisCheckpoint(
+        comments=comments.copy(),
+        entry=copy_stack_entry(head),
+        error_count=len(errors),
+        token_index=token_index
+      ))
+
     # Calculate relevant comments for this token
     relevant_comments = ObjectComments()
 
@@ -1009,17 +1149,21 @@ def add_location(entry: StackEntry) -> Any:
     case StackEntryMode.Dict:
       assert isinstance(entry.value, dict)
 
-      area = LocationArea()
-      full_area = LocationArea()
+      area_ranges = list[LocationRange]()
+      full_area_ranges = list[LocationRange]()
 
       for key, value in entry.value.items():
-        full_area += LocationArea([(key.full_area + value.full_area).enclosing_range()])
+        full_area_ranges.append((key.full_area + value.full_area).enclosing_range())
 
         if isinstance(value, str):
           assert isinstance(value, LocatedString)
-          area += LocationArea([(key.area + value.area).enclosing_range()])
+          area_ranges.append((key.area + value.area).enclosing_range())
         else:
-          area += key.area
+          area_ranges += key.area.ranges
+
+      # Merge all ranges at once rather than one item at a time
+      area = LocationArea() + LocationArea(area_ranges)
+      full_area = LocationArea() + LocationArea(full_area_ranges)
 
       return ReliableLocatedDict(
         entry.value,
@@ -1033,12 +1177,15 @@ def add_location(entry: StackEntry) -> Any:
     case StackEntryMode.List:
       assert isinstance(entry.value, list)
 
-      area = LocationArea()
-      full_area = LocationArea()
+      area_ranges = list[LocationRange]()
+      full_area_ranges = list[LocationRange]()
 
       for item in entry.value:
-        full_area += item.full_area
-        area += item.area
+        area_ranges += item.area.ranges
+        full_area_ranges += item.full_area.ranges
+
+      area = LocationArea() + LocationArea(area_ranges)
+      full_area = LocationArea() + LocationArea(full_area_ranges)
 
       return ReliableLocatedList(
         entry.value,
@@ -1119,6 +1266,181 @@ def loads2(raw_source: Source | str, /):
   ), result
 
 
+## Incremental reading
+
+@dataclass(kw_only=True)
+class IncrementalReaderDocument:
+  analysis_checkpoints: list[AnalysisCheckpoint]
+  analysis_errors: list[ReaderError]
+  analysis_warnings: list[ReaderError]
+  lines: list[tuple[Optional[Token], list[ReaderError], list[ReaderError]]]
+  result: Any
+  source: Source
+  source_count: int
+  tokens: list[Token]
+
+# Reads successive revisions of documents, identified by the origin of their source. Only lines that changed since the
+# previous revision are tokenized again, and the analysis resumes from the nearest enclosing top-level key. Values
+# reused from a previous revision keep a reference to that revision's source, whose contents are identical up to the
+# first changed line. To avoid keeping an unbounded number of revisions alive, the document is re-rooted on the new
+# source and analyzed again from the start once its values may reference more than 'max_source_count' sources.
+class IncrementalReader:
+  def __init__(self, *, max_document_count: int = 100, max_source_count: int = 10):
+    """
+    Creates an incremental reader.
+
+    Parameters
+      max_document_count: The maximum number of documents kept, beyond which the least recently read ones are discarded.
+      max_source_count: The maximum number of sources, including that of the latest revision, which a document's values may reference.
+    """
+
+    self.max_document_count = max_document_count
+    self.max_source_count = max_source_count
+
+    self._documents = OrderedDict[Any, IncrementalReaderDocument]()
+    self._lock = threading.Lock()
+
+  def clear(self):
+    with self._lock:
+      self._documents.clear()
+
+  def discard(self, document_id: Any, /):
+    with self._lock:
+      self._documents.pop(document_id, None)
+
+  def loads(self, source: Source, /) -> tuple[Any, list[ReaderError], list[ReaderError]]:
+    if source.origin is None:
+      return loads(source)
+
+    with self._lock:
+      previous = self._documents.get(source.origin)
+
+    if previous and (previous.source.value == source.value):
+      document = previous
+    else:
+      document = self._read(source, previous)
+
+    with self._lock:
+      self._documents[source.origin] = document
+      self._documents.move_to_end(source.origin)
+
+      while len(self._documents) > self.max_document_count:
+        self._documents.popitem(last=False)
+
+    tokenization_errors = [error for _, line_errors, _ in document.lines for error in line_errors]
+    tokenization_warnings = [warning for _, _, line_warnings in document.lines for warning in line_warnings]
+
+    return document.result, tokenization_errors + document.analysis_errors, tokenization_warnings + document.analysis_warnings
+
+  def _read(self, source: Source, previous: Optional[IncrementalReaderDocument]):
+    new_cumlengths = source._line_cumlengths
+    new_line_count = len(new_cumlengths) - 1
+
+    # Whether to re-root the document on the new source, in which case nothing from the previous revision is reused except for unchanged lines
+    reroot = (previous is not None) and (previous.source_count >= self.max_source_count)
+
+    if previous:
+      old_cumlengths = previous.source._line_cumlengths
+      old_line_count = len(old_cumlengths) - 1
+
+      old_lines = previous.source.value.split("\n")
+      new_lines = source.value.split("\n")
+
+      # The last line is never part of the common prefix as its line break might have changed
+      max_common_count = min(old_line_count, new_line_count) - 1
+
+      prefix_count = 0
+
+      while (prefix_count < max_common_count) and (old_lines[prefix_count] == new_lines[prefix_count]):
+        prefix_count += 1
+
+      suffix_count = 0
+
+      while (prefix_count + suffix_count < max_common_count + 1) and (old_lines[-1 - suffix_count] == new_lines[-1 - suffix_count]):
+        suffix_count += 1
+
+      delta = new_cumlengths[new_line_count - suffix_count] - old_cumlengths[old_line_count - suffix_count]
+
+      lines = [
+        *([rebase_line(line, source, 0) for line in previous.lines[:prefix_count]] if reroot else previous.lines[:prefix_count]),
+        *[tokenize_line(source[new_cumlengths[index]:new_cumlengths[index + 1]]) for index in range(prefix_count, new_line_count - suffix_count)],
+        *[rebase_line(line, source, delta) for line in previous.lines[(old_line_count - suffix_count):]]
+      ]
+
+      # Find the index of the first token that changed, and the last checkpoint before it
+      changed_token_index = sum(1 for token, _, _ in previous.lines[:prefix_count] if token)
+      tokens = [token for token, _, _ in lines if token]
+
+      checkpoint = None if reroot else next((
+        checkpoint for checkpoint in previous.analysis_checkpoints[::-1]
+        if (checkpoint.token_index < changed_token_index) or (
+          (checkpoint.token_index == changed_token_index) and
+          (checkpoint.token_index < len(tokens)) and
+          is_top_level_token(tokens[checkpoint.token_index])
+        )
+      ), None)
+    else:
+      lines = [tokenize_line(source[new_cumlengths[index]:new_cumlengths[index + 1]]) for index in range(new_line_count)]
+      tokens = [token for token, _, _ in lines if token]
+      checkpoint = None
+
+    if checkpoint:
+      assert previous
+      analysis_checkpoints = [other_checkpoint for other_checkpoint in previous.analysis_checkpoints if other_checkpoint.token_index < checkpoint.token_index]
+      result, analysis_errors, analysis_warnings = analyze(tokens, checkpoint=(checkpoint, previous.analysis_errors), checkpoints=analysis_checkpoints)
+    else:
+      analysis_checkpoints = list[AnalysisCheckpoint]()
+      result, analysis_errors, analysis_warnings = analyze(tokens, checkpoints=analysis_checkpoints)
+
+    return IncrementalReaderDocument(
+      analysis_checkpoints=analysis_checkpoints,
+      analysis_errors=analysis_errors,
+      analysis_warnings=analysis_warnings,
+      lines=lines,
+      result=result,
+      source=source,
+      source_count=((previous.source_count + 1) if (previous and not reroot) else 1),
+      tokens=tokens
+    )
+
+
+# Whether analyzing this token returns to the root level
+def is_top_level_token(token: Token, /):
+  return (token.depth < 1) and not ((token.kind == TokenKind.Default) and (not token.key) and (not token.value) and (token.raw_value is not None))
+
+def rebase_area(area: LocationArea, source: Source, delta: int):
+  return LocationArea([LocationRange(source, locrange.start + delta, locrange.end + delta) for locrange in area.ranges])
+
+def rebase_string(value: Optional[LocatedString], source: Source, delta: int):
+  return LocatedString(value.value, rebase_area(value.area, source, delta), absolute=value.absolute) if (value is not None) else None
+
+def rebase_error(error: ReaderError, source: Source, delta: int):
+  rebased_error = copy.copy(error)
+  rebased_error.references = [
+    dataclasses.replace(reference, area=rebase_area(reference.area, source, delta)) if isinstance(reference, DiagnosticDocumentReference) and reference.area else reference for reference in error.references
+  ]
+
+  return rebased_error
+
+# Moves the output of tokenize_line() to another source, shifting all offsets by 'delta'
+def rebase_line(line: tuple[Optional[Token], list[ReaderError], list[ReaderError]], source: Source, delta: int):
+  token, errors, warnings = line
+
+  return (
+    Token(
+      comment=rebase_string(token.comment, source, delta),
+      data=cast(LocatedString, rebase_string(token.data, source, delta)),
+      depth=token.depth,
+      key=rebase_string(token.key, source, delta),
+      kind=token.kind,
+      raw_value=rebase_string(token.raw_value, source, delta),
+      value=rebase_string(token.value, source, delta)
+    ) if token else None,
+    [rebase_error(error, source, delta) for error in errors],
+    [rebase_error(warning, source, delta) for warning in warnings]
+  )
+
+
 ## Tests
 
 if __name__ == "__main__":
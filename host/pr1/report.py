@@ -1,13 +1,21 @@
+import asyncio
+import os
+import threading
 from dataclasses import dataclass
-from typing import Annotated, Optional
+from pathlib import Path
+from typing import TYPE_CHECKING, Annotated, Any, Optional
 import comserde
 
+from . import logger
 from .history import TreeChange
 from .master.analysis import MasterAnalysis
 from .analysis import DiagnosticAnalysis
 from .draft import Draft
 from .fiber.parser import BaseBlock, GlobalContext
 
+if TYPE_CHECKING:
+  from .host import Host
+
 
 @comserde.serializable
 @dataclass
@@ -18,14 +26,20 @@ class ExperimentReportHeader:
   root: Annotated[BaseBlock, comserde.SerializationFormat('object')]
   start_time: float
 
+  _export: 'Optional[tuple[Host, object]]' = comserde.field(default=None, init=False, repr=False, serialize=False)
+
   def export(self, context: GlobalContext):
-    return {
-      "draft": self.draft.export(),
-      "initialAnalysis": self.analysis.export(),
-      "name": self.name,
-      "root": self.root.export(context),
-      "startDate": (self.start_time * 1000)
-    }
+    # The header never changes, hence it is only exported once
+    if (self._export is None) or (self._export[0] is not context.host):
+      self._export = (context.host, {
+        "draft": self.draft.export(),
+        "initialAnalysis": self.analysis.export(),
+        "name": self.name,
+        "root": self.root.export(context),
+        "startDate": (self.start_time * 1000)
+      })
+
+    return self._export[1]
 
 
 @comserde.serializable
@@ -34,3 +48,135 @@ class ExperimentReportEvent:
   analysis: Optional[MasterAnalysis]
   changes: list[TreeChange]
   time: float
+
+
+@dataclass(frozen=True, kw_only=True)
+class ExperimentReportWriterPolicy:
+  flush_interval: float = 1.0
+  flush_size: int = 64_000
+  max_buffer_size: int = 16_000_000
+  sync: bool = True
+
+class ExperimentReportWriter:
+  def __init__(self, path: Path, /, policy: ExperimentReportWriterPolicy):
+    """
+    Creates a writer which serializes report objects into a memory buffer and writes them to disk from a background thread.
+
+    The buffer is written when its size reaches `policy.flush_size`, when `policy.flush_interval` has elapsed, or when an object is written with `sync=True`. Objects are always written whole, hence a report cut by a crash only loses its last objects.
+
+    Parameters
+      path: The path of the report file, which is truncated.
+      policy: The policy used to flush the buffer.
+    """
+
+    self.policy = policy
+
+    self._buffer = bytearray()
+    self._closed = False
+    self._condition = threading.Condition()
+    self._error: Optional[BaseException] = None
+    self._file = path.open("wb")
+    self._overflowing = False
+    self._sync_requested = False
+
+    self._thread = threading.Thread(target=self._run, name="Report writer")
+    self._thread.start()
+
+  @property
+  def writable(self):
+    """
+    Whether the buffer is smaller than `policy.max_buffer_size`.
+    """
+
+    with self._condition:
+      return len(self._buffer) < self.policy.max_buffer_size
+
+  def write(self, obj: Any, /, *, sync: bool = False):
+    """
+    Writes an object to the report.
+
+    The object is buffered even if the buffer is larger than `policy.max_buffer_size`, which only happens when the disk cannot keep up. Callers should then wait for `wait_writable()` before writing further objects.
+
+    Parameters
+      obj: The object to write.
+      sync: Whether to write the buffer and synchronize the file with the disk as soon as possible, if allowed by the policy.
+    """
+
+    data = comserde.dumps(obj)
+
+    with self._condition:
+      if self._error:
+        raise self._error
+
+      self._buffer += data
+      self._sync_requested = self._sync_requested or (sync and self.policy.sync)
+
+      if (len(self._buffer) >= self.policy.max_buffer_size) and (not self._overflowing):
+        self._overflowing = True
+        logger.warning("Report data is produced faster than it can be written to disk")
+
+      if self._sync_requested or (len(self._buffer) >= self.policy.flush_size):
+        self._condition.notify_all()
+
+  async def wait_writable(self):
+    """
+    Waits for the buffer to become smaller than `policy.max_buffer_size`.
+
+    Raises
+      BaseException: If writing to the file failed.
+    """
+
+    def wait():
+      with self._condition:
+        self._condition.wait_for(lambda: (len(self._buffer) < self.policy.max_buffer_size) or self._closed or (self._error is not None))
+
+        if self._error:
+          raise self._error
+
+    if not self.writable:
+      await asyncio.to_thread(wait)
+
+  async def close(self):
+    """
+    Writes the remaining buffer, synchronizes the file with the disk and closes it.
+    """
+
+    with self._condition:
+      self._closed = True
+      self._condition.notify_all()
+
+    await asyncio.to_thread(self._thread.join)
+
+    if self._error:
+      raise self._error
+
+  def _run(self):
+    try:
+      while True:
+        with self._condition:
+          self._condition.wait_for(lambda: self._closed or self._sync_requested or (len(self._buffer) >= self.policy.flush_size), timeout=self.policy.flush_interval)
+
+          closed = self._closed
+          data = bytes(self._buffer)
+          sync = self._sync_requested
+
+          self._buffer.clear()
+          self._overflowing = False
+          self._sync_requested = False
+          self._condition.notify_all()
+
+        if data:
+          self._file.write(data)
+          self._file.flush()
+
+        if sync or closed:
+          os.fsync(self._file.fileno())
+
+        if closed:
+          break
+    except BaseException as e:
+      with self._condition:
+        self._error = e
+        self._condition.notify_all()
+    finally:
+      self._file.close()
@@ -397,7 +397,7 @@ class DemoStateInstance(UnitStateInstance):
 
     self._flag = 0
 
-    from .host import logger
+    from . import logger
     self._logger = logger.getChild(f"stateInstance{self._index}")
     self._logger.debug("Created")
     self._notify = notify
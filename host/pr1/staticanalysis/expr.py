@@ -1,10 +1,12 @@
 from abc import ABC, abstractmethod
 import ast
 import binascii
+import builtins
 import functools
 import math
 import os
 from dataclasses import KW_ONLY, dataclass, field
+from types import NoneType
 from typing import Any, AsyncGenerator, Callable, ClassVar, Generic, Optional, Protocol, Self, Sequence, TypeVar
 
 from .types import TypeInstance, UnknownDef
@@ -39,10 +41,64 @@ class CompositeExprDef(BaseExprDef):
   def code(self):
     return compile(ast.Expression(self.node), "<string>", mode='eval')
 
+  @functools.cached_property
+  def function(self) -> Callable[..., Any]:
+    """
+    A function which evaluates the expression given the values of its components as positional arguments, in the order of `components`.
+
+    The function is compiled into a single code object, such that evaluating the expression does not require creating a dictionary of variables nor calling `eval()`.
+    """
+
+    assert self.node
+
+    module = ast.Module([
+      ast.FunctionDef(
+        name='evaluate',
+        args=ast.arguments(posonlyargs=[ast.arg(name) for name in self.components.keys()], args=[], kwonlyargs=[], kw_defaults=[], defaults=[]),
+        body=[ast.Try(
+          body=[ast.Return(self.node)],
+          handlers=[ast.ExceptHandler(
+            ast.Name('Exception', ctx=ast.Load()),
+            '__e',
+            [ast.Raise(ast.Call(ast.Name('__EvaluationError', ctx=ast.Load()), [ast.Name('__e', ctx=ast.Load())], []), ast.Name('__e', ctx=ast.Load()))]
+          )],
+          orelse=[],
+          finalbody=[]
+        )],
+        decorator_list=[]
+      )
+    ], type_ignores=[])
+
+    function_globals = { '__builtins__': builtins, '__EvaluationError': EvaluationError }
+    exec(compile(ast.fix_missing_locations(module), "<string>", mode='exec'), function_globals)
+
+    return function_globals['evaluate']
+
+  def __getstate__(self):
+    # Code objects and functions cannot be pickled, and are compiled again when needed
+    state = self.__dict__.copy()
+    state.pop('code', None)
+    state.pop('function', None)
+
+    return state
+
   def to_evaluated(self):
+    components = { name: component.to_evaluated() for name, component in self.components.items() }
+
+    # Fold expressions whose components are all constant, such as literals, when their value is immutable
+    if self.node and all(isinstance(component, ConstantExprEval) for component in components.values()):
+      try:
+        value = eval(self.code, dict(), { name: component.value for name, component in components.items() }) # type: ignore
+      except Exception:
+        pass
+      else:
+        if isinstance(value, (bool, bytes, complex, float, int, str, NoneType)):
+          return ConstantExprEval(value)
+
     return CompositeExprEval(
-      components={ name: component.to_evaluated() for name, component in self.components.items() },
-      expr=self
+      components=components,
+      expr=self,
+      ready=all(_is_ready(component) for component in components.values())
     )
 
   @classmethod
@@ -116,30 +172,40 @@ class CompositeExprEval(BaseExprEval):
   components: dict[str, BaseExprEval]
   expr: CompositeExprDef
 
-  def evaluate(self, stack):
-    evaluated_components = {
-      name: component.evaluate(stack)
-      for name, component in self.components.items()
-    }
 
-    if all(isinstance(component, ConstantExprEval) for component in evaluated_components.values()):
-      all_variables = {
-        name: component.value for name, component in evaluated_components.items() # type: ignore
-      }
+  # Whether all components are constant or deferred values of phase 0, in which case the next evaluation produces a constant
+  ready: bool = field(default=False, compare=False, kw_only=True)
 
+  def evaluate(self, stack):
+    # Look up values and call the compiled function directly, without creating intermediate objects
+    if self.ready and self.expr.node:
+      return ConstantExprEval(self.expr.function(*[
+        (stack[component.symbol][component.name] if component.__class__ is DeferredExprEval else component.value) # type: ignore
+        for component in self.components.values()
+      ]))
+
+    evaluated_components = dict[str, BaseExprEval]()
+    constant = True
+    ready = True
+
+    for name, component in self.components.items():
+      evaluated_component = component.evaluate(stack)
+      evaluated_components[name] = evaluated_component
+
+      if evaluated_component.__class__ is not ConstantExprEval:
+        constant = False
+        ready = ready and _is_ready(evaluated_component)
+
+    if constant:
       if not self.expr.node:
         raise InvalidExpressionError
 
-      try:
-        result = eval(self.expr.code, dict(), all_variables)
-      except Exception as e:
-        raise EvaluationError(e) from e
-      else:
-        return ConstantExprEval(result)
+      return ConstantExprEval(self.expr.function(*[component.value for component in evaluated_components.values()])) # type: ignore
     else:
       return CompositeExprEval(
         components=evaluated_components,
-        expr=self.expr
+        expr=self.expr,
+        ready=ready
       )
 
   def to_watched(self):
@@ -154,8 +220,16 @@ class DeferredExprEval(BaseExprEval):
   phase: int
   symbol: int
 
+  @functools.cached_property
+  def _next_phase(self):
+    return self.__class__(self.name, self.phase - 1, self.symbol)
+
   def evaluate(self, stack):
-    return ConstantExprEval(stack[self.symbol][self.name]) if (self.phase < 1) else self.__class__(self.name, self.phase - 1, self.symbol)
+    return ConstantExprEval(stack[self.symbol][self.name]) if (self.phase < 1) else self._next_phase
+
+
+def _is_ready(expr: BaseExprEval, /):
+  return (expr.__class__ is ConstantExprEval) or ((expr.__class__ is DeferredExprEval) and (expr.phase < 1)) # type: ignore
 
 
 # Phase 3
@@ -178,25 +252,100 @@ class BaseExprWatch(ABC):
 @dataclass(kw_only=True)
 class CompositeExprWatch(BaseExprWatch):
   components: dict[str, BaseExprWatch]
-  initialized: bool = False
   expr: CompositeExprDef
-  value: Optional[Any] = None
+  _plan: 'Optional[ExprWatchPlan]' = field(default=None, init=False, repr=False)
 
   @property
   def dependencies(self):
-    dependencies = set[Dependency]()
+    return self._get_plan().dependencies
+
+  def evaluate(self, changed_dependencies: set[Dependency]):
+    return self._get_plan().evaluate(changed_dependencies)
 
-    for component in self.components.values():
-      dependencies |= component.dependencies
+  def _get_plan(self):
+    # The plan is only created for the root of the tree, which is the only watched expression evaluated directly
+    if self._plan is None:
+      self._plan = ExprWatchPlan(self)
 
-    return dependencies
+    return self._plan
+
+@dataclass(frozen=True, kw_only=True)
+class ExprWatchPlanStep:
+  components: list[tuple[str, int]]
+  dependency_mask: int
+  expr: Optional[CompositeExprDef]
+  watch: Optional[BaseExprWatch]
+
+class ExprWatchPlan:
+  def __init__(self, root: CompositeExprWatch, /):
+    """
+    Creates an evaluation plan of a tree of watched expressions.
+
+    The tree is flattened into a list of steps where each composite expression follows its components, and each step records the set of dependencies it transitively depends on as a bitset. When dependencies change, only the steps which depend on them are evaluated again.
+
+    Parameters
+      root: The root of the tree.
+    """
+
+    self._dependency_bits = dict[Dependency, int]()
+    self._initialized = False
+    self._steps = list[ExprWatchPlanStep]()
+
+    self._add_step(root)
+
+    self.dependencies = set(self._dependency_bits.keys())
+    self._values: list[Any] = [None] * len(self._steps)
+
+  def _add_step(self, watch: BaseExprWatch, /) -> int:
+    if isinstance(watch, CompositeExprWatch):
+      components = [(name, self._add_step(component)) for name, component in watch.components.items()]
+      dependency_mask = 0
+
+      for _, component_index in components:
+        dependency_mask |= self._steps[component_index].dependency_mask
+
+      step = ExprWatchPlanStep(
+        components=components,
+        dependency_mask=dependency_mask,
+        expr=watch.expr,
+        watch=None
+      )
+    else:
+      dependency_mask = 0
+
+      for dependency in watch.dependencies:
+        dependency_mask |= self._dependency_bits.setdefault(dependency, 1 << len(self._dependency_bits))
+
+      step = ExprWatchPlanStep(
+        components=list(),
+        dependency_mask=dependency_mask,
+        expr=None,
+        watch=watch
+      )
+
+    self._steps.append(step)
+    return len(self._steps) - 1
 
   def evaluate(self, changed_dependencies: set[Dependency]):
-    if (changed_dependencies & self.dependencies) or (not self.initialized):
-      self.initialized = True
-      self.value = eval(self.expr.code, globals(), { name: component.evaluate(changed_dependencies) for name, component in self.components.items() })
+    changed_mask = 0
 
-    return self.value
+    for dependency in changed_dependencies:
+      changed_mask |= self._dependency_bits.get(dependency, 0)
+
+    values = self._values
+
+    for index, step in enumerate(self._steps):
+      if self._initialized and not (step.dependency_mask & changed_mask):
+        continue
+
+      if step.expr:
+        values[index] = eval(step.expr.code, globals(), { name: values[component_index] for name, component_index in step.components })
+      else:
+        assert step.watch
+        values[index] = step.watch.evaluate(changed_dependencies)
+
+    self._initialized = True
+    return values[-1]
 
 @dataclass
 class ConstantExprWatch:
@@ -247,5 +396,6 @@ __all__ = [
   'Container',
   'DeferredExprDef',
   'DeferredExprEval',
-  'Dependency'
+  'Dependency',
+  'ExprWatchPlan'
 ]
@@ -1,4 +1,5 @@
 import ast
+import functools
 
 from .types import PreludeTypeDefs, PreludeTypeInstances, Symbols, TypeDefs, TypeInstances
 from .special import CoreTypeDefs
@@ -98,9 +99,40 @@ def random() -> float:
   return (CoreTypeDefs | type_defs), type_instances # type: ignore
 
 
-prelude = create_prelude()
+@functools.cache
+def get_prelude():
+  """
+  Returns the prelude, creating it on first use.
+
+  The prelude is created in memory rather than loaded from a cache as creating it takes less than a millisecond.
+  """
+
+  return create_prelude()
+
+@functools.cache
+def get_library_symbols(contents: str, /) -> Symbols:
+  """
+  Returns the symbols defined by the source of a library, such as type definitions provided by a plugin.
+
+  Libraries are evaluated against the prelude, once per process for each distinct source.
+
+  Parameters
+    contents: The Python source of the library, containing only declarations.
+  """
+
+  return process_source(contents, get_prelude())
+
+
+# The prelude is also available as the 'prelude' attribute, which is created when first accessed
+def __getattr__(name: str):
+  if name == 'prelude':
+    return get_prelude()
+
+  raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 __all__ = [
+  'get_library_symbols',
+  'get_prelude',
   'prelude'
 ]
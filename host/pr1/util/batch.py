@@ -5,7 +5,7 @@ from asyncio import Event, Future
 from logging import Logger
 from typing import Awaitable, Callable, Generic, TypeVar
 
-from ..host import logger as parent_logger
+from .. import logger as parent_logger
 from .asyncio import race, suppress, transfer_future
 from .decorators import provide_logger
 
@@ -71,8 +71,8 @@ class UnreachableError(Exception):
 
 
 class IndexCounter:
-  def __init__(self, *, start: int = 0):
-    self._items = set[int]()
+  def __init__(self, *, items: Iterable[int] = (), start: int = 0):
+    self._items = set[int](items)
     self._start = start
 
   def new(self):
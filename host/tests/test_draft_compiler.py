@@ -0,0 +1,48 @@
+import asyncio
+import threading
+import time
+from typing import Any
+
+from pr1.draft import DraftCompiler
+
+
+class SlowCache:
+  def __init__(self):
+    self.finished = threading.Event()
+
+  def compile(self, draft: Any, *, host: Any, profile: bool = False):
+    time.sleep(0.1)
+    self.finished.set()
+
+    return draft
+
+
+def test_suspend_waits_for_compilation():
+  async def main():
+    cache = SlowCache()
+    compiler = DraftCompiler(cache, host=None) # type: ignore
+
+    task = asyncio.create_task(compiler.compile(None, supersede=False)) # type: ignore
+    await asyncio.sleep(0.01)
+
+    async with compiler.suspend():
+      assert cache.finished.is_set()
+
+    await task
+
+  asyncio.run(main())
+
+def test_suspend_waits_for_cancelled_compilation():
+  async def main():
+    cache = SlowCache()
+    compiler = DraftCompiler(cache, host=None) # type: ignore
+
+    task = asyncio.create_task(compiler.compile(None, supersede=False)) # type: ignore
+    await asyncio.sleep(0.01)
+
+    task.cancel()
+
+    async with compiler.suspend():
+      assert cache.finished.is_set()
+
+  asyncio.run(main())
@@ -0,0 +1,69 @@
+from typing import Any
+
+from pr1.reader import IncrementalReader, LocatedValue, Source, loads
+
+
+def create_source(value: str, /):
+  return Source(value, origin="a")
+
+def find_sources(value: Any, /):
+  sources = set[int]()
+
+  def visit(value: Any):
+    if isinstance(value, LocatedValue):
+      sources.update(id(locrange.source) for locrange in value.area.ranges)
+
+    if isinstance(value, dict):
+      for key, item in value.items():
+        visit(key)
+        visit(item)
+    elif isinstance(value, list):
+      for item in value:
+        visit(item)
+
+  visit(value)
+  return sources
+
+
+def test_revisions_match_full_read():
+  reader = IncrementalReader()
+  lines = [f"key{index}:\n  value: {index}" for index in range(10)]
+
+  for index in range(10):
+    lines[index] = f"key{index}:\n  value: {index * 2}\n  other: [1, 2]"
+    contents = "\n".join(lines) + "\n"
+
+    result, errors, warnings = reader.loads(create_source(contents))
+    expected_result, expected_errors, expected_warnings = loads(Source(contents))
+
+    assert result == expected_result
+    assert len(errors) == len(expected_errors)
+    assert len(warnings) == len(expected_warnings)
+
+def test_sources_are_bounded():
+  reader = IncrementalReader(max_source_count=3)
+  contents = "".join(f"key{index}: {index}\n" for index in range(20))
+
+  for index in range(20):
+    contents += f"extra{index}: {index}\n"
+    source = create_source(contents)
+    result, _, _ = reader.loads(source)
+
+    assert len(find_sources(result)) <= 3
+
+  # The latest revision is re-rooted on its own source
+  assert reader._documents["a"].source_count <= 3
+
+def test_documents_are_bounded():
+  reader = IncrementalReader(max_document_count=2)
+
+  for origin in ["a", "b", "c"]:
+    reader.loads(Source("x: 1\n", origin=origin))
+
+  assert list(reader._documents.keys()) == ["b", "c"]
+
+  reader.discard("b")
+  assert list(reader._documents.keys()) == ["c"]
+
+  reader.clear()
+  assert not reader._documents
@@ -0,0 +1,60 @@
+import comserde
+import pytest
+
+from pr1.error import Diagnostic
+from pr1.master.analysis import MasterAnalysis, RuntimeAnalysis
+
+
+def create_analysis(*messages: str, event_index: int = 0):
+  analysis = MasterAnalysis()
+  analysis.add_runtime(RuntimeAnalysis(warnings=[Diagnostic(message) for message in messages]), author_path=[0], event_index=event_index)
+
+  return analysis
+
+
+def test_add_runtime_merges_items():
+  analysis = create_analysis("a", "b", "a")
+
+  assert [item.occurrence_count for item in analysis.warnings] == [2, 1]
+  assert set(analysis.export_changes()["warnings"].keys()) == {0, 1}
+
+  analysis.add_runtime(RuntimeAnalysis(warnings=[Diagnostic("b")]), author_path=[0], event_index=1)
+
+  assert [item.occurrence_count for item in analysis.warnings] == [2, 2]
+  assert set(analysis.export_changes()["warnings"].keys()) == {1}
+
+def test_occurrence_counts_are_serialized():
+  analysis = create_analysis("a", "b", "a")
+  event_analysis = comserde.loads(comserde.dumps(analysis, MasterAnalysis), MasterAnalysis)
+
+  assert [item.occurrence_count for item in event_analysis.warnings] == [2, 1]
+
+  # Items written before occurrences were counted have no count of their own
+  legacy_item = event_analysis.warnings[1]
+  del legacy_item.__dict__['occurrence_count']
+
+  master_analysis = MasterAnalysis()
+  master_analysis += event_analysis
+  master_analysis += event_analysis
+
+  assert [item.occurrence_count for item in master_analysis.warnings] == [4, 2]
+
+def test_export_page():
+  analysis = MasterAnalysis()
+
+  for index in range(5):
+    analysis += create_analysis(str(index), event_index=index)
+
+  page = analysis.export_page('warnings', limit=2, offset=1)
+
+  assert page["totalCount"] == 5
+  assert [item["runtimeInfo"]["eventIndex"] for item in page["items"]] == [1, 2]
+
+  with pytest.raises(ValueError):
+    analysis.export_page('values', limit=2) # type: ignore
+
+  with pytest.raises(ValueError):
+    analysis.export_page('warnings', limit=-1)
+
+  with pytest.raises(ValueError):
+    analysis.export_page('warnings', limit=2, offset="1") # type: ignore
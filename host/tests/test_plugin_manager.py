@@ -0,0 +1,51 @@
+import importlib.metadata
+import sys
+import types
+from importlib.metadata import EntryPoint
+
+import pytest
+
+from pr1.plugin.manager import PluginManager
+from pr1.reader import LocatedValue, LocationArea
+from pr1.util.misc import create_datainstance
+
+
+def create_plugin_module(name: str, namespace: str):
+  module = types.ModuleType(name)
+  module.namespace = namespace # type: ignore
+  module.version = 3 # type: ignore
+
+  return module
+
+def test_plugin_namespaces(monkeypatch: pytest.MonkeyPatch):
+  modules = {
+    "test_plugin_valid": create_plugin_module("test_plugin_valid", "valid"),
+    "test_plugin_invalid": create_plugin_module("test_plugin_invalid", "other"),
+    "test_plugin_disabled": create_plugin_module("test_plugin_disabled", "other")
+  }
+
+  for name, module in modules.items():
+    monkeypatch.setitem(sys.modules, name, module)
+
+  entry_points = [
+    EntryPoint(name="valid", value="test_plugin_valid", group="automancer.plugins"),
+    EntryPoint(name="invalid", value="test_plugin_invalid", group="automancer.plugins"),
+    EntryPoint(name="disabled", value="test_plugin_disabled", group="automancer.plugins")
+  ]
+
+  monkeypatch.setattr(importlib.metadata, 'entry_points', lambda *, group: (entry_points if group == "automancer.plugins" else []))
+
+  area = LocationArea()
+  manager = PluginManager(LocatedValue({
+    'disabled': create_datainstance(dict(development=False, enabled=False, options=LocatedValue({}, area)))
+  }, area))
+
+  # Enabled plugins whose namespace differs from their entry point's name are ignored
+  assert set(manager.plugin_infos.keys()) == {"valid", "disabled"}
+  assert list(manager.plugins.keys()) == ["valid"]
+
+  assert manager.plugin_infos["valid"].version == 3
+
+  # Disabled plugins are not imported
+  assert not manager.plugin_infos["disabled"].loaded
+  assert manager.plugin_infos["disabled"].version == 0
@@ -0,0 +1,64 @@
+import base64
+import pickle
+
+from pr1.reader import LocatedDict, LocatedList, LocatedString, LocatedValue, LocationArea, LocationRange, Source, UnlocatedValue
+
+
+# Written by the classes preceding the addition of slots, as in existing reports, with:
+#
+#   source = Source("name: x\nsteps: 1\n")
+#   area = LocationArea([LocationRange(source, 0, 4), LocationRange(source, 9, 14)])
+#   value = LocatedValue(3, area)
+#
+#   pickle.dumps({
+#     "area": area,
+#     "empty": LocationArea(),
+#     "value": value,
+#     "dict": LocatedDict({"a": value}, area),
+#     "list": LocatedList([value], area),
+#     "string": source[0:4],
+#     "unlocated": UnlocatedValue(5)
+#   })
+LEGACY_PICKLE = base64.b85decode(
+  "fCQCT0ssI20001elqie@VRB_*l#B{+axpG)WnpAxa+Hh=OmAahbZKvHL2_kbl#`Sxfs}oej0SRHZf9k4lwFi4XabB4OmAahbZKvH"
+  "QekdqWt5YYDS?!Ilqie?Wo~4YO9YGtb8mHWV`Y?R0*nSzZ*_8GWt5YYj1g{OZDl$jcnWiLWpHykATbJ*g_MDmeUvC@0cZp%fs}oe"
+  "Xa`-CXbLHTlzo&aXbnpdXbxx-j0JOaVRCeoO8|9ZVRK@P31)R{Y+qq=Wnq+P6^sRTVQh6}l#CH>VQpnPAb1LMbY*aJIv_C$l#B>r"
+  "Vsme7b#!Hvh>Qkra%pF2Zj?@SVrUvm0Ci$$3Mqk<eUvC@4NDGa4rmi-8cPXvVr6q;j0I(FaCCW;Xap&Nlzo(F2VInNVrU#_0*nky"
+  "Z)0I}Wn@-iY;|Rnlawielzo&aXaQ&iXd7q+XdFuebz+PJWNBk`lxPBs3rufgVRU6=L}_Dml#`Sxfs~8^VU%bnbA6O3XaQ&iXd7q+"
+  "XdHc%Xf9|db9G{j1Z-(@bd+cUj0;R}V_|e<WK3yubd-~nDS?z|C}Dk+C};s_1!x;+1!x>ylxQenbz+PLb98cPZfBHe0*nnzZ)0I}"
+  "Wn@!ya%pa7l#`T<1a4t%Wt4@Kfs}oeC};s_1Sx@(eUxYiU6g1FDS?!IlqhHoO9W^RXcK4}O8|9ZVRK?=8)!ag9E=2RVQpoUXdZ}l"
+  "VvGrOZftL3VRU6=lxPBs4pnY!Z)0I}Wn@-iY;|Rnlawielzo&aXaP=W97_dtVs$P"
+)
+
+
+def check_data(data: dict):
+  assert isinstance(data["area"], LocationArea)
+  assert isinstance(data["area"].ranges, tuple)
+  assert [(range.start, range.end) for range in data["area"].ranges] == [(0, 4), (9, 14)]
+  assert isinstance(data["area"].source, Source)
+  assert data["empty"].ranges == ()
+
+  assert isinstance(data["value"], LocatedValue)
+  assert data["value"].value == 3
+  assert data["value"].area.ranges[1].end == 14
+
+  assert isinstance(data["dict"], LocatedDict)
+  assert data["dict"]["a"].value == 3
+  assert len(data["dict"].area.ranges) == 2
+
+  assert isinstance(data["list"], LocatedList)
+  assert data["list"][0].value == 3
+
+  assert isinstance(data["string"], LocatedString)
+  assert data["string"] == "name"
+  assert data["string"].area.ranges[0].end == 4
+
+  assert isinstance(data["unlocated"], UnlocatedValue)
+  assert data["unlocated"].value == 5
+
+
+def test_load_legacy_pickle():
+  check_data(pickle.loads(LEGACY_PICKLE))
+
+def test_pickle_round_trip():
+  check_data(pickle.loads(pickle.dumps(pickle.loads(LEGACY_PICKLE))))
@@ -0,0 +1,30 @@
+import asyncio
+from pathlib import Path
+
+import comserde
+
+from pr1.report import ExperimentReportWriter, ExperimentReportWriterPolicy
+
+
+def test_write_does_not_block(tmp_path: Path):
+  async def main():
+    path = tmp_path / "report"
+    writer = ExperimentReportWriter(path, policy=ExperimentReportWriterPolicy(flush_interval=10.0, flush_size=1_000_000, max_buffer_size=100))
+
+    # The buffer exceeds its maximum size without blocking the event loop
+    for index in range(100):
+      writer.write(index)
+
+    assert not writer.writable
+
+    writer.write(100, sync=True)
+    await writer.wait_writable()
+
+    assert writer.writable
+
+    await writer.close()
+
+    expected_data = b"".join(comserde.dumps(index) for index in range(101))
+    assert path.read_bytes() == expected_data
+
+  asyncio.run(main())
@@ -221,11 +221,13 @@ class Parser(am.BaseParser):
         case _:
           return None
 
+    root_node = self._fiber.host.root_node
     symbol = self._fiber.allocate_eval_symbol()
 
+    # The factory only captures the root node and symbol, rather than this parser, such that analyses of expressions which reference devices can be reused in later compilations
     env = EvalEnv({
       'devices': EvalEnvValue(
-        lambda node: DevicesExprDef(self._fiber.host.root_node, am.NodePath(), symbol)
+        lambda node: DevicesExprDef(root_node, am.NodePath(), symbol)
       )
     }, name="Devices", symbol=symbol)
 
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+import functools
 from types import EllipsisType
 from typing import Any, TypedDict, cast
 
@@ -8,7 +9,6 @@ from pr1.fiber.parser import (BaseBlock, BaseLeadTransformer, BaseParser,
                               FiberParser, Layer,
                               LeadTransformerPreparationResult)
 from pr1.reader import LocatedString
-from pr1.util.misc import cumsum
 
 from . import namespace
 
@@ -81,8 +81,13 @@ class Block(BaseBlock):
     from .program import Program
     return Program(self, handle)
 
+  @functools.cached_property
+  def children_durations(self):
+    # Prefix sums of the durations of children, used to calculate remaining terms in constant time
+    return am.DurationTermSums(child.duration() for child in self.children)
+
   def duration(self):
-    return sum((child.duration() for child in self.children), am.DurationTerm.zero())
+    return self.children_durations.sum()
 
   def import_point(self, data, /):
     from .program import ProgramPoint
@@ -99,6 +104,6 @@ class Block(BaseBlock):
       "name": "_",
       "namespace": namespace,
       "children": [child.export(context) for child in self.children],
-      "childrenDelays": [am.DurationTerm.zero().export(), *[delay.export() for delay in cumsum([child.duration() for child in self.children])]][:-1],
+      "childrenDelays": [self.children_durations.sum(0, child_index).export() for child_index in range(len(self.children))],
       "duration": self.duration().export()
     }
@@ -1,7 +1,7 @@
 import comserde
 from dataclasses import dataclass
 from enum import IntEnum
-from typing import Optional
+from typing import Mapping, Optional
 
 import automancer as am
 from pr1.fiber.parser import BaseProgramPoint, BaseProgram
@@ -35,6 +35,39 @@ class ProgramPoint(BaseProgramPoint):
       "index": self.index
     }
 
+class RemainingChildrenTerms(Mapping[int, am.Term]):
+  def __init__(self, block: Block, start_index: int, start_term: am.Term):
+    """
+    Maps the index of each remaining child of a sequence to the term at which it is expected to start.
+
+    Terms are calculated from the prefix sums of the durations of children when accessed, such that creating this mapping takes constant time.
+
+    Parameters
+      block: The sequence block.
+      start_index: The index of the first remaining child.
+      start_term: The term at which the first remaining child is expected to start.
+    """
+
+    self._block = block
+    self._start_index = start_index
+    self._start_term = start_term
+
+  @property
+  def end_term(self):
+    return self._start_term + self._block.children_durations.sum(self._start_index)
+
+  def __getitem__(self, key: int, /):
+    if not (self._start_index <= key < len(self._block.children)):
+      raise KeyError(key)
+
+    return self._start_term + self._block.children_durations.sum(self._start_index, key)
+
+  def __iter__(self):
+    return iter(range(self._start_index, len(self._block.children)))
+
+  def __len__(self):
+    return max(len(self._block.children) - self._start_index, 0)
+
 @am.debug
 class Program(BaseProgram):
   def __init__(self, block: Block, handle):
@@ -74,26 +107,20 @@ class Program(BaseProgram):
     child_point, child_mark = child_result or (None, None)
 
     current_child_term = child_mark.term if child_mark else block.children[self._child_index].duration()
-    remaining_children_durations = [child_block.duration() for child_block in block.children[(self._child_index + 1):]]
-    remaining_children_terms = [(current_child_term + duration) for duration in [am.DurationTerm.zero(), *am.cumsum(remaining_children_durations)]]
+    remaining_children_terms = RemainingChildrenTerms(block, self._child_index + 1, current_child_term)
 
     return ProgramPoint(
       child=child_point,
       index=self._child_index
     ), am.Mark(
-      remaining_children_terms[-1],
+      remaining_children_terms.end_term,
       ({ self._child_index: child_mark } if child_mark else {}),
-      { (self._child_index + relative_child_index + 1): child_term for relative_child_index, child_term in enumerate(remaining_children_terms[:-1]) } | ({} if child_mark else { self._child_index: current_child_term })
+      dict(remaining_children_terms) | ({} if child_mark else { self._child_index: current_child_term })
     )
 
   def term_info(self, children_terms):
-    current_child_term = children_terms[self._child_index]
-    remaining_children_durations = [child_block.duration() for child_block in self._block.children[(self._child_index + 1):]]
-    remaining_children_terms = [(current_child_term + duration) for duration in [am.DurationTerm.zero(), *am.cumsum(remaining_children_durations)]]
-
-    return (remaining_children_terms[-1], {
-      (self._child_index + relative_child_index + 1): child_term for relative_child_index, child_term in enumerate(remaining_children_terms[:-1])
-    })
+    remaining_children_terms = RemainingChildrenTerms(self._block, self._child_index + 1, children_terms[self._child_index])
+    return remaining_children_terms.end_term, remaining_children_terms
 
   async def run(self, point: ProgramPoint, stack):
     self._point = point or ProgramPoint(child=None, index=0)
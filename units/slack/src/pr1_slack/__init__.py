@@ -16,4 +16,11 @@ metadata = am.Metadata(
 client_path = files(__name__ + '.client')
 logger = am.logger.getChild(namespace)
 
-from .parser import Parser
+
+# The parser is imported on first use to avoid importing slack_sdk when the host starts
+def __getattr__(name: str):
+  if name == 'Parser':
+    from .parser import Parser
+    return Parser
+
+  raise AttributeError(f"module {__name__!r} has no attribute {name!r}")